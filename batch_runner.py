@@ -0,0 +1,112 @@
+import sys
+import json
+import time
+from itertools import islice
+from pedalhub import PedalHub
+from operations import HubOperations, OperationResult
+
+"""
+Runs PedalHub operations from a JSON lines file (one operation per line) without the interactive menus, e.g.
+    {"op": "add_bike", "bike_id": "B010", "bike_type": "Road Bike", "size": "L", "color": "Red", "rental_price": 12.0}
+    {"op": "rent", "bike_id": "B010", "customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": "09171234567", "rental_hours": 2}
+    {"op": "complete", "bike_id": "B010"}
+The file is streamed line by line through HubOperations and the changes are saved once per batch of BATCH_SIZE operations
+instead of once per operation. At the end, throughput and per-operation latency percentiles are reported.
+
+Usage: python batch_runner.py OPERATIONS_FILE [BATCH_SIZE]
+"""
+BATCH_SIZE = 10000
+
+
+# Yields the operations in a JSON lines file; lines that are not valid JSON are yielded as None
+def read_operations(filename):
+    with open(filename, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+
+
+# Returns the value below which the given percentage of the (sorted) values fall
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+"""
+Runs every operation through hub and returns a summary:
+    {"operations", "succeeded", "failed", "seconds", "ops_per_second", "by_op": {op: {"count", "failed", "p50_ms", "p90_ms", "p99_ms", "max_ms"}}}
+"""
+def run_batch(hub, operations, batch_size=BATCH_SIZE):
+    api = HubOperations(hub)
+    latencies = {}  # op -> list of seconds
+    failures = {}   # op -> number of failed operations
+    count = 0
+    start = time.perf_counter()
+
+    operations = iter(operations)
+    while True:
+        batch = list(islice(operations, batch_size))
+        if not batch:
+            break
+        with hub.batch_saves():  # The whole batch is saved once, when the block ends
+            for request in batch:
+                op = str(request.get("op")) if isinstance(request, dict) else "invalid"  # A label for the summary
+                began = time.perf_counter()
+                if isinstance(request, dict):
+                    try:
+                        result = api.execute(request)
+                    except Exception as e:  # One bad operation fails, not the whole batch
+                        result = OperationResult(False, f"Error: {e}")
+                else:
+                    result = OperationResult(False, "Invalid operation line.", invalid=True)
+                latencies.setdefault(op, []).append(time.perf_counter() - began)
+                if not result.ok:
+                    failures[op] = failures.get(op, 0) + 1
+                count += 1
+
+    seconds = time.perf_counter() - start
+    summary = {
+        "operations": count,
+        "succeeded": count - sum(failures.values()),
+        "failed": sum(failures.values()),
+        "seconds": seconds,
+        "ops_per_second": count / seconds if seconds else 0.0,
+        "by_op": {},
+    }
+    for op, values in latencies.items():
+        values.sort()
+        summary["by_op"][op] = {
+            "count": len(values),
+            "failed": failures.get(op, 0),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p90_ms": percentile(values, 90) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n{summary['operations']} operations ({summary['succeeded']} succeeded, {summary['failed']} failed) "
+          f"in {summary['seconds']:.3f} s: {summary['ops_per_second']:.0f} operations/s\n")
+    print(f"{'Operation':<14} {'Count':>9} {'Failed':>8} {'p50 (ms)':>10} {'p90 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    print("=" * 77)
+    for op, stats in sorted(summary["by_op"].items()):
+        print(f"{op:<14} {stats['count']:>9} {stats['failed']:>8} {stats['p50_ms']:>10.3f} {stats['p90_ms']:>10.3f} "
+              f"{stats['p99_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python batch_runner.py OPERATIONS_FILE [BATCH_SIZE]")
+        sys.exit(1)
+    hub = PedalHub()
+    print_summary(run_batch(hub, read_operations(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else BATCH_SIZE))
+    hub.save_data()
@@ -0,0 +1,68 @@
+"""
+Compares the storage backends on rent and complete throughput.
+Each backend starts from the same fleet and performs the same sequence of rentals and completions through
+PedalHub.commit, with every operation persisted on its own (no batch_saves), as the interactive menus do.
+
+Run from the project root:  python -m benchmarks.bench_backends [bikes] [operations]
+"""
+import io
+import os
+import sys
+import time
+import tempfile
+import contextlib
+
+from pedalhub import PedalHub
+
+BACKENDS = (
+    ("json (rewrite files)", {"STORAGE_BACKEND": "json", "USE_JOURNAL": False}),
+    ("json + journal", {"STORAGE_BACKEND": "json", "USE_JOURNAL": True}),
+    ("sqlite", {"STORAGE_BACKEND": "sqlite"}),
+)
+
+
+def make_hub(settings):
+    hub_class = type("BenchPedalHub", (PedalHub,), dict(settings))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return hub_class()
+
+
+def run(settings, bikes, operations):
+    hub = make_hub(settings)
+    with hub.batch_saves():  # Set up the fleet in one save; not measured
+        for i in range(bikes):
+            hub.commit("add_bike", {"bike_id": f"B{i:06d}", "bike_type": "Road Bike", "size": "L", "color": "Black",
+                                    "rental_price": 12.0})
+    hub.save_data()
+
+    results = {}
+    for op in ("rent", "complete"):
+        start = time.perf_counter()
+        for i in range(operations):
+            bike_id = f"B{i % bikes:06d}"
+            if op == "rent":
+                hub.commit("rent", {"customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": "1234567890",
+                                    "bike_id": bike_id, "rental_hours": 2, "total_cost": 24.0, "status": "Active"})
+            else:
+                hub.commit("complete", {"bike_id": bike_id})
+        results[op] = operations / (time.perf_counter() - start)
+    hub.storage.close()
+    return results
+
+
+def main(bikes=10000, operations=500):
+    print(f"{bikes} bikes, {operations} rentals then {operations} completions\n")
+    print(f"{'backend':<22} {'rent/s':>10} {'complete/s':>12}")
+    for name, settings in BACKENDS:
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                results = run(settings, bikes, min(operations, bikes))
+            finally:
+                os.chdir(cwd)
+        print(f"{name:<22} {results['rent']:>10.0f} {results['complete']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,127 @@
+"""
+Multi-process stress run for shared data files: several processes (kiosks) rent and complete bikes of one small fleet
+at the same time, each through its own PedalHub on the same data directory.
+
+Afterwards the data is loaded by a fresh PedalHub and checked for lost updates: every successful completion must be in
+the rental history, every successful rental that was not completed must still be active, and a bike must be unavailable
+exactly when it has an active rental. The run is done with SHARED_DATA on (locking and reloading) and off, to show the
+throughput cost of the locking and what goes wrong without it.
+
+Run from the project root:  python -m benchmarks.bench_locking [processes] [operations per process] [bikes]
+"""
+import io
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import multiprocessing
+
+from pedalhub import PedalHub
+from operations import HubOperations
+
+SETTINGS = (
+    ("locking (SHARED_DATA)", {"SHARED_DATA": True}),
+    ("no locking", {"SHARED_DATA": False}),
+)
+
+
+def make_hub(settings):
+    hub_class = type("BenchPedalHub", (PedalHub,), dict(settings))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return hub_class()
+
+
+"""
+One kiosk: tries random rentals and completions, and reports how many of each succeeded and the error it stopped with,
+if any (without locking, processes can break each other's saves; the error is reported so that run() does not wait for
+this process forever).
+"""
+def worker(directory, settings, seed, operations, bikes, start, results):
+    os.chdir(directory)
+    rented = completed = 0
+    error = None
+    try:
+        hub = make_hub(settings)
+        api = HubOperations(hub)
+        rng = random.Random(seed)
+        start.wait()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(operations):
+                bike_id = f"B{rng.randrange(bikes):04d}"
+                if rng.random() < 0.5:
+                    rented += api.rent(bike_id, "Juan", "Cruz", f"09{seed:09d}", 2).ok
+                else:
+                    completed += api.complete(bike_id).ok
+            hub.save_data()
+        hub.storage.close()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    results.put((rented, completed, error))
+
+
+def check(settings, rented, completed):
+    hub = make_hub(settings)
+    problems = []
+    history = sum(1 for _ in hub.iter_history())
+    if history != completed:
+        problems.append(f"{completed} completions succeeded but {history} are in the history")
+    if len(hub.bookings) != rented - completed:
+        problems.append(f"{rented - completed} rentals should be active but {len(hub.bookings)} are")
+    active = [booking.bike_id for booking in hub.bookings]
+    if len(set(active)) != len(active):
+        problems.append(f"{len(active) - len(set(active))} bikes are rented out twice")
+    wrong = sum(1 for bike in hub.bike_inventory if bike.available == (bike.bike_id in set(active)))
+    if wrong:
+        problems.append(f"{wrong} bikes have the wrong availability")
+    hub.storage.close()
+    return problems
+
+
+def run(settings, processes, operations, bikes):
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            hub = make_hub(settings)
+            with hub.batch_saves():
+                for i in range(bikes):
+                    hub.commit("add_bike", {"bike_id": f"B{i:04d}", "bike_type": "Road Bike", "size": "L",
+                                            "color": "Black", "rental_price": 12.0})
+            hub.save_data()
+            hub.storage.close()
+
+            start = multiprocessing.Event()
+            results = multiprocessing.Queue()
+            workers = [multiprocessing.Process(target=worker, args=(directory, settings, seed, operations, bikes, start, results))
+                       for seed in range(processes)]
+            for process in workers:
+                process.start()
+            time.sleep(0.5)  # Let every process load the data first
+            began = time.perf_counter()
+            start.set()
+            counts = [results.get() for _ in workers]
+            elapsed = time.perf_counter() - began
+            for process in workers:
+                process.join()
+
+            rented = sum(count[0] for count in counts)
+            completed = sum(count[1] for count in counts)
+            problems = [f"a process failed ({error})" for _, _, error in counts if error]
+            problems += check(settings, rented, completed)
+        finally:
+            os.chdir(cwd)
+    return processes * operations / elapsed, rented, completed, problems
+
+
+def main(processes=4, operations=500, bikes=20):
+    print(f"{processes} processes x {operations} operations on {bikes} bikes\n")
+    print(f"{'mode':<24} {'ops/s':>8} {'rented':>8} {'completed':>10}  result")
+    for name, settings in SETTINGS:
+        throughput, rented, completed, problems = run(settings, processes, operations, bikes)
+        print(f"{name:<24} {throughput:>8.0f} {rented:>8} {completed:>10}  {'; '.join(problems) or 'no lost updates'}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,68 @@
+"""
+Memory benchmark for the bike and booking record types.
+Measures bytes per record (with tracemalloc) for the old representations (a class with a per-instance __dict__ and plain
+booking dictionaries copied into the history) against the slotted BikeDetails/Booking classes and the columnar history store.
+
+Run from the project root:  python -m benchmarks.bench_memory [records]
+"""
+import sys
+import tracemalloc
+
+from bikedetails import BikeDetails
+from booking import Booking
+from history_columns import HistoryColumns
+from benchmarks.generators import make_fleet, make_history
+
+
+# The pre-__slots__ BikeDetails, kept here as the baseline
+class DictBikeDetails:
+
+    def __init__(self, bike_id, bike_type, size, color, rental_price, available=True):
+        self.bike_id = bike_id
+        self.bike_type = bike_type
+        self.size = size
+        self.color = color
+        self.rental_price = rental_price
+        self.available = available
+
+
+# The constructor arguments of each bike of a generated fleet
+def make_bike_fields(count):
+    return [(bike.bike_id, bike.bike_type, bike.size, bike.color, bike.rental_price) for bike in make_fleet(count)]
+
+
+def make_booking_dicts(count, fleet=10000):
+    return list(make_history(count, fleet))
+
+
+# Returns the bytes allocated by build(), divided by the number of records it built
+def bytes_per_record(build, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / count
+
+
+def main(count=100000):
+    bike_fields = make_bike_fields(count)
+    booking_dicts = make_booking_dicts(count)
+
+    results = [
+        ("bike (__dict__ class)", bytes_per_record(lambda: [DictBikeDetails(*fields) for fields in bike_fields], count)),
+        ("bike (BikeDetails, __slots__)", bytes_per_record(lambda: [BikeDetails(*fields) for fields in bike_fields], count)),
+        ("booking (dict copy)", bytes_per_record(lambda: [{**booking} for booking in booking_dicts], count)),
+        ("booking (Booking, __slots__)", bytes_per_record(lambda: [Booking.from_dict(booking) for booking in booking_dicts], count)),
+        ("history (list of dicts)", bytes_per_record(lambda: [{**booking} for booking in booking_dicts], count)),
+        ("history (HistoryColumns)", bytes_per_record(lambda: HistoryColumns(booking_dicts), count)),
+    ]
+
+    print(f"Bytes per record ({count} records; field strings shared with the input are not counted)")
+    for name, size in results:
+        print(f"  {name:<32} {size:8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,44 @@
+"""
+Benchmarks the pricing engine (pricing.PricingRules): pricing a whole fleet for many rental durations at once with
+price_table(), compared with calling cost() for every bike and duration, for flat pricing and for pricing with a daily
+cap, peak periods and type discounts. The vectorized prices are checked to be bit-identical to cost() and, for flat
+pricing, to BikeDetails.calculate_rental_cost.
+
+Run from the project root:  python -m benchmarks.bench_pricing [bikes] [durations]
+"""
+import sys
+import time
+
+import numpy  # Imported here so that the first price_table() does not include importing it (pricing imports it lazily)
+from pricing import PricingRules
+from benchmarks.generators import make_fleet
+
+
+def main(bikes=100000, durations=72):
+    fleet = list(make_fleet(bikes))
+    hours = [h / 2 for h in range(1, durations + 1)]  # Half an hour up to durations / 2 hours
+    start = time.mktime((2025, 6, 2, 18, 0, 0, 0, 0, -1))  # In the evening peak
+    sample = fleet[:2000]
+
+    print(f"{bikes} bikes x {durations} durations = {bikes * durations} prices\n")
+    print(f"{'rules':<10} {'price_table':>14} {'cost() loop':>14} {'speedup':>8}")
+    for name, rules in (
+        ("flat", PricingRules()),
+        ("tiered", PricingRules(daily_cap_hours=8, peak_periods=[(17, 19, 1.25), (22, 5, 0.8)],
+                                type_discounts={"BMX": 0.1, "City Bike": 0.15})),
+    ):
+        begin = time.perf_counter()
+        table = rules.price_table(fleet, hours, start)
+        vectorized = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        expected = [[rules.cost(bike, h, start) for h in hours] for bike in sample]
+        scalar = (time.perf_counter() - begin) * bikes / len(sample)  # Extrapolated from the sample
+        assert table[:len(sample)].tolist() == expected
+        if rules.is_flat():
+            assert expected == [[bike.calculate_rental_cost(h) for h in hours] for bike in sample]
+        print(f"{name:<10} {vectorized * 1000:>11.1f} ms {scalar * 1000:>11.0f} ms {scalar / vectorized:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,70 @@
+"""
+Benchmarks the NumPy rental reports (reports.RentalReports) on a synthetic rental history.
+Measures loading the history into the running totals, each report, and adding new rentals incrementally, and compares
+a report from the running totals with the same group-by written as a Python loop over the records. Building the totals
+costs a few such loops; the gain is that every later report and new rental does not rescan the history.
+
+Run from the project root:  python -m benchmarks.bench_reports [rows] [bikes]
+"""
+import sys
+import time
+
+from inventory import BikeInventory
+from reports import RentalReports
+from benchmarks.generators import make_fleet, make_history
+
+
+def make_inventory(bikes):
+    return BikeInventory(make_fleet(bikes))
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(rows=5000000, bikes=10000):
+    inventory = make_inventory(bikes)
+    generate_seconds, _ = timed(lambda: sum(1 for _ in make_history(rows, bikes)))
+    seconds, reports = timed(lambda: RentalReports(make_history(rows, bikes)))
+    print(f"Loaded {rows} rentals in {seconds - generate_seconds:.1f} s (not counting {generate_seconds:.1f} s to generate them)\n")
+
+    print(f"{'report':<28} {'ms':>10}")
+    for name, report in (
+        ("revenue per bike (top 10)", lambda: reports.revenue_per_bike(10)),
+        ("revenue per type", lambda: reports.revenue_per_type(inventory)),
+        ("utilization (top 10)", lambda: reports.utilization(limit=10)),
+        ("top 10 customers", lambda: reports.top_customers(10)),
+        ("duration histogram", reports.duration_histogram),
+    ):
+        seconds, _ = timed(report)
+        print(f"{name:<28} {seconds * 1000:>10.2f}")
+
+    new_rentals = list(make_history(1000, bikes, seed=4))
+    start = time.perf_counter()
+    for record in new_rentals:
+        reports.add(record)
+    reports.revenue_per_type(inventory)
+    print(f"\nAdding 1000 new rentals and making a report: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # The same group-bys (revenue, hours and rentals per bike) as a Python loop, on a sample held in memory
+    sample = list(make_history(min(rows, 200000), bikes, seed=5))
+
+    def python_loop():
+        totals = {}
+        for record in sample:
+            revenue, hours, rentals = totals.get(record["bike_id"], (0.0, 0.0, 0))
+            totals[record["bike_id"]] = (revenue + record["total_cost"], hours + record["rental_hours"], rentals + 1)
+        return sorted(totals.items(), key=lambda item: -item[1][0])[:10]
+
+    loop_seconds, _ = timed(python_loop)
+    build_seconds, sample_reports = timed(lambda: RentalReports(sample))
+    report_seconds, _ = timed(lambda: sample_reports.revenue_per_bike(10))
+    print(f"Revenue per bike over {len(sample)} rentals: Python loop {loop_seconds * 1000:.0f} ms per report; "
+          f"RentalReports {report_seconds * 1000:.2f} ms per report from the running totals "
+          f"(building all the totals once: {build_seconds * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
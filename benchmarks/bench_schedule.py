@@ -0,0 +1,98 @@
+"""
+Measures the reservation schedule (schedule.BikeSchedule) with a fleet of bikes and a long booking history per bike:
+building it, conflict checks for one bike, and the "which bikes are free from t1 to t2" query across the fleet.
+Conflict checks are compared with scanning all windows of the bike.
+
+Run from the project root:  python -m benchmarks.bench_schedule [bikes] [windows]
+"""
+import sys
+import time
+import random
+
+from schedule import BikeSchedule
+
+HOUR = 3600
+
+
+# Yields non-overlapping (start, end) windows for one bike, with random gaps, starting at time 0
+def make_windows(rng, count):
+    time_now = 0
+    for _ in range(count):
+        time_now += rng.randrange(0, 48) * HOUR
+        length = rng.randrange(1, 9) * HOUR
+        yield time_now, time_now + length
+        time_now += length
+
+
+def scan_conflict(windows, start, end):
+    for window_start, window_end in windows:
+        if window_start < end and window_end > start:
+            return window_start, window_end
+    return None
+
+
+def main(bikes=10000, windows=1000000):
+    rng = random.Random(7)
+    per_bike = windows // bikes
+    keys = [f"b{i:05d}" for i in range(bikes)]
+    all_windows = {key: list(make_windows(rng, per_bike)) for key in keys}
+    horizon = max(windows[-1][1] for windows in all_windows.values())
+
+    schedule = BikeSchedule()
+    start = time.perf_counter()
+    for key, bike_windows in all_windows.items():
+        schedule.extend(key, bike_windows)
+    print(f"{bikes} bikes, {len(schedule)} booked windows: built in {time.perf_counter() - start:.2f} s\n")
+
+    queries = [(rng.choice(keys), rng.randrange(0, horizon)) for _ in range(20000)]
+    queries = [(key, at, at + rng.randrange(1, 9) * HOUR) for key, at in queries]
+
+    start = time.perf_counter()
+    found = [schedule.conflict(key, window_start, window_end) for key, window_start, window_end in queries]
+    indexed = (time.perf_counter() - start) / len(queries)
+
+    sample = queries[:500]
+    start = time.perf_counter()
+    expected = [scan_conflict(all_windows[key], window_start, window_end) for key, window_start, window_end in sample]
+    scanned = (time.perf_counter() - start) / len(sample)
+    assert [window is None for window in found[:500]] == [window is None for window in expected]
+
+    print(f"{'conflict check':<24} {'us/check':>10}")
+    print(f"{'scan all windows':<24} {scanned * 1e6:>10.1f}")
+    print(f"{'BikeSchedule (bisect)':<24} {indexed * 1e6:>10.1f}\n")
+
+    free_times = []
+    for _ in range(20):
+        window_start = rng.randrange(0, horizon)
+        start = time.perf_counter()
+        free = sum(1 for _ in schedule.free(keys, window_start, window_start + 4 * HOUR))
+        free_times.append(time.perf_counter() - start)
+    print(f"Free bikes for a 4-hour window across the fleet: {sum(free_times) / len(free_times) * 1000:.1f} ms "
+          f"per query ({free} free in the last one)")
+
+    # One bike with the whole history shows how the check scales with the number of windows
+    busy = BikeSchedule()
+    busy_windows = list(make_windows(rng, windows))
+    busy.extend("busy", busy_windows)
+    busy_horizon = busy_windows[-1][1]
+    busy_queries = [(at, at + HOUR) for at in (rng.randrange(0, busy_horizon) for _ in range(20000))]
+    start = time.perf_counter()
+    for window_start, window_end in busy_queries:
+        busy.conflict("busy", window_start, window_end)
+    indexed = (time.perf_counter() - start) / len(busy_queries)
+    start = time.perf_counter()
+    for window_start, window_end in busy_queries[:20]:
+        scan_conflict(busy_windows, window_start, window_end)
+    scanned = (time.perf_counter() - start) / 20
+    print(f"One bike with {windows} windows: {indexed * 1e6:.1f} us per check (scan: {scanned * 1e6:.0f} us)\n")
+
+    start = time.perf_counter()
+    for key, window_start, window_end in queries[:5000]:
+        if schedule.conflict(key, window_start, window_end) is None:
+            schedule.add(key, window_start, window_end)
+            schedule.remove(key, window_start, window_end)
+    print(f"Book and cancel a window: {(time.perf_counter() - start) / 5000 * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
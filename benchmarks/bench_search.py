@@ -0,0 +1,46 @@
+"""
+Compares a filtered bike search through the inventory's indexes (BikeInventory.find) with scanning the whole fleet,
+for the query "available L road bikes up to Php 12 per hour".
+
+Run from the project root:  python -m benchmarks.bench_search [bikes]
+"""
+import sys
+import time
+
+from inventory import BikeInventory
+from benchmarks.generators import make_fleet, rented_bikes
+
+
+# A fleet with 70% of the bikes rented out
+def make_inventory(bikes):
+    return BikeInventory(make_fleet(bikes, rented=rented_bikes(bikes * 7 // 10, bikes)))
+
+
+def scan(inventory):
+    return [bike for bike in inventory if bike.available and bike.size == "L" and bike.bike_type == "Road Bike"
+            and bike.rental_price <= 12]
+
+
+def timed(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(bikes=1000000):
+    inventory = make_inventory(bikes)
+    start = time.perf_counter()
+    inventory.build_bitmaps()  # Otherwise done by the first find()
+    print(f"Built the search bitmaps for {bikes} bikes in {time.perf_counter() - start:.2f} s\n")
+
+    scan_time, expected = timed(lambda: scan(inventory))
+    find_time, found = timed(lambda: inventory.find(bike_type="Road Bike", size="L", available=True, max_price=12))
+    assert found == expected
+    print(f"{'method':<12} {'ms/query':>10}   ({len(found)} matching bikes)")
+    print(f"{'scan':<12} {scan_time * 1000:>10.2f}")
+    print(f"{'find':<12} {find_time * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,138 @@
+"""
+Load generator for the HTTP service (service.py).
+Starts the service on a fresh data directory with a large fleet, then runs N concurrent keep-alive clients that each
+rent a bike and complete it again, over and over, for a fixed number of rentals. Reports rentals per second, rent
+latency percentiles and the number of group commits, at 100 and 1000 concurrent clients by default.
+It also checks that when many clients rent the same bike at once, exactly one rental succeeds.
+
+Run from the project root:  python -m benchmarks.bench_service [rentals] [clients ...]
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import contextlib
+
+from pedalhub import PedalHub
+from service import PedalHubService
+from batch_runner import percentile
+
+
+class Client:
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @staticmethod
+    async def connect(port):
+        return Client(*await asyncio.open_connection("127.0.0.1", port))
+
+    async def post(self, path, body):
+        data = json.dumps(body).encode("utf-8")
+        self.writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        self.writer.close()
+
+
+def rent_request(bike_id):
+    return {"bike_id": bike_id, "customer_firstName": "Juan", "customer_lastName": "Cruz",
+            "customer_phone": "09171234567", "rental_hours": 2}
+
+
+async def start_service(bikes):
+    hub_class = type("BenchPedalHub", (PedalHub,), {})
+    with contextlib.redirect_stdout(io.StringIO()):
+        hub = hub_class()
+    with hub.batch_saves():
+        for i in range(bikes):
+            hub.commit("add_bike", {"bike_id": f"B{i:06d}", "bike_type": "Road Bike", "size": "L", "color": "Black",
+                                    "rental_price": 12.0})
+    hub.save_data()
+    service = PedalHubService(hub)
+    server = await service.start(port=0)
+    return service, server.sockets[0].getsockname()[1]
+
+
+async def load_test(port, service, clients, rentals, bikes):
+    latencies = []
+    remaining = [rentals]
+    rng = random.Random(clients)
+
+    async def client_loop():
+        client = await Client.connect(port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                bike_id = f"B{rng.randrange(bikes):06d}"
+                start = time.perf_counter()
+                status, _ = await client.post("/rent", rent_request(bike_id))
+                latencies.append(time.perf_counter() - start)
+                if status == 200:
+                    await client.post("/complete", {"bike_id": bike_id})
+        finally:
+            client.close()
+
+    flushes = service.flushes
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rentals_per_second": len(latencies) / seconds,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "group_commits": service.flushes - flushes,
+    }
+
+
+# Many clients rent the same bike at once; exactly one may succeed
+async def contention_check(port, clients=50):
+    connections = [await Client.connect(port) for _ in range(clients)]
+    results = await asyncio.gather(*(client.post("/rent", rent_request("B000000")) for client in connections))
+    for client in connections:
+        client.close()
+    return sum(1 for status, _ in results if status == 200)
+
+
+async def main(rentals, client_counts, bikes=20000):
+    service, port = await start_service(bikes)
+    try:
+        print(f"{bikes} bikes, {rentals} rentals per run (each followed by a completion)\n")
+        print(f"{'clients':>8} {'rentals/s':>11} {'p50 (ms)':>10} {'p99 (ms)':>10} {'group commits':>14}")
+        for clients in client_counts:
+            stats = await load_test(port, service, clients, rentals, bikes)
+            print(f"{clients:>8} {stats['rentals_per_second']:>11.0f} {stats['p50_ms']:>10.2f} {stats['p99_ms']:>10.2f} "
+                  f"{stats['group_commits']:>14}")
+        print(f"\nConcurrent rentals of one bike that succeeded: {await contention_check(port)} (expected 1)")
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    rentals = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    client_counts = [int(arg) for arg in sys.argv[2:]] or [100, 1000]
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            asyncio.run(main(rentals, client_counts))
+        finally:
+            os.chdir(cwd)
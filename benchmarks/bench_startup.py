@@ -0,0 +1,78 @@
+"""
+Startup benchmark against a large fleet and rental history.
+Writes a data directory with 100k bikes, 10k active bookings and a 1M-record history (as an old-style
+rental_history.json array and as history archive segments), then measures in a fresh process each:
+  - json.load:   the previous load_from_file of the history (json.load, then a transformed copy of the list)
+  - stream:      PedalHub.stream_from_file over the history, consuming one record at a time
+  - cold start:  importing PedalHub and PedalHub() up to the first display_main_menu(), with no inventory cache
+  - warm start:  the same, with the inventory cache written by the cold start
+reporting wall time and peak RSS.
+
+Run from the project root:  python -m benchmarks.bench_startup [records] [bikes]
+"""
+import io
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+import contextlib
+
+from benchmarks.generators import write_data, write_json_array, make_history
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Writes the data directory, and the same history as one JSON array in legacy_history.json
+def write_files(directory, records, bikes):
+    write_data(directory, bikes, bikes // 10, records)
+    write_json_array(os.path.join(directory, "legacy_history.json"), make_history(records, bikes, seed=3))
+
+
+# Runs inside the child process: performs one measurement and prints "seconds peak_rss_kb"
+def measure(mode, directory):
+    os.chdir(directory)
+    if mode == "cold start" and os.path.exists("bike_inventory.json.cache"):
+        os.remove("bike_inventory.json.cache")
+
+    start = time.perf_counter()
+    from pedalhub import PedalHub
+    if mode == "json.load":
+        with open("legacy_history.json") as file:
+            data = json.load(file)
+        data = [dict(item) for item in data]
+    elif mode == "stream":
+        for _ in PedalHub.stream_from_file("legacy_history.json", dict):
+            pass
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            PedalHub.USE_JOURNAL = False
+            hub = PedalHub()
+            hub.display_main_menu()
+    elapsed = time.perf_counter() - start
+    print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main(records=1000000, bikes=100000):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {bikes} bikes and {records} history records...")
+        write_files(directory, records, bikes)
+        size = os.path.getsize(os.path.join(directory, "legacy_history.json")) / 2 ** 20
+        print(f"History as a JSON array: {size:.1f} MiB\n")
+
+        print(f"{'mode':<12} {'seconds':>10} {'peak RSS (MiB)':>16}")
+        for mode in ("json.load", "stream", "cold start", "warm start"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--measure", mode, directory],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.split()
+            print(f"{mode:<12} {float(output[0]):>10.3f} {int(output[1]) / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main(*(int(arg) for arg in sys.argv[1:3]))
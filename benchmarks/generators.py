@@ -0,0 +1,107 @@
+"""
+Seeded generators of synthetic PedalHub data for the benchmarks: a fleet of bikes, active bookings for some of them, and a
+completed rental history, at any scale (the suite is meant for 1k to 10M records). The same arguments always give the
+same data, so results from different runs and commits are comparable. Everything is generated lazily and written to
+disk one record at a time, so large data sets never have to fit in memory.
+
+    write_data(directory, bikes=100000, bookings=10000, history=1000000)
+"""
+import os
+import json
+import random
+from datetime import datetime
+
+from bikedetails import BikeDetails
+from booking import Booking, format_time
+from history_archive import HistoryArchive
+
+TYPES = ("Road Bike", "Mountain Bike", "City Bike", "BMX", "Hybrid Bike", "Folding Bike")
+SIZES = ("XXS", "XS", "S", "M", "L", "XL", "XXL")
+COLORS = ("Black", "Red", "Blue", "White", "Green")
+FIRST_NAMES = ("Roxanne", "Juan", "Maria", "Jose", "Ana", "Pedro")
+LAST_NAMES = ("Ariola", "Santos", "Reyes", "Cruz", "Garcia", "Mendoza")
+START = datetime(2025, 1, 1).timestamp()  # Generated rentals start within the year from here
+HOUR = 3600
+
+
+# The ID of the bike with the given number; 7 digits, so up to 10M bikes sort in numeric order
+def bike_id(number):
+    return f"B{number:07d}"
+
+
+# The phone number of the customer with the given number
+def customer_phone(number):
+    return f"09{number:09d}"
+
+
+# Returns the numbers of the bikes that are rented out: a seeded random sample of the fleet, in ascending order
+def rented_bikes(bookings, bikes, seed=2):
+    return sorted(random.Random(seed).sample(range(bikes), min(bookings, bikes)))
+
+
+"""
+Yields the fleet as BikeDetails, numbered from 0: random type, size, color and an hourly price from Php 5 to 30. The
+bikes whose numbers are in rented (e.g. from rented_bikes()) are not available.
+"""
+def make_fleet(count, seed=1, rented=()):
+    rng = random.Random(seed)
+    rented = set(rented)
+    for number in range(count):
+        yield BikeDetails(bike_id(number), rng.choice(TYPES), rng.choice(SIZES), rng.choice(COLORS),
+                          float(rng.randrange(5, 31)), number not in rented)
+
+
+# One rental of a random bike and customer: (first name, last name, phone, bike number, hours, start timestamp)
+def make_rental(rng, bikes, customers):
+    return (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), customer_phone(rng.randrange(customers)), rng.randrange(bikes),
+            rng.choice((1, 2, 2, 3, 4, 6, 8, 24)), START + rng.randrange(365 * 24) * HOUR)
+
+
+# Yields an active Booking (started at a random time in the generated year) for each of the given bike numbers
+def make_bookings(bike_numbers, seed=2, customers=None):
+    rng = random.Random(seed)
+    bike_numbers = list(bike_numbers)
+    customers = customers or max(1000, len(bike_numbers) // 5)
+    for number in bike_numbers:
+        first_name, last_name, phone, _, hours, start = make_rental(rng, 1, customers)
+        yield Booking(first_name, last_name, phone, bike_id(number), hours, hours * 12.0, "Active", format_time(start),
+                      format_time(start + hours * HOUR))
+
+
+# Yields completed rentals as history records (dictionaries, as stored in the history archive)
+def make_history(count, bikes, seed=3, customers=None):
+    rng = random.Random(seed)
+    customers = customers or max(1000, count // 5)
+    for _ in range(count):
+        first_name, last_name, phone, number, hours, start = make_rental(rng, bikes, customers)
+        yield Booking(first_name, last_name, phone, bike_id(number), hours, hours * 12.0, "Completed", format_time(start),
+                      format_time(start + hours * HOUR)).to_dict()
+
+
+# Writes records (dictionaries) as a JSON array with one record per line, the way large data files are streamed back
+def write_json_array(filename, records):
+    with open(filename, "w") as file:
+        file.write("[")
+        for i, record in enumerate(records):
+            file.write((",\n" if i else "\n") + json.dumps(record))
+        file.write("\n]\n")
+
+
+"""
+Writes a complete PedalHub data directory: BIKE_FILE with the fleet, BOOKINGS_FILE with active bookings for a random
+sample of the bikes (which are therefore unavailable), and the history archive in HISTORY_DIR. The file names are the
+PedalHub defaults.
+"""
+def write_data(directory, bikes, bookings=0, history=0, seed=0):
+    rented = rented_bikes(bookings, bikes, seed + 2)
+    write_json_array(os.path.join(directory, "bike_inventory.json"),
+                     (bike.to_dict() for bike in make_fleet(bikes, seed + 1, rented)))
+    write_json_array(os.path.join(directory, "bookings.json"),
+                     (booking.to_dict() for booking in make_bookings(rented, seed + 2)))
+
+    archive = HistoryArchive(os.path.join(directory, "rental_history"))
+    for record in make_history(history, bikes, seed + 3):
+        archive.append(record)
+        if len(archive.pending) >= 100000:
+            archive.flush()
+    archive.flush()
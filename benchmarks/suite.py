@@ -0,0 +1,205 @@
+"""
+Benchmark suite for regressions. Generates a seeded data directory (benchmarks/generators.py) at the given scale and
+runs each scenario in a fresh process against it, recording wall time and the process's peak RSS:
+
+  - startup:        PedalHub() (load_data) up to the first display_main_menu()
+  - lookups:        bike by ID, active booking by bike, bookings by phone, and a filtered search (BikeInventory.find)
+  - view_bikes:     rendering pages of the bike list
+  - <op> + save:    rent, complete, add_bike and delete_bike, each through PedalHub.commit followed by save_data()
+
+Each run is appended as one JSON line to the results file (with the git commit, the scale and every measurement), and
+--compare prints the last two runs at the same scale side by side, e.g. before and after a change.
+
+Run from the project root:  python -m benchmarks.suite [bikes] [history] [--results FILE] [--compare]
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import builtins
+import resource
+import tempfile
+import platform
+import subprocess
+import contextlib
+
+from benchmarks.generators import write_data, bike_id, customer_phone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results.jsonl")
+SCENARIOS = ("startup", "lookups", "view_bikes", "mutations")  # Mutations last: they change the data directory
+LOOKUPS = 100000    # Lookups of each kind
+PAGES = 200         # Pages of the bike list to render
+MUTATIONS = 20      # Operations of each kind, each followed by save_data()
+
+
+def load_hub():
+    from pedalhub import PedalHub
+    with contextlib.redirect_stdout(io.StringIO()):
+        hub = PedalHub()
+    hub.clear_screen = lambda: None
+    return hub
+
+
+# Returns the average seconds per call of function() over the given arguments
+def per_call(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def measure_startup(bikes):
+    start = time.perf_counter()
+    hub = load_hub()
+    with contextlib.redirect_stdout(io.StringIO()):
+        hub.display_main_menu()
+    return {"seconds": time.perf_counter() - start}
+
+
+def measure_lookups(bikes):
+    hub = load_hub()
+    rng = random.Random(5)
+    ids = [bike_id(rng.randrange(bikes)) for _ in range(LOOKUPS)]
+    phones = [customer_phone(rng.randrange(1000)) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    hub.bike_inventory.find(bike_type="Road Bike")  # The first search builds the indexes
+    first_find = time.perf_counter() - start
+    searches = [dict(bike_type=rng.choice(("Road Bike", "BMX")), size=rng.choice(("M", "L")), available=True,
+                     max_price=rng.randrange(8, 20)) for _ in range(100)]
+    return {
+        "get_us": per_call(hub.bike_inventory.get, ids) * 1e6,
+        "active_for_bike_us": per_call(hub.booking_index.active_for_bike, ids) * 1e6,
+        "for_phone_us": per_call(hub.booking_index.for_phone, phones) * 1e6,
+        "first_find_ms": first_find * 1000,
+        "find_ms": per_call(lambda search: hub.bike_inventory.find(**search), searches) * 1000,
+    }
+
+
+def measure_view_bikes(bikes):
+    hub = load_hub()
+    pages = min(PAGES, (bikes + hub.PAGE_SIZE - 1) // hub.PAGE_SIZE)
+    shown = [0]
+
+    def next_page(prompt=""):
+        shown[0] += 1
+        return "q" if shown[0] >= pages else ""
+
+    builtins.input = next_page
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        hub.view_bikes()
+    return {"pages": pages, "ms_per_page": (time.perf_counter() - start) / pages * 1000}
+
+
+def measure_mutations(bikes):
+    hub = load_hub()
+    rng = random.Random(6)
+    free = [bike.bike_id for bike in hub.bike_inventory.find(available=True)]
+    rented = rng.sample(free, min(MUTATIONS, len(free)))
+    operations = (
+        ("rent", [{"customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": "09171234567",
+                   "bike_id": bike, "rental_hours": 2, "total_cost": 24.0, "status": "Active"} for bike in rented]),
+        ("complete", [{"bike_id": bike} for bike in rented]),
+        ("add_bike", [{"bike_id": f"N{i:07d}", "bike_type": "Road Bike", "size": "L", "color": "Black", "rental_price": 12.0}
+                      for i in range(MUTATIONS)]),
+        ("delete_bike", [{"bike_id": f"N{i:07d}"} for i in range(MUTATIONS)]),
+    )
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for op, records in operations:
+            def commit_and_save(data):
+                hub.commit(op, data)
+                hub.save_data()
+            results[f"{op}_save_ms"] = per_call(commit_and_save, records) * 1000
+    return results
+
+
+# Runs inside the child process: runs one scenario and prints its measurements, with the peak RSS, as JSON
+def measure(scenario, directory, bikes):
+    os.chdir(directory)
+    result = globals()[f"measure_{scenario}"](bikes)
+    result["peak_rss_mib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    sys.__stdout__.write(json.dumps(result) + "\n")
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        changed = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+changes" if changed else "")
+
+
+def print_run(run):
+    print(f"{'scenario':<12} {'measurement':<22} {'value':>12}")
+    for scenario, result in run["results"].items():
+        for name, value in result.items():
+            print(f"{scenario:<12} {name:<22} {value:>12.3f}")
+
+
+# Prints the last two runs in the results file at the same scale as the last one, with the change in percent
+def compare(results_file):
+    with open(results_file) as file:
+        runs = [json.loads(line) for line in file if line.strip()]
+    if not runs:
+        print("No results yet.")
+        return
+    latest = runs[-1]
+    earlier = [run for run in runs[:-1] if run["scale"] == latest["scale"]]
+    if not earlier:
+        print(f"Only one run at this scale ({latest['scale']}).")
+        print_run(latest)
+        return
+    before = earlier[-1]
+    print(f"Scale {latest['scale']}: {before['commit']} ({before['date']}) -> {latest['commit']} ({latest['date']})\n")
+    print(f"{'scenario':<12} {'measurement':<22} {'before':>12} {'after':>12} {'change':>9}")
+    for scenario, result in latest["results"].items():
+        for name, value in result.items():
+            old = before["results"].get(scenario, {}).get(name)
+            change = f"{(value - old) / old:+.1%}" if old else ""
+            old = f"{old:.3f}" if old is not None else "-"
+            print(f"{scenario:<12} {name:<22} {old:>12} {value:>12.3f} {change:>9}")
+
+
+def main(bikes=100000, history=1000000, results_file=RESULTS_FILE):
+    bookings = bikes // 10
+    run = {"commit": git_commit(), "date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+           "scale": {"bikes": bikes, "bookings": bookings, "history": history}, "results": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        write_data(directory, bikes, bookings, history)
+        print(f"Generated {bikes} bikes, {bookings} active bookings and {history} history records "
+              f"in {time.perf_counter() - start:.1f} s\n")
+        for scenario in SCENARIOS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.suite", "--measure", scenario, directory, str(bikes)],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout
+            run["results"][scenario] = json.loads(output.splitlines()[-1])
+
+    print_run(run)
+    with open(results_file, "a") as file:
+        file.write(json.dumps(run) + "\n")
+    print(f"\nResults appended to {results_file}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        arguments = sys.argv[1:]
+        results_file = RESULTS_FILE
+        if "--results" in arguments:
+            position = arguments.index("--results")
+            results_file = arguments[position + 1]
+            del arguments[position:position + 2]
+        if "--compare" in arguments:
+            compare(results_file)
+        else:
+            main(*(int(arg) for arg in arguments[:2]), results_file=results_file)
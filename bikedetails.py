@@ -3,7 +3,9 @@ A class representing the details of a bike in a rental system. This class holds
 to calculate rental costs and to convert the bike's details to and from dictionary format for storage or retrieval.
 """
 class BikeDetails:
-    
+    # Slots instead of a per-instance __dict__ keep each bike small when the fleet is large
+    __slots__ = ("bike_id", "bike_type", "size", "color", "rental_price", "available")
+
     def __init__(self, bike_id, bike_type, size, color, rental_price, available=True):
         self.bike_id = bike_id
         self.bike_type = bike_type
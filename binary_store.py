@@ -0,0 +1,220 @@
+import os
+import sys
+import mmap
+import json
+import struct
+
+from json_stream import iter_json_array
+
+"""
+A compact binary file format for PedalHub's data files, read through mmap.
+
+Layout (little-endian):
+    header   magic b"PHUB", version (u16), field count (u16), row count (u64)
+    fields   per field: type code (1 byte: s = string, d = number, ? = boolean), name length (u16), name (UTF-8)
+    offsets  row count + 1 absolute file offsets (u64); row i is stored between offsets i and i + 1
+    rows     per field: string = length (u32) + UTF-8 bytes, number = f64, boolean = 1 byte
+             (a missing string is stored as length 0xFFFFFFFF and read back as None)
+
+The file describes its own fields, so the same format is used for bikes, bookings and history. Opening a file only reads
+the header; a row is decoded when it is accessed, so a file with millions of rows can be opened without parsing it.
+Numbers are stored as floats (a rental of 3 hours is read back as 3.0), and a missing number (None) is stored as NaN and
+read back as NaN, not None.
+A file that is cut short or damaged raises ValueError when it is opened, like a JSON file that cannot be parsed.
+"""
+MAGIC = b"PHUB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+OFFSET = struct.Struct("<Q")
+STRING_LENGTH = struct.Struct("<I")
+NUMBER = struct.Struct("<d")
+NULL_LENGTH = 0xFFFFFFFF
+BINARY_EXTENSION = ".bin"
+
+
+# Returns True if the file name selects the binary format instead of JSON
+def is_binary_file(filename):
+    return filename.endswith(BINARY_EXTENSION)
+
+
+class BinaryTable:
+
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file cannot be mapped
+            self.file.close()
+            raise ValueError(f"{filename} is empty, not a PedalHub binary file.") from None
+        try:
+            magic, version, field_count, self.row_count = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{filename} is not a PedalHub binary file.")
+
+            self.fields = []  # (name, type code)
+            position = HEADER.size
+            for _ in range(field_count):
+                code = chr(self.map[position])
+                length = struct.unpack_from("<H", self.map, position + 1)[0]
+                name = self.map[position + 3:position + 3 + length].decode("utf-8")
+                self.fields.append((name, code))
+                position += 3 + length
+            self.offsets_start = position
+            # write_table() ends the file exactly where the last row ends, so this catches a file that was cut short
+            if OFFSET.unpack_from(self.map, position + self.row_count * OFFSET.size)[0] != len(self.map):
+                raise ValueError(f"{filename} is truncated.")
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            self.close()
+            raise ValueError(f"{filename} is damaged: {e}") from None
+        except ValueError:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.row_count
+
+    # Decodes and returns row i as a dictionary
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.row_count
+        if not 0 <= row < self.row_count:
+            raise IndexError("row index out of range")
+        position = OFFSET.unpack_from(self.map, self.offsets_start + row * OFFSET.size)[0]
+        record = {}
+        for name, code in self.fields:
+            if code == "s":
+                length = STRING_LENGTH.unpack_from(self.map, position)[0]
+                position += STRING_LENGTH.size
+                if length == NULL_LENGTH:
+                    record[name] = None
+                    continue
+                record[name] = self.map[position:position + length].decode("utf-8")
+                position += length
+            elif code == "d":
+                record[name] = NUMBER.unpack_from(self.map, position)[0]
+                position += NUMBER.size
+            else:
+                record[name] = self.map[position] != 0
+                position += 1
+        return record
+
+    def __iter__(self):
+        for row in range(self.row_count):
+            yield self[row]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+"""
+Works out the fields and their types (booleans, numbers (int or float) and strings) from the records. Records written by
+older versions can lack newer fields, so every field that appears in any record is included; its type comes from its
+first value that is not None (a field that is always None is stored as a string).
+"""
+def infer_fields(records):
+    types = {}
+    known_keys = None
+    for record in records:
+        if known_keys is not None and record.keys() == known_keys:
+            continue  # Same fields as the previous record, all with known types
+        for name, value in record.items():
+            if types.get(name) is None:
+                if value is None:
+                    types[name] = None
+                elif isinstance(value, bool):
+                    types[name] = "?"
+                elif isinstance(value, (int, float)):
+                    types[name] = "d"
+                else:
+                    types[name] = "s"
+        known_keys = record.keys() if None not in types.values() else None
+    return [(name, code or "s") for name, code in types.items()]
+
+
+def encode_row(fields, record):
+    parts = []
+    for name, code in fields:
+        value = record.get(name)
+        if code == "s":
+            if value is None:
+                parts.append(STRING_LENGTH.pack(NULL_LENGTH))
+                continue
+            data = str(value).encode("utf-8")
+            parts.append(STRING_LENGTH.pack(len(data)))
+            parts.append(data)
+        elif code == "d":
+            parts.append(NUMBER.pack(float("nan") if value is None else value))  # None comes back as NaN
+        else:
+            parts.append(b"\x01" if value else b"\x00")
+    return b"".join(parts)
+
+
+"""
+Writes a list of dictionaries (all with the same keys) to a binary file. The file is written to a temporary file and
+renamed into place, so readers that still have the old file mapped are not affected.
+"""
+def write_table(filename, records):
+    records = list(records)
+    fields = infer_fields(records)
+    rows = [encode_row(fields, record) for record in records]
+
+    header = [HEADER.pack(MAGIC, VERSION, len(fields), len(rows))]
+    for name, code in fields:
+        data = name.encode("utf-8")
+        header.append(code.encode("ascii") + struct.pack("<H", len(data)) + data)
+    header = b"".join(header)
+
+    offsets = []
+    position = len(header) + (len(rows) + 1) * OFFSET.size
+    for row in rows:
+        offsets.append(OFFSET.pack(position))
+        position += len(row)
+    offsets.append(OFFSET.pack(position))
+
+    temp_file = filename + ".tmp"
+    with open(temp_file, "wb") as file:
+        file.write(header)
+        file.write(b"".join(offsets))
+        for row in rows:
+            file.write(row)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, filename)
+
+
+# Yields the records of a JSON array file or a binary file, depending on the file name
+def iter_records(filename):
+    if is_binary_file(filename):
+        table = BinaryTable(filename)
+        try:
+            yield from table
+        finally:
+            table.close()
+    else:
+        with open(filename, "r") as file:
+            yield from iter_json_array(file)
+
+
+"""
+Converts a data file between JSON and the binary format, e.g.
+    python binary_store.py bike_inventory.json bike_inventory.bin
+    python binary_store.py bookings.bin bookings.json
+The format of each file is chosen by its extension (.bin is binary, anything else is JSON).
+"""
+def convert(source, target):
+    records = list(iter_records(source))
+    if is_binary_file(target):
+        write_table(target, records)
+    else:
+        with open(target, "w") as file:
+            json.dump(records, file, indent=4)
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python binary_store.py SOURCE TARGET")
+        sys.exit(1)
+    count = convert(sys.argv[1], sys.argv[2])
+    print(f"Converted {count} records from {sys.argv[1]} to {sys.argv[2]}.")
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+OPEN_STATUSES = ("Active", "Reserved")  # Bookings that still hold their bike: rented out now, or reserved for later
+TIME_FORMAT = "%Y-%m-%d %H:%M"           # How start and end times are entered and shown
+
+
+# Converts a time as stored in a booking ("YYYY-MM-DD HH:MM[:SS]") to a POSIX timestamp
+def parse_time(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+# Converts a POSIX timestamp to the text stored in a booking
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(sep=" ", timespec="seconds")
+
+
+"""
+A class representing a single rental booking made by a customer. Bookings used to be plain dictionaries; this class keeps the
+same fields in __slots__ (no per-instance __dict__) and converts to and from the dictionary format used in the data files.
+A booking is "Active" while the bike is rented out, "Reserved" if it was booked in advance and not picked up yet, and
+"Completed" once the bike is returned. start_time and end_time give the booked time window (None for bookings made
+before bookings had times).
+"""
+class Booking:
+    __slots__ = ("customer_firstName", "customer_lastName", "customer_phone", "bike_id", "rental_hours", "total_cost", "status",
+                 "start_time", "end_time")
+
+    def __init__(self, customer_firstName, customer_lastName, customer_phone, bike_id, rental_hours, total_cost, status="Active",
+                 start_time=None, end_time=None):
+        self.customer_firstName = customer_firstName
+        self.customer_lastName = customer_lastName
+        self.customer_phone = customer_phone
+        self.bike_id = bike_id
+        self.rental_hours = rental_hours
+        self.total_cost = total_cost
+        self.status = status
+        self.start_time = start_time
+        self.end_time = end_time
+
+    # Returns the booked time window as (start, end) POSIX timestamps, or None if the booking has no times
+    def window(self):
+        if not self.start_time or not self.end_time:
+            return None
+        return parse_time(self.start_time), parse_time(self.end_time)
+
+    # Used to convert the booking into a dictionary for storing it in files
+    def to_dict(self):
+        return {
+            "customer_firstName": self.customer_firstName,
+            "customer_lastName": self.customer_lastName,
+            "customer_phone": self.customer_phone,
+            "bike_id": self.bike_id,
+            "rental_hours": self.rental_hours,
+            "total_cost": self.total_cost,
+            "status": self.status,
+            "start_time": self.start_time,
+            "end_time": self.end_time
+        }
+
+    # Creates a Booking from a dictionary read from a file
+    @staticmethod
+    def from_dict(data):
+        return Booking(
+            customer_firstName=data["customer_firstName"],
+            customer_lastName=data["customer_lastName"],
+            customer_phone=data["customer_phone"],
+            bike_id=data["bike_id"],
+            rental_hours=data["rental_hours"],
+            total_cost=data["total_cost"],
+            status=data.get("status", "Active"),  # Default to Active if 'status' key is missing
+            start_time=data.get("start_time"),
+            end_time=data.get("end_time")
+        )
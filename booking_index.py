@@ -0,0 +1,102 @@
+from inventory import BikeInventory
+from schedule import BikeSchedule
+
+"""
+Secondary indexes over PedalHub's bookings: the active booking of each bike, the reservations of each bike, the open
+bookings of each customer phone number, and the booked time windows of every bike (see BikeSchedule). Completed bookings
+leave every index, as they leave PedalHub.bookings for the history archive (see PedalHub.customer_bookings).
+The indexes hold references to the same Booking objects that live in PedalHub.bookings, so they must be updated whenever a
+booking is added, started, completed or removed. This keeps completion and customer lookups O(1) no matter how many bookings
+exist.
+"""
+class BookingIndex:
+
+    def __init__(self, bookings=()):
+        self.active_by_bike = {}  # Case-folded bike_id -> active booking
+        self.reserved_by_bike = {}  # Case-folded bike_id -> reservations, earliest first
+        self.by_phone = {}        # customer_phone -> list of open bookings
+        self.schedule = BikeSchedule()  # Time windows of the active and reserved bookings
+        windows = {}
+        for booking in bookings:
+            self.add(booking, windows)
+        for key, bike_windows in windows.items():
+            self.schedule.extend(key, bike_windows)
+
+    # Indexes a booking. While loading, its time window is collected in windows instead, to be added in bulk.
+    def add(self, booking, windows=None):
+        key = BikeInventory.key(booking.bike_id)
+        if booking.status == 'Active':
+            self.active_by_bike.setdefault(key, booking)
+        elif booking.status == 'Reserved':
+            reservations = self.reserved_by_bike.setdefault(key, [])
+            reservations.append(booking)
+            reservations.sort(key=lambda reserved: reserved.start_time or "")
+        if booking.status in ('Active', 'Reserved'):
+            window = booking.window()
+            if window is not None:
+                if windows is None:
+                    self.schedule.add(key, *window)
+                else:
+                    windows.setdefault(key, []).append(window)
+        self.by_phone.setdefault(booking.customer_phone, []).append(booking)
+
+    # Called after a reservation's status has changed from Reserved to Active (the bike was picked up)
+    def start(self, booking):
+        key = BikeInventory.key(booking.bike_id)
+        reservations = self.reserved_by_bike.get(key, [])
+        for i, reserved in enumerate(reservations):
+            if reserved is booking:
+                del reservations[i]
+                break
+        if not reservations:
+            self.reserved_by_bike.pop(key, None)
+        self.active_by_bike.setdefault(key, booking)
+
+    # Called after a booking's status has changed from Active to Completed; its bike is no longer booked
+    def complete(self, booking):
+        key = BikeInventory.key(booking.bike_id)
+        if self.active_by_bike.get(key) is booking:
+            del self.active_by_bike[key]
+        reservations = self.reserved_by_bike.get(key, [])
+        for i, reserved in enumerate(reservations):
+            if reserved is booking:
+                del reservations[i]
+                break
+        if not reservations:
+            self.reserved_by_bike.pop(key, None)
+        window = booking.window()
+        if window is not None:
+            self.schedule.remove(key, *window)
+
+    # Called when a booking leaves the bookings (completed and archived, or deleted)
+    def remove(self, booking):
+        self.complete(booking)
+        phone_bookings = self.by_phone.get(booking.customer_phone, [])
+        for i, indexed in enumerate(phone_bookings):
+            if indexed is booking:
+                del phone_bookings[i]
+                break
+        if not phone_bookings:
+            self.by_phone.pop(booking.customer_phone, None)
+
+    # Returns the active booking for the bike, or None if the bike is not rented out
+    def active_for_bike(self, bike_id):
+        return self.active_by_bike.get(BikeInventory.key(bike_id))
+
+    # Returns the bike's earliest reservation that has not been picked up, or None
+    def next_reservation(self, bike_id):
+        reservations = self.reserved_by_bike.get(BikeInventory.key(bike_id))
+        return reservations[0] if reservations else None
+
+    # Returns the (start, end) timestamps of the bike's booking that overlaps [start, end), or None if the bike is free then
+    def conflict(self, bike_id, start, end):
+        return self.schedule.conflict(BikeInventory.key(bike_id), start, end)
+
+    # Returns the bikes (of the given bikes, in the same order) that are not booked at any time in [start, end)
+    def free_bikes(self, bikes, start, end):
+        by_key = {BikeInventory.key(bike.bike_id): bike for bike in bikes}
+        return [by_key[key] for key in self.schedule.free(by_key, start, end)]
+
+    # Returns the open (active and reserved) bookings made with the given phone number
+    def for_phone(self, customer_phone):
+        return list(self.by_phone.get(customer_phone.strip(), []))
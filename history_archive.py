@@ -0,0 +1,126 @@
+import os
+import json
+from history_columns import HistoryColumns
+from binary_store import BinaryTable, write_table
+
+"""
+Stores completed rentals on disk in size-partitioned segment files instead of keeping the whole rental history in memory.
+New records are buffered and appended to the newest segment on flush(); a new segment is started every SEGMENT_SIZE records.
+Reading the history streams the segments one record at a time.
+
+Segments are either JSON lines ("jsonl", one compact record per line) or the binary format of binary_store.py ("bin"),
+which is read through mmap and decoded row by row. Both kinds can be mixed in one archive, so changing the format only
+affects new segments.
+"""
+class HistoryArchive:
+    SEGMENT_SIZE = 10000  # Number of records per segment file
+
+    def __init__(self, directory, segment_format="jsonl"):
+        self.directory = directory
+        self.segment_format = segment_format
+        self.pending = []          # Completed rentals not yet written to a segment
+        self.segment_count = 0     # Records in the newest segment
+        self.segment_number = 0    # Number of the newest segment (0 if there are no segments yet)
+        self.refresh()
+
+    # Finds the newest segment and its size again (e.g. after another process has added to the archive)
+    def refresh(self):
+        segments = self.segments()
+        self.segment_number = len(segments)
+        self.segment_count = 0
+        if segments:
+            self.segment_count = self.count_records(segments[-1])
+            if not segments[-1].endswith("." + self.segment_format):
+                self.segment_count = self.SEGMENT_SIZE  # Start a new segment in the configured format
+
+    def segment_file(self, number):
+        return os.path.join(self.directory, f"history-{number:06d}.{self.segment_format}")
+
+    # Returns the paths of the segment files, oldest first
+    def segments(self):
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith("history-") and name.endswith((".jsonl", ".bin")))
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def count_records(segment):
+        if segment.endswith(".bin"):
+            table = BinaryTable(segment)
+            count = len(table)
+            table.close()
+            return count
+        with open(segment, "rb") as file:
+            return sum(1 for _ in file)
+
+    @staticmethod
+    def read_segment(segment):
+        if segment.endswith(".bin"):
+            table = BinaryTable(segment)
+            try:
+                yield from table
+            finally:
+                table.close()
+            return
+        with open(segment, "r") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    # Queues a completed rental to be archived on the next flush
+    def append(self, record):
+        self.pending.append(record)
+
+    # Writes the queued records to the segment files. Returns the number of bytes written.
+    def flush(self):
+        if not self.pending:
+            return 0
+        written = 0
+        os.makedirs(self.directory, exist_ok=True)
+        start = 0
+        while start < len(self.pending):
+            if self.segment_number == 0 or self.segment_count >= self.SEGMENT_SIZE:
+                self.segment_number += 1
+                self.segment_count = 0
+            end = min(len(self.pending), start + self.SEGMENT_SIZE - self.segment_count)
+            segment = self.segment_file(self.segment_number)
+            if self.segment_format == "bin":
+                # Binary segments have an offset table, so the (at most SEGMENT_SIZE records) segment is rewritten
+                existing = list(self.read_segment(segment)) if os.path.exists(segment) else []
+                write_table(segment, existing + self.pending[start:end])
+                written += os.path.getsize(segment)
+            else:
+                with open(segment, "a") as file:
+                    for record in self.pending[start:end]:
+                        written += file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+            self.segment_count += end - start
+            start = end
+        self.pending = []
+        return written
+
+    """
+    Removes what flush() wrote after the archive had the given number of segments and its newest segment the given size
+    in bytes (see JsonStorage.begin_save). Newer segments are deleted and a JSON lines segment is cut back to its old
+    size; a binary segment is rewritten as a whole by flush(), so the caller restores its old file instead.
+    """
+    def truncate(self, segments, size):
+        existing = self.segments()
+        for segment in existing[segments:]:
+            os.remove(segment)
+        if segments and size is not None and existing[segments - 1].endswith(".jsonl"):
+            with open(existing[segments - 1], "r+b") as file:
+                file.truncate(size)
+        self.refresh()
+
+    # Lazily yields every archived record, oldest first, followed by the records not yet flushed
+    def __iter__(self):
+        for segment in self.segments():
+            yield from self.read_segment(segment)
+        yield from list(self.pending)
+
+    # Loads the whole history into a compact columnar store (see HistoryColumns) for reporting
+    def to_columns(self):
+        return HistoryColumns(self)
@@ -0,0 +1,130 @@
+import sys
+from array import array
+from itertools import islice
+from operator import itemgetter
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)  # Booked times are stored as seconds from here, in the same (local) time as the records
+NO_TIME = float("nan")        # Stored for rentals made before bookings had times
+
+"""
+A column of strings stored as integer codes into a table of unique (interned) values.
+Columns such as bike IDs, phone numbers and statuses repeat the same few values across many rows, so each row costs
+4 bytes instead of a reference to its own string object. Codes are given in order of first appearance.
+"""
+class StringColumn:
+
+    def __init__(self):
+        self.values = []          # code -> string
+        self.codes_by_value = {}  # string -> code
+        self.codes = array("I")   # One code per row
+
+    def append(self, value):
+        code = self.codes_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes_by_value[value] = code
+        self.codes.append(code)
+
+    # Appends many values at once; as with append(), new values are interned and coded in order of first appearance
+    def extend(self, values):
+        values = list(values)
+        codes_by_value = self.codes_by_value
+        new_values = set(values).difference(codes_by_value)
+        if new_values:
+            for value in dict.fromkeys(values):  # The distinct values, in order
+                if value in new_values:
+                    value = sys.intern(value)
+                    codes_by_value[value] = len(self.values)
+                    self.values.append(value)
+        self.codes.extend(map(codes_by_value.__getitem__, values))
+
+    # Removes every row, but keeps the values, so rows added later get the same codes as before
+    def clear(self):
+        self.codes = array("I")
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+"""
+A columnar, array-backed store for rental history records. Prices and hours are kept in typed double arrays, the booked
+start and end times as seconds in double arrays (NaN if the rental has no times) and the string fields in StringColumns,
+instead of one dictionary per record. Rows can be read back as dictionaries. RentalReports reads the columns as NumPy
+arrays without copying them.
+"""
+class HistoryColumns:
+    STRING_FIELDS = ("customer_firstName", "customer_lastName", "customer_phone", "bike_id", "status")
+    NUMBER_FIELDS = ("rental_hours", "total_cost")
+    TIME_FIELDS = ("start_time", "end_time")
+    CHUNK_SIZE = 65536  # Records are read this many at a time, so a streamed history is never all in memory as dictionaries
+
+    def __init__(self, records=()):
+        self.strings = {field: StringColumn() for field in self.STRING_FIELDS}
+        self.numbers = {field: array("d") for field in self.NUMBER_FIELDS}
+        self.times = {field: array("d") for field in self.TIME_FIELDS}
+        self.seconds_by_time = {}  # Recently seen booked times -> encode_time(); rentals share a few start and end times
+        records = iter(records)
+        chunk = list(islice(records, self.CHUNK_SIZE))
+        while chunk:
+            self.extend(chunk)
+            chunk = list(islice(records, self.CHUNK_SIZE))
+
+    # Converts a booked time ("YYYY-MM-DD HH:MM[:SS]" or None) to the number stored for it
+    @staticmethod
+    def encode_time(text):
+        return NO_TIME if text is None else (datetime.fromisoformat(text) - EPOCH).total_seconds()
+
+    @staticmethod
+    def decode_time(seconds):
+        return None if seconds != seconds else (EPOCH + timedelta(seconds=seconds)).isoformat(sep=" ", timespec="seconds")
+
+    def append(self, record):
+        self.extend((record,))
+
+    # Appends a list of records, one column at a time
+    def extend(self, records):
+        for field, column in self.strings.items():
+            if field == "status":  # Every rental in the history is completed, unless its record says otherwise
+                column.extend([record.get("status", "Completed") for record in records])
+            else:
+                column.extend(map(itemgetter(field), records))
+        for field, column in self.numbers.items():
+            column.extend(map(itemgetter(field), records))
+        seconds = self.seconds_by_time
+        if len(seconds) > self.CHUNK_SIZE:
+            seconds.clear()
+        for field, column in self.times.items():
+            texts = [record.get(field) for record in records]
+            for text in set(texts).difference(seconds):  # Each distinct time is parsed once
+                seconds[text] = self.encode_time(text)
+            column.extend(map(seconds.__getitem__, texts))
+
+    # Removes every row; codes of the string columns stay the same for rows added later (see StringColumn.clear)
+    def clear(self):
+        for column in self.strings.values():
+            column.clear()
+        for columns in (self.numbers, self.times):
+            for field in columns:
+                columns[field] = array("d")
+
+    def __len__(self):
+        return len(self.numbers["total_cost"])
+
+    # Returns the record at the given row as a dictionary
+    def __getitem__(self, row):
+        record = {field: column[row] for field, column in self.strings.items()}
+        for field, column in self.numbers.items():
+            record[field] = column[row]
+        for field, column in self.times.items():
+            record[field] = self.decode_time(column[row])
+        return record
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
@@ -0,0 +1,198 @@
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
+from itertools import starmap
+from bikedetails import BikeDetails
+
+"""
+A container for the bike inventory that keeps a case-insensitive bike_id -> BikeDetails index.
+Bikes are kept in insertion order (the order they are shown and saved in), while lookups, deletions and
+availability changes by bike ID take O(1) instead of scanning the whole fleet.
+
+For browsing, every bike also gets a slot number, and for each value of the bike type, size, color, availability and
+rental price the inventory keeps a bitmap (a Python int) with the bits of the bikes that have that value. find() answers
+a filtered query by and-ing a few bitmaps, which works on whole machine words at a time, instead of checking each bike.
+The bitmaps are built on the first search (so loading the inventory does not pay for them) and from then on are updated
+by add(), remove() and set_available(), which is how every change to the inventory is made.
+"""
+class BikeInventory:
+    FILTERS = ("bike_type", "size", "color", "available", "rental_price")  # Bike attributes that have bitmaps
+
+    def __init__(self, bikes=()):
+        self.bikes = {}      # Case-folded bike_id -> BikeDetails
+        self.slots = []      # Slot number -> case-folded bike_id (None for removed bikes), in insertion order
+        self.slot = {}       # Case-folded bike_id -> slot number
+        self.bitmaps = None  # Attribute -> value -> bitmap of slot numbers; None until the first search
+        self.prices = []     # Distinct rental prices in ascending order, for price ranges
+        for bike in bikes:
+            if self.key(bike.bike_id) in self.bikes:
+                print(f"Duplicate Bike ID {bike.bike_id} found in inventory. Keeping the first entry.")
+                continue
+            self.add(bike)
+
+    # Normalizes a bike ID so that lookups ignore case and surrounding spaces
+    @staticmethod
+    def key(bike_id):
+        return bike_id.strip().casefold()
+
+    # Normalizes an attribute value the same way, so that filters ignore case ("road bike" finds "Road Bike")
+    @staticmethod
+    def index_value(value):
+        return value.strip().casefold() if isinstance(value, str) else value
+
+    """
+    Numbers the bikes in inventory order and builds every bitmap. Each attribute is first encoded as one byte per bike
+    (a code per distinct value), and the bitmap of a value is then made from those bytes with bytes.translate, so the
+    work per bike happens in C. Attributes with more than 255 distinct values are indexed one bike at a time.
+    """
+    def build_bitmaps(self):
+        bikes = list(self.bikes.values())
+        self.slots = list(self.bikes)
+        self.slot = {key: slot for slot, key in enumerate(self.slots)}
+        self.bitmaps = {name: {} for name in self.FILTERS}
+        for name in self.FILTERS:
+            codes = {}
+            try:
+                column = bytes(map(lambda value: codes.setdefault(value, len(codes)), map(attrgetter(name), bikes)))
+            except ValueError:
+                self.build_bitmaps_slowly(name, bikes)
+                continue
+            tables = {}  # Values that are equal ignoring case share one bitmap
+            for value, code in codes.items():
+                table = tables.setdefault(self.index_value(value), bytearray(b"0" * 256))
+                table[code] = ord("1")
+            for value, table in tables.items():
+                self.bitmaps[name][value] = int(column.translate(table)[::-1], 2)
+        self.prices = sorted(self.bitmaps["rental_price"])
+
+    def build_bitmaps_slowly(self, name, bikes):
+        slots = {}
+        for slot, bike in enumerate(bikes):
+            slots.setdefault(self.index_value(getattr(bike, name)), []).append(slot)
+        for value, value_slots in slots.items():
+            bits = bytearray((len(bikes) + 7) // 8)
+            for slot in value_slots:
+                bits[slot >> 3] |= 1 << (slot & 7)
+            self.bitmaps[name][value] = int.from_bytes(bits, "little")
+
+    def __iter__(self):
+        return iter(self.bikes.values())
+
+    def __len__(self):
+        return len(self.bikes)
+
+    def __contains__(self, bike_id):
+        return self.key(bike_id) in self.bikes
+
+    # Returns the inventory as plain data for a snapshot: the case-folded bike IDs, and each bike's fields as a tuple
+    def snapshot(self):
+        return (list(self.bikes), [(bike.bike_id, bike.bike_type, bike.size, bike.color, bike.rental_price, bike.available)
+                                   for bike in self.bikes.values()])
+
+    # Rebuilds an inventory from snapshot(); the bikes are known to be unique, so they are not checked one by one
+    @staticmethod
+    def from_snapshot(keys, rows):
+        inventory = BikeInventory()
+        inventory.bikes = dict(zip(keys, starmap(BikeDetails, rows)))
+        return inventory
+
+    # Returns the bike with the given ID, or None if it is not in the inventory
+    def get(self, bike_id):
+        return self.bikes.get(self.key(bike_id))
+
+    # Adds a bike to the inventory. Bike IDs must be unique (ignoring case).
+    def add(self, bike):
+        key = self.key(bike.bike_id)
+        if key in self.bikes:
+            raise ValueError(f"Bike ID {bike.bike_id} already exists in the inventory.")
+        self.bikes[key] = bike
+        if self.bitmaps is not None:
+            self.slot[key] = len(self.slots)
+            for name in self.FILTERS:
+                self.set_bit(name, getattr(bike, name), len(self.slots))
+            self.slots.append(key)
+
+    # Removes and returns the bike with the given ID, or None if it is not in the inventory
+    def remove(self, bike_id):
+        key = self.key(bike_id)
+        bike = self.bikes.pop(key, None)
+        if bike is None:
+            return None
+        if self.bitmaps is not None:
+            slot = self.slot.pop(key)
+            for name in self.FILTERS:
+                self.clear_bit(name, getattr(bike, name), slot)
+            self.slots[slot] = None
+        return bike
+
+    # Marks a bike as available/not available. Returns False if the bike is not in the inventory.
+    def set_available(self, bike_id, available):
+        key = self.key(bike_id)
+        bike = self.bikes.get(key)
+        if bike is None:
+            return False
+        if bike.available != available and self.bitmaps is not None:
+            self.clear_bit("available", bike.available, self.slot[key])
+            self.set_bit("available", available, self.slot[key])
+        bike.available = available
+        return True
+
+    def set_bit(self, name, value, slot):
+        value = self.index_value(value)
+        bitmaps = self.bitmaps[name]
+        if value not in bitmaps and name == "rental_price":
+            insort(self.prices, value)
+        bitmaps[value] = bitmaps.get(value, 0) | (1 << slot)
+
+    def clear_bit(self, name, value, slot):
+        value = self.index_value(value)
+        bitmap = self.bitmaps[name][value] & ~(1 << slot)
+        if bitmap:
+            self.bitmaps[name][value] = bitmap
+            return
+        del self.bitmaps[name][value]
+        if name == "rental_price":
+            del self.prices[bisect_left(self.prices, value)]
+
+    # Returns the distinct values of an indexed attribute, e.g. every bike type in the fleet
+    def values(self, name):
+        if self.bitmaps is None:
+            self.build_bitmaps()
+        values = []
+        for bitmap in self.bitmaps[name].values():
+            first_slot = (bitmap & -bitmap).bit_length() - 1
+            values.append(getattr(self.bikes[self.slots[first_slot]], name))
+        return sorted(values, key=str)
+
+    """
+    Returns the bikes that match every given filter, in inventory order. Filters that are None are ignored; text filters
+    ignore case, and the price range includes both ends, e.g.
+        inventory.find(bike_type="Road Bike", size="L", available=True, max_price=12)
+    """
+    def find(self, bike_type=None, size=None, color=None, available=None, min_price=None, max_price=None):
+        if self.bitmaps is None:
+            self.build_bitmaps()
+        matches = None
+        for name, value in (("bike_type", bike_type), ("size", size), ("color", color), ("available", available)):
+            if value is not None:
+                bitmap = self.bitmaps[name].get(self.index_value(value), 0)
+                matches = bitmap if matches is None else matches & bitmap
+
+        if min_price is not None or max_price is not None:
+            start = 0 if min_price is None else bisect_left(self.prices, min_price)
+            end = len(self.prices) if max_price is None else bisect_right(self.prices, max_price)
+            in_range = 0
+            for price in self.prices[start:end]:
+                in_range |= self.bitmaps["rental_price"][price]
+            matches = in_range if matches is None else matches & in_range
+
+        if matches is None:
+            return list(self.bikes.values())
+
+        # Bit i of the reversed binary string is slot i; str.find skips over the unset bits quickly
+        bits = bin(matches)[:1:-1]
+        bikes = []
+        slot = bits.find("1")
+        while slot != -1:
+            bikes.append(self.bikes[self.slots[slot]])
+            slot = bits.find("1", slot + 1)
+        return bikes
@@ -0,0 +1,136 @@
+import os
+import json
+
+"""
+An append-only write-ahead log for PedalHub. Every mutation (rent, complete, add, delete) is written as one compact
+JSON line and fsynced, so an operation costs O(1) disk I/O instead of rewriting every JSON file. A compaction step
+folds the journal into the snapshot files, and at startup the snapshot is loaded and the journal is replayed on top.
+
+Several processes can share one journal (see JsonStorage.locked): each record carries a sequence number, and every
+process remembers how far it has read, so it can catch up on the records the others appended since.
+"""
+class Journal:
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.checkpoint_file = filename + ".ckpt"  # Holds the sequence number of the last record folded into the snapshots
+        self.seq = 0          # Sequence number of the last record written or read
+        self.base = 0         # Sequence number stored by the last compaction this process knows about
+        self.offset = 0       # Position in the journal file up to which records have been read
+        self.pending = 0      # Number of records written since the last compaction
+        self.file = None
+
+    # Reads the sequence number stored by the last compaction (0 if the journal was never compacted)
+    def read_checkpoint(self):
+        if not os.path.exists(self.checkpoint_file):
+            return 0
+        with open(self.checkpoint_file, "r") as file:
+            content = file.read().strip()
+        return int(content) if content else 0
+
+    # Returns the (op, data) records that were written after the last compaction, in order
+    def read(self):
+        self.base = self.read_checkpoint()
+        self.seq = self.base
+        self.offset = 0
+        self.pending = 0
+        return self.read_new()
+
+    """
+    Returns the (op, data) records appended since the last read, in order.
+    A torn record at the end of the file (e.g. the process was killed mid-write) is discarded and cut off the file,
+    so that records appended afterwards are not hidden behind it.
+    """
+    def read_new(self):
+        records = []
+        if not os.path.exists(self.filename):
+            self.offset = 0
+            return records
+        size = os.path.getsize(self.filename)
+        if size < self.offset:  # Emptied by a compaction
+            self.offset = 0
+
+        valid_bytes = self.offset
+        with open(self.filename, "rb") as file:
+            file.seek(self.offset)
+            for raw in file:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                valid_bytes += len(raw)
+                if record["seq"] <= self.seq:  # Already part of the snapshot files, or already applied
+                    continue
+                self.seq = record["seq"]
+                self.pending += 1
+                records.append((record["op"], record["data"]))
+
+        if valid_bytes < size:
+            with open(self.filename, "r+b") as file:
+                file.truncate(valid_bytes)
+        self.offset = valid_bytes
+        return records
+
+    """
+    Returns True if another process has compacted the journal since this process last looked. Everything up to the
+    new checkpoint is then in the snapshot files, and the journal is read again from its start.
+    """
+    def checkpoint_changed(self):
+        checkpoint = self.read_checkpoint()
+        if checkpoint == self.base:
+            return False
+        self.base = checkpoint
+        self.seq = max(self.seq, checkpoint)
+        self.offset = 0
+        self.pending = 0
+        return True
+
+    """
+    Appends one record to the journal and, unless sync is False, forces it to disk before returning.
+    Returns the number of bytes written.
+    """
+    def append(self, op, data, sync=True):
+        self.seq += 1
+        line = (json.dumps({"seq": self.seq, "op": op, "data": data}, separators=(",", ":")) + "\n").encode("utf-8")
+        if self.file is None:
+            self.file = open(self.filename, "ab")
+        self.file.write(line)
+        self.file.flush()  # Visible to other processes right away; sync() makes it durable
+        if sync:
+            self.sync()
+        self.offset = os.fstat(self.file.fileno()).st_size
+        self.pending += 1
+        return len(line)
+
+    # Forces records appended with sync=False to disk
+    def sync(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    """
+    Called once the snapshot files hold every record up to self.seq. Writing the checkpoint (atomically) is the point
+    where the new files take over from the journal: until then JsonStorage keeps the old files and puts them back if the
+    save never gets here (see JsonStorage.recover). A crash after the checkpoint but before the journal is emptied only
+    leaves records that replay will skip.
+    """
+    def checkpoint(self):
+        temp_file = self.checkpoint_file + ".tmp"
+        with open(temp_file, "w") as file:
+            file.write(str(self.seq))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, self.checkpoint_file)
+
+        self.close()
+        open(self.filename, "w").close()  # Empty the journal
+        self.base = self.seq
+        self.offset = 0
+        self.pending = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,76 @@
+import json
+
+"""
+Incremental reader for files that hold one top-level JSON array (the format of bike_inventory.json, bookings.json and
+the old rental_history.json). The file is read in chunks and the array elements are decoded and yielded one at a time,
+so the whole file never has to be held in memory as text next to the fully parsed list.
+"""
+WHITESPACE = " \t\r\n"
+NUMBER_CHARS = "0123456789+-.eE"  # Characters that can continue a number, e.g. "1" of "1.5e10"
+
+
+def iter_json_array(file, transform=None, chunk_size=65536):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    # Reads the next chunk into the buffer, dropping the part that has already been decoded
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    # Moves pos to the next non-whitespace character, reading more of the file if needed
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not read_more():
+                return
+
+    def error(message):
+        return json.JSONDecodeError(message, buffer, pos)
+
+    skip_whitespace()
+    if pos >= len(buffer):
+        raise error("Expecting value")
+    if buffer[pos] != "[":
+        raise error("Expecting '['")
+    pos += 1
+    skip_whitespace()
+    if pos < len(buffer) and buffer[pos] == "]":
+        return
+
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if read_more():  # The element continues in the next chunk
+                    continue
+                raise
+            # A number that reaches the end of the buffer, or is cut right after "." or "e", may continue in the next chunk
+            if isinstance(item, (int, float)) and not isinstance(item, bool) and not eof and \
+                    (end == len(buffer) or buffer[end] in NUMBER_CHARS) and read_more():
+                continue
+            break
+        pos = end
+        yield transform(item) if transform else item
+
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise error("Expecting ',' delimiter")
+        if buffer[pos] == ",":
+            pos += 1
+        elif buffer[pos] == "]":
+            return
+        else:
+            raise error("Expecting ',' delimiter")
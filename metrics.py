@@ -0,0 +1,112 @@
+import json
+import time
+from functools import wraps
+
+"""
+Opt-in instrumentation of PedalHub's slow paths (loading, saving, file reads and writes, and every change committed,
+e.g. renting and completing).
+Per operation it keeps the number of calls, the total and largest latency, a latency histogram, and the bytes read and
+written and records (de)serialized that the operation reported.
+
+Metrics are off by default. Every instrumented function is wrapped by @instrumented, which only checks METRICS.enabled
+before calling the function when they are off, so the overhead is one attribute test per call (about 0.1 us). Turn them on with
+PedalHub.COLLECT_METRICS (or "python pedalhub.py --metrics"); see them in the admin dashboard or dump them as JSON.
+"""
+class Metrics:
+    # Upper bounds of the latency histogram buckets, in milliseconds; the last bucket holds everything slower
+    BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self.enabled = False
+        self.operations = {}  # Operation name -> its counters (see operation())
+
+    def operation(self, name):
+        counters = self.operations.get(name)
+        if counters is None:
+            counters = self.operations[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                "histogram": [0] * (len(self.BUCKETS_MS) + 1),
+                                                "bytes_read": 0, "bytes_written": 0, "records": 0}
+        return counters
+
+    # Records one call of the operation that took the given number of seconds
+    def record(self, name, seconds):
+        counters = self.operation(name)
+        ms = seconds * 1000
+        counters["count"] += 1
+        counters["total_ms"] += ms
+        counters["max_ms"] = max(counters["max_ms"], ms)
+        bucket = 0
+        while bucket < len(self.BUCKETS_MS) and ms > self.BUCKETS_MS[bucket]:
+            bucket += 1
+        counters["histogram"][bucket] += 1
+
+    # Adds bytes read or written and records (de)serialized to the operation's totals
+    def add(self, name, bytes_read=0, bytes_written=0, records=0):
+        counters = self.operation(name)
+        counters["bytes_read"] += bytes_read
+        counters["bytes_written"] += bytes_written
+        counters["records"] += records
+
+    def reset(self):
+        self.operations = {}
+
+    # Returns the latency (in ms) below which the given fraction of calls finished: the upper bound of its bucket
+    def percentile(self, name, fraction):
+        counters = self.operations[name]
+        wanted = fraction * counters["count"]
+        seen = 0
+        for bucket, count in enumerate(counters["histogram"]):
+            seen += count
+            if count and seen >= wanted:
+                if bucket == len(self.BUCKETS_MS):
+                    return counters["max_ms"]
+                return min(self.BUCKETS_MS[bucket], counters["max_ms"])
+        return 0.0
+
+    def to_dict(self):
+        return {
+            "enabled": self.enabled,
+            "buckets_ms": list(self.BUCKETS_MS),
+            "operations": {name: dict(counters, histogram=list(counters["histogram"]))
+                           for name, counters in self.operations.items()},
+        }
+
+    # Writes the metrics (and any extra top-level entries, e.g. save counters) to a JSON file
+    def dump(self, filename, **extra):
+        with open(filename, "w") as file:
+            json.dump({**self.to_dict(), **extra}, file, indent=4)
+
+
+METRICS = Metrics()  # The metrics of this process
+
+
+# Decorator that records the latency of every call of the function under the given operation name, when metrics are on
+def instrumented(name):
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                METRICS.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+"""
+Runs function() under cProfile, for profiling a whole session. The statistics are saved to filename (readable with
+pstats or e.g. snakeviz) and the functions with the most cumulative time are printed when the session ends.
+"""
+def profile_session(function, filename, top=25):
+    import pstats
+    import cProfile  # Only imported for a profiled session
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function)
+    finally:
+        profiler.dump_stats(filename)
+        print(f"\nProfile saved to {filename}. Functions with the most cumulative time:")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
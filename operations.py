@@ -0,0 +1,238 @@
+import math
+import time
+import inspect
+from bikedetails import BikeDetails
+from booking import Booking, parse_time, format_time
+
+"""
+The outcome of a headless operation: whether it succeeded, a message for the caller, and the record it created or
+changed (as a dictionary), if any. A failed operation is invalid if its input was wrong (a malformed or missing
+argument), rather than refused because of the current data (e.g. the bike is already rented out).
+"""
+class OperationResult:
+    __slots__ = ("ok", "message", "data", "invalid")
+
+    def __init__(self, ok, message, data=None, invalid=False):
+        self.ok = ok
+        self.message = message
+        self.data = data
+        self.invalid = invalid
+
+    def to_dict(self):
+        return {"ok": self.ok, "message": self.message, "data": self.data}
+
+
+# True if hours is a usable rental duration: a positive, finite number of hours of at most max_hours
+def is_duration(hours, max_hours):
+    if isinstance(hours, bool) or not isinstance(hours, (int, float)):
+        return False
+    return 0 < hours <= max_hours and not (isinstance(hours, float) and math.isnan(hours))
+
+
+# Returns the reason the bike ID cannot be used, or None if it can
+def check_bike_id(bike_id):
+    if not isinstance(bike_id, str) or not bike_id.strip():
+        return "Bike ID must be a non-empty string."
+    return None
+
+
+"""
+A non-interactive API over a PedalHub. Each method applies the same checks as the menus in pedalhub.py, but takes its
+input as arguments and returns an OperationResult instead of reading input() and printing, so PedalHub can be driven by
+scripts, the batch runner and services. Changes are made through PedalHub.commit, so they are persisted the same way
+(wrap several calls in hub.batch_saves() to save once for all of them).
+"""
+class HubOperations:
+    MAX_RENTAL_HOURS = 24 * 366  # Longest rental or reservation that can be booked or quoted
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    """
+    Rents out a bike now, or - if start_time ("YYYY-MM-DD HH:MM") is in the future - reserves it for rental_hours from then.
+    The bike must not be booked by anyone else during that time.
+    """
+    def rent(self, bike_id, customer_firstName, customer_lastName, customer_phone, rental_hours, start_time=None):
+        invalid = check_bike_id(bike_id)
+        if invalid is not None:
+            return OperationResult(False, invalid, invalid=True)
+        bike = self.hub.bike_inventory.get(bike_id)
+        if bike is None:
+            return OperationResult(False, "Bike not found.")
+        now = int(time.time())
+        try:
+            start = now if start_time is None else parse_time(start_time)
+        except (TypeError, ValueError):
+            return OperationResult(False, "Start time must be given as YYYY-MM-DD HH:MM.", invalid=True)
+        if start < now - 60:
+            return OperationResult(False, "The start time must not be in the past.", invalid=True)
+        start = max(start, now)  # A start time within the last minute means now
+        if start == now and not bike.available:
+            return OperationResult(False, f"Bike ID {bike_id} is currently not available for rent.")
+        if not all(isinstance(name, str) and name.isalpha() for name in (customer_firstName, customer_lastName)):
+            return OperationResult(False, "First and last name cannot be empty and must contain letters only.", invalid=True)
+        if not (isinstance(customer_phone, str) and customer_phone.isdigit()):
+            return OperationResult(False, "Phone number cannot be empty and must contain digits only.", invalid=True)
+        if not is_duration(rental_hours, self.MAX_RENTAL_HOURS):
+            return OperationResult(False, f"Rental duration must be a positive number of hours, at most {self.MAX_RENTAL_HOURS}.",
+                                   invalid=True)
+        try:
+            end_time = format_time(start + rental_hours * 3600)
+        except (OverflowError, ValueError, OSError):
+            return OperationResult(False, "The rental would end after the latest date that can be stored.", invalid=True)
+
+        booking = Booking(customer_firstName, customer_lastName, customer_phone, bike.bike_id, rental_hours,
+                          self.hub.PRICING.cost(bike, rental_hours, start), "Active" if start == now else "Reserved",
+                          format_time(start), end_time)
+        conflict = self.hub.check_operation("rent", booking.to_dict()) or self.hub.commit("rent", booking.to_dict())
+        if conflict is not None:
+            return OperationResult(False, conflict)
+        if booking.status == "Reserved":
+            return OperationResult(True, f"Bike {bike.bike_id} has been reserved for {customer_firstName}.", booking.to_dict())
+        return OperationResult(True, f"Bike {bike.bike_id} has been rented by {customer_firstName}.", booking.to_dict())
+
+    # Starts the rental of a reserved bike when the customer picks it up
+    def pick_up(self, bike_id):
+        invalid = check_bike_id(bike_id)
+        if invalid is not None:
+            return OperationResult(False, invalid, invalid=True)
+        booking = self.hub.booking_index.next_reservation(bike_id)
+        conflict = self.hub.check_operation("pick_up", {"bike_id": bike_id}) or self.hub.commit("pick_up", {"bike_id": bike_id})
+        if conflict is not None:
+            return OperationResult(False, conflict)
+        return OperationResult(True, f"Rental for Bike ID {booking.bike_id} has started.", booking.to_dict())
+
+    # Lists the bikes that are not booked at any time between start_time and end_time ("YYYY-MM-DD HH:MM")
+    def free_bikes(self, start_time, end_time):
+        try:
+            start, end = parse_time(start_time), parse_time(end_time)
+        except (TypeError, ValueError):
+            return OperationResult(False, "Times must be given as YYYY-MM-DD HH:MM.", invalid=True)
+        if end <= start:
+            return OperationResult(False, "The end time must be after the start time.", invalid=True)
+        bikes = self.hub.free_bikes(start, end)
+        return OperationResult(True, f"{len(bikes)} bikes are free from {start_time} to {end_time}.",
+                               [bike.to_dict() for bike in bikes])
+
+    """
+    Prices renting each of the given bikes (all bikes if bike_ids is None) for rental_hours - a number, or a list of
+    numbers to quote several durations - starting at start_time ("YYYY-MM-DD HH:MM", default now). The result data has
+    one {"bike_id", "rental_hours", "total_cost"} entry per bike and duration. Nothing is booked.
+    """
+    def quote(self, bike_ids, rental_hours, start_time=None):
+        durations = rental_hours if isinstance(rental_hours, list) else [rental_hours]
+        if not durations or not all(is_duration(hours, self.MAX_RENTAL_HOURS) for hours in durations):
+            return OperationResult(False, f"Rental duration must be a positive number of hours, at most {self.MAX_RENTAL_HOURS}.",
+                                   invalid=True)
+        try:
+            start = time.time() if start_time is None else parse_time(start_time)
+        except (TypeError, ValueError):
+            return OperationResult(False, "Start time must be given as YYYY-MM-DD HH:MM.", invalid=True)
+        if isinstance(bike_ids, str):
+            bike_ids = [bike_ids]
+        if bike_ids is not None and (not isinstance(bike_ids, list) or any(check_bike_id(bike_id) for bike_id in bike_ids)):
+            return OperationResult(False, "bike_ids must be a list of bike IDs, or null for all bikes.", invalid=True)
+        if bike_ids is None:
+            bikes = list(self.hub.bike_inventory)
+        else:
+            bikes = [self.hub.bike_inventory.get(bike_id) for bike_id in bike_ids]
+            missing = [bike_id for bike_id, bike in zip(bike_ids, bikes) if bike is None]
+            if missing:
+                return OperationResult(False, f"Bike not found: {', '.join(map(str, missing))}")
+
+        pricing = self.hub.PRICING
+        try:
+            table = pricing.price_table(bikes, durations, start).tolist()  # All bikes and durations in one pass
+        except ImportError:  # No NumPy: the same prices, one at a time
+            table = [[pricing.cost(bike, hours, start) for hours in durations] for bike in bikes]
+        quotes = [{"bike_id": bike.bike_id, "rental_hours": hours, "total_cost": cost}
+                  for bike, costs in zip(bikes, table) for hours, cost in zip(durations, costs)]
+        return OperationResult(True, f"{len(quotes)} quotes for {len(bikes)} bikes.", quotes)
+
+    def complete(self, bike_id):
+        invalid = check_bike_id(bike_id)
+        if invalid is not None:
+            return OperationResult(False, invalid, invalid=True)
+        booking = self.hub.booking_index.active_for_bike(bike_id)
+        if booking is None:
+            return OperationResult(False, f"No active rental found for Bike ID {bike_id}.")
+        conflict = self.hub.commit("complete", {"bike_id": booking.bike_id})
+        if conflict is not None:
+            return OperationResult(False, conflict)
+        return OperationResult(True, f"Rental for Bike ID {booking.bike_id} has been marked as completed.", booking.to_dict())
+
+    """
+    Cancels (deletes) the active rental of a bike, making the bike available again. A bike that is not rented out has its
+    next reservation cancelled instead.
+    """
+    def cancel(self, bike_id):
+        invalid = check_bike_id(bike_id)
+        if invalid is not None:
+            return OperationResult(False, invalid, invalid=True)
+        booking = self.hub.booking_index.active_for_bike(bike_id) or self.hub.booking_index.next_reservation(bike_id)
+        if booking is None:
+            return OperationResult(False, f"No active rental or reservation found for Bike ID {bike_id}.")
+        for index, active in enumerate(self.hub.bookings):
+            if active is booking:
+                conflict = self.hub.commit("delete_booking", {"index": index, "bike_id": booking.bike_id})
+                if conflict is not None:
+                    return OperationResult(False, conflict)
+                break
+        if booking.status == "Reserved":
+            return OperationResult(True, f"Reservation for Bike ID {booking.bike_id} from {booking.start_time} has been cancelled.",
+                                   booking.to_dict())
+        return OperationResult(True, f"Rental for Bike ID {booking.bike_id} has been cancelled.", booking.to_dict())
+
+    def add_bike(self, bike_id, bike_type, size, color, rental_price):
+        invalid = check_bike_id(bike_id)
+        if invalid is not None:
+            return OperationResult(False, invalid, invalid=True)
+        if not all(isinstance(value, str) for value in (bike_type, size, color)):
+            return OperationResult(False, "Bike type, size and color must be strings.", invalid=True)
+        if bike_id in self.hub.bike_inventory:
+            return OperationResult(False, f"Bike ID {bike_id} already exists in the inventory.")
+        try:
+            bike = BikeDetails(bike_id, bike_type, size, color, float(rental_price))
+        except (TypeError, ValueError):
+            return OperationResult(False, "Rental price must be a number.", invalid=True)
+        conflict = self.hub.commit("add_bike", bike.to_dict())
+        if conflict is not None:
+            return OperationResult(False, conflict)
+        return OperationResult(True, "Bike has been added to the inventory successfully.", bike.to_dict())
+
+    def delete_bike(self, bike_id):
+        invalid = check_bike_id(bike_id)
+        if invalid is not None:
+            return OperationResult(False, invalid, invalid=True)
+        bike = self.hub.bike_inventory.get(bike_id)
+        if bike is None:
+            return OperationResult(False, f"Bike with ID {bike_id} not found in inventory.")
+        conflict = self.hub.commit("delete_bike", {"bike_id": bike.bike_id})
+        if conflict is not None:
+            return OperationResult(False, conflict)
+        return OperationResult(True, f"Bike {bike.bike_id} has been deleted successfully.", bike.to_dict())
+
+    """
+    Runs one operation described by a dictionary, e.g. {"op": "rent", "bike_id": "B001", ...}; the other keys are
+    passed to the method named by "op". Unknown operations and missing or extra arguments give a failed result.
+    """
+    def execute(self, request):
+        request = dict(request)
+        op = request.pop("op", None)
+        method = {
+            "rent": self.rent,
+            "pick_up": self.pick_up,
+            "free_bikes": self.free_bikes,
+            "quote": self.quote,
+            "complete": self.complete,
+            "cancel": self.cancel,
+            "add_bike": self.add_bike,
+            "delete_bike": self.delete_bike,
+        }.get(op)
+        if method is None:
+            return OperationResult(False, f"Unknown operation: {op}", invalid=True)
+        try:
+            inspect.signature(method).bind(**request)
+        except TypeError as e:
+            return OperationResult(False, f"Invalid arguments for {op}: {e}", invalid=True)
+        return method(**request)
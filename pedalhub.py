@@ -1,20 +1,59 @@
 import os
+import sys
 import json
+import time
+from itertools import islice
+from contextlib import contextmanager
 from bikedetails import BikeDetails
+from datetime import datetime
+from booking import Booking, TIME_FORMAT, format_time
+from inventory import BikeInventory
+from booking_index import BookingIndex
+from pricing import PricingRules
+from metrics import METRICS, instrumented, profile_session
+from storage import JsonStorage
+from binary_store import is_binary_file, iter_records, write_table
 
 class PedalHub:
     ADMIN_USERNAME = "admin"
     ADMIN_PASSWORD = "youradmin123"
+    # Data files ending in ".bin" are stored in the binary format (see binary_store.py) instead of JSON
     BIKE_FILE = "bike_inventory.json"        # File to store bike details
     BOOKINGS_FILE = "bookings.json"          # File to store boooking details
-    HISTORY_FILE = "rental_history.json"     # File to store rental history
+    HISTORY_FILE = "rental_history.json"     # Legacy rental history file, migrated into HISTORY_DIR on startup
+    HISTORY_DIR = "rental_history"           # Directory of history segments that store completed rentals
+    HISTORY_FORMAT = "jsonl"                 # Format of new history segments: "jsonl" or "bin"
+    JOURNAL_FILE = "pedalhub.journal"        # Append-only log of changes made since the last compaction
+    USE_JOURNAL = True                       # Journal each change instead of rewriting all files on every change
+    COMPACT_EVERY = 500                      # Fold the journal into the JSON files after this many changes
+    STORAGE_BACKEND = "json"                 # "json" (the files above) or "sqlite" (DATABASE_FILE)
+    DATABASE_FILE = "pedalhub.db"            # SQLite database used by the "sqlite" storage backend
+    SHARED_DATA = True                       # Other processes may use the same data files: lock and re-read them
+    LOCK_FILE = "pedalhub.lock"              # Locked while a process changes or saves the JSON data files
+    PAGE_SIZE = 20                           # Bikes shown per page when listing bikes
+    CACHE_INVENTORY = True                   # Start from a snapshot of BIKE_FILE (BIKE_FILE + ".cache") while it is current
+    PRICING = PricingRules()                 # How rentals are priced; no rules means rental_price per hour
+    COLLECT_METRICS = False                  # Record operation counts and latencies (see metrics.py); off by default
+    METRICS_FILE = "pedalhub_metrics.json"   # Where the admin dashboard dumps the metrics
+    PROFILE_FILE = "pedalhub.prof"           # cProfile statistics of a session run with --profile
+    # Metric names of the changes made through commit() that have a menu of their own; other changes use their op name
+    OPERATION_METRICS = {"rent": "rent_bike", "complete": "mark_bike_completed"}
 
     def __init__(self):
         #Initializes the PedalHUb class by loading data from files.
-        self.bike_inventory = []     # List to store bike details
-        self.bookings = []           # List to store active rentals
-        self.rental_history = []     # List to store completed rentals
+        self.bike_inventory = BikeInventory()  # Bike details, indexed by bike ID
+        self.active_bookings = []    # List to store active rentals; None until the storage has loaded them (see bookings)
+        self.active_booking_index = BookingIndex()  # Active bookings by bike ID and bookings by customer phone
+        self.dirty = set()           # Stores ("bikes", "bookings") changed since they were last saved
+        self.deferred_saves = 0      # While above 0, changes are only saved when the outermost batch_saves() block ends
+        self.reports = None          # RentalReports over the history, built on first use and then kept up to date
+        # Counters that show how much persistence work was done and avoided
+        self.save_stats = {"bytes_written": 0, "stores_written": 0, "stores_skipped": 0, "saves_skipped": 0, "saves_coalesced": 0,
+                           "reloads": 0, "conflicts": 0}
+        if self.COLLECT_METRICS:
+            METRICS.enabled = True
         try:
+            self.storage = self.create_storage()  # Where bikes, bookings and history are stored
             self.load_data()        # Load existing data from files
         except Exception as e:
             print(f"Error initializing PedalHub: {e}")
@@ -23,41 +62,263 @@ class PedalHub:
     def clear_screen(self):
         os.system('cls' if os.name == 'nt' else 'clear')
 
-    # Load data from JSON files
+    # Creates the storage backend selected by STORAGE_BACKEND
+    def create_storage(self):
+        if self.STORAGE_BACKEND == "sqlite":
+            from sqlite_storage import SqliteStorage  # Only imported when the SQLite backend is used
+            return SqliteStorage(self, self.DATABASE_FILE)
+        return JsonStorage(self)
+
+    # The active bookings. The storage may leave them unloaded at startup; they are then loaded here, on first use.
+    @property
+    def bookings(self):
+        if self.active_bookings is None:
+            self.storage.load_bookings()
+        return self.active_bookings
+
+    @bookings.setter
+    def bookings(self, bookings):
+        self.active_bookings = bookings
+
+    @property
+    def booking_index(self):
+        if self.active_bookings is None:
+            self.storage.load_bookings()
+        return self.active_booking_index
+
+    @booking_index.setter
+    def booking_index(self, booking_index):
+        self.active_booking_index = booking_index
+
+    def bookings_loaded(self):
+        return self.active_bookings is not None
+
+    # Load the bikes and active bookings from storage
+    @instrumented("load_data")
     def load_data(self):
-        try:
-            # Load the bike inventory, rentals/bookings, and rental history
-            self.bike_inventory = self.load_from_file(self.BIKE_FILE, BikeDetails.from_dict)
-            self.bookings = self.load_from_file(self.BOOKINGS_FILE)
-            self.rental_history = self.load_from_file(self.HISTORY_FILE)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading data: {e}. Files will be recreated on save.")  # Handle errors if files are missing or corrupted
-
-    # Save current data (bikes, bookings, rental history) to respective files
+        self.storage.load()
+        if METRICS.enabled:
+            METRICS.add("load_data", records=len(self.bike_inventory) + len(self.active_bookings or ()))  # Without loading them
+
+    # Save current data through the storage backend (only what changed since the last save is written)
+    @instrumented("save_data")
     def save_data(self):
+        written = self.save_stats["bytes_written"]
+        self.storage.save()
+        if METRICS.enabled:
+            METRICS.add("save_data", bytes_written=self.save_stats["bytes_written"] - written)
+
+    # Picks up changes that other processes have saved since this process last read the data
+    def refresh_data(self):
+        with self.storage.locked():
+            self.storage.refresh()
+
+    # Lazily yields every completed rental, oldest first (for reports)
+    def iter_history(self):
+        return self.storage.iter_history()
+
+    # Returns the rental reports; the history is read once, later completions are added as they happen
+    def rental_reports(self):
+        if self.reports is None:
+            from reports import RentalReports  # Imported on first use: the reports need NumPy
+            self.reports = RentalReports(self.iter_history())
+        return self.reports
+
+    """
+    Saves changes made inside the block once, when the block ends, instead of once per change:
+        with hub.batch_saves():
+            hub.commit(...)
+            hub.commit(...)
+    """
+    @contextmanager
+    def batch_saves(self):
+        with self.storage.locked():  # Other processes wait until the whole batch is saved
+            self.deferred_saves += 1
+            try:
+                yield self
+            finally:
+                self.deferred_saves -= 1
+                if self.deferred_saves == 0:
+                    self.storage.flush()
+
+    # Persists a single change through the storage backend
+    @instrumented("record_operation")
+    def record_operation(self, op, data):
+        self.storage.record(op, data)
+
+    """
+    Applies a change to the in-memory data, then persists it. Both happen under the storage lock, after catching up with
+    what other processes have saved. The caller checked the change against the data it had; if that data was stale, the
+    change is checked again against the fresh data and refused if it no longer applies (e.g. another kiosk rented the
+    bike in the meantime). Returns None if the change was made, otherwise the reason it was refused.
+    With metrics on, each kind of change is timed under its name in OPERATION_METRICS (or op), whichever menu, API call
+    or service request made it, so the latencies do not include time spent waiting for input.
+    """
+    def commit(self, op, data):
+        if not METRICS.enabled:
+            return self.commit_operation(op, data)
+        start = time.perf_counter()
         try:
-            self.save_to_file(self.BIKE_FILE, [bike.to_dict() for bike in self.bike_inventory])
-            self.save_to_file(self.BOOKINGS_FILE, self.bookings)
-            self.save_to_file(self.HISTORY_FILE, self.rental_history)
-        except Exception as e:
-            print(f"Error saving data: {e}")
+            return self.commit_operation(op, data)
+        finally:
+            METRICS.record(self.OPERATION_METRICS.get(op, op), time.perf_counter() - start)
+
+    # commit() without the metrics
+    def commit_operation(self, op, data):
+        with self.storage.locked():
+            if self.storage.refresh():
+                conflict = self.check_operation(op, data)
+                if conflict is not None:
+                    self.save_stats["conflicts"] += 1
+                    return conflict
+            self.apply_operation(op, data)
+            self.record_operation(op, data)
+        return None
+
+    # Returns the reason a change cannot be applied to the current data, or None if it can
+    def check_operation(self, op, data):
+        if op == "rent":
+            bike = self.bike_inventory.get(data["bike_id"])
+            if bike is None:
+                return "Bike not found."
+            if data.get("status", "Active") == "Active" and not bike.available:
+                return f"Bike ID {data['bike_id']} is currently not available for rent."
+            window = Booking.from_dict(data).window()
+            if window is not None:
+                conflict = self.booking_index.conflict(data["bike_id"], *window)
+                if conflict is not None:
+                    return (f"Bike ID {data['bike_id']} is already booked from {format_time(conflict[0])} "
+                            f"to {format_time(conflict[1])}.")
+        elif op == "pick_up":
+            reservation = self.booking_index.next_reservation(data["bike_id"])
+            if reservation is None:
+                return f"No reservation found for Bike ID {data['bike_id']}."
+            # Until its window starts the bike stays free for other bookings, so it cannot be handed out early
+            window = reservation.window()
+            if window is not None and window[0] > time.time():
+                return (f"The reservation for Bike ID {data['bike_id']} starts at {format_time(window[0])}. "
+                        f"It cannot be picked up before then.")
+            bike = self.bike_inventory.get(data["bike_id"])
+            if bike is None or not bike.available:
+                return f"Bike ID {data['bike_id']} is currently not available for rent."
+        elif op == "complete":
+            if self.booking_index.active_for_bike(data["bike_id"]) is None:
+                return f"No active rental found for Bike ID {data['bike_id']}."
+        elif op == "add_bike":
+            if data["bike_id"] in self.bike_inventory:
+                return f"Bike ID {data['bike_id']} already exists in the inventory."
+        elif op == "delete_bike":
+            if data["bike_id"] not in self.bike_inventory:
+                return f"Bike with ID {data['bike_id']} not found in inventory."
+        elif op == "delete_booking":
+            index = data["index"]
+            if not 0 <= index < len(self.bookings) or ("bike_id" in data and self.bookings[index].bike_id != data["bike_id"]):
+                return "The rental list has changed. Please view the rentals again."
+        return None
 
-    # Helper function to load data from a file and transform it if necessary
+    """
+    Applies one change to the in-memory bikes and bookings. Completed rentals are handed to the storage backend's history.
+    This is shared by the interactive menus and by journal replay at startup, so both always produce the same state.
+    """
+    def apply_operation(self, op, data):
+        if op == "rent":
+            booking = Booking.from_dict(data)
+            if booking.status == 'Active':  # A reservation keeps the bike available until it is picked up
+                self.bike_inventory.set_available(booking.bike_id, False)  # Mark the bike as rented (not available)
+            self.bookings.append(booking)
+            self.booking_index.add(booking)
+            self.dirty.update(("bikes", "bookings"))
+
+        elif op == "pick_up":
+            # The customer collects a reserved bike: the reservation becomes an active rental
+            booking = self.booking_index.next_reservation(data["bike_id"])
+            if booking is not None:
+                booking.status = 'Active'
+                self.booking_index.start(booking)
+                self.bike_inventory.set_available(booking.bike_id, False)
+                self.dirty.update(("bikes", "bookings"))
+
+        elif op == "complete":
+            bike_id = data["bike_id"]
+            booking = self.booking_index.active_for_bike(bike_id)
+            if booking is not None:
+                booking.status = 'Completed'
+                self.booking_index.remove(booking)
+                # Move the booking out of the active bookings into the history archive
+                for i, active in enumerate(self.bookings):
+                    if active is booking:
+                        del self.bookings[i]
+                        break
+                self.storage.archive(booking.to_dict())
+                if self.reports is not None:
+                    self.reports.add(booking.to_dict())
+                self.dirty.add("bookings")
+            if self.bike_inventory.set_available(bike_id, True):  # Mark the bike as available again
+                self.dirty.add("bikes")
+
+        elif op == "add_bike":
+            self.bike_inventory.add(BikeDetails.from_dict(data))
+            self.dirty.add("bikes")
+
+        elif op == "delete_bike":
+            if self.bike_inventory.remove(data["bike_id"]) is not None:
+                self.dirty.add("bikes")
+
+        elif op == "delete_booking":
+            removed_booking = self.bookings.pop(data["index"])
+            self.booking_index.remove(removed_booking)
+            self.dirty.add("bookings")
+            # Update bike availability if the deleted booking is active
+            if removed_booking.status == 'Active' and self.bike_inventory.set_available(removed_booking.bike_id, True):
+                self.dirty.add("bikes")
+
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+    # Helper function to load data from a file and transform it if necessary. Only its latency is recorded here: the
+    # bytes and records read are counted once, under stream_from_file.
     @staticmethod
+    @instrumented("load_from_file")
     def load_from_file(filename, transform=None):
-        if not os.path.exists(filename): # Return empty list if file doesn't exist
-            return []
-        with open(filename, "r") as file: 
-            data = json.load(file)  # Read data from the file in JSON format
-            if transform: # If a transformation function is provided, use it to convert data items
-                return [transform(item) for item in data]
-            return data  # Return the raw data
-
-    # Helper function to save data to a file in JSON format
+        return list(PedalHub.stream_from_file(filename, transform))
+
+    """
+    Helper function that reads a data file (a JSON array, or a binary file) one record at a time and yields each record
+    (transformed if a function is given), so large files are never parsed into memory all at once.
+    """
     @staticmethod
+    def stream_from_file(filename, transform=None):
+        if not os.path.exists(filename): # Yield nothing if file doesn't exist
+            return
+        measured, start, records = METRICS.enabled, time.perf_counter(), 0
+        for item in iter_records(filename):
+            records += 1
+            yield transform(item) if transform else item
+        if measured:  # The time includes what the caller does with each record while reading the file
+            METRICS.record("stream_from_file", time.perf_counter() - start)
+            METRICS.add("stream_from_file", bytes_read=os.path.getsize(filename), records=records)
+
+    """
+    Helper function to save data to a file in JSON format (or the binary format for ".bin" files).
+    The data is written to a temporary file that then replaces the old one, so a crash never leaves a half-written file.
+    Returns the number of bytes written.
+    """
+    @staticmethod
+    @instrumented("save_to_file")
     def save_to_file(filename, data):
-        with open(filename, "w") as file:
-            json.dump(data, file, indent=4)  # Helper function to save data to a file
+        if is_binary_file(filename):
+            write_table(filename, data)
+        else:
+            temp_file = filename + ".tmp"
+            with open(temp_file, "w") as file:
+                json.dump(data, file, indent=4)  # Helper function to save data to a file
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, filename)
+        size = os.path.getsize(filename)
+        if METRICS.enabled:
+            METRICS.add("save_to_file", bytes_written=size, records=len(data) if hasattr(data, "__len__") else 0)
+        return size
             
 
     def run(self):
@@ -68,9 +329,10 @@ class PedalHub:
             while True:
                 self.display_main_menu()
                 choice = int (input("Enter your choice (1-4): "))
+                self.refresh_data()  # Show what other kiosks have changed in the meantime
 
                 if choice == 1:
-                    self.view_bikes()
+                    self.browse_bikes()
                 elif choice == 2:
                     self.rent_bike()
                 elif choice == 3:
@@ -97,7 +359,11 @@ class PedalHub:
         print("=========================================================")
 
 
-    def view_bikes(self):
+    """
+    Shows the bikes page by page (all bikes, or the given bikes, e.g. the result of a search). Each page is rendered and
+    printed as a whole, and the next page is only rendered once it is asked for, so large fleets are not printed at once.
+    """
+    def view_bikes(self, bikes=None):
         try:
             self.clear_screen()
             # A bike size chart as a guide for users when choosing the right bike for them
@@ -115,22 +381,73 @@ class PedalHub:
     
             
             print("\n*|--------------------------------------------- List of Bikes ---------------------------------------------|*\n")
-            if not self.bike_inventory:
-                print("No bikes available at the moment.")
+            if bikes is None:
+                bikes = self.bike_inventory
+                if not bikes:
+                    print("No bikes available at the moment.")
+                    return
+            elif not bikes:
+                print("No bikes match your search.")
                 return
 
-            # Display the bike inventory in a structured tabular format
-            print(f"{'Bike ID':<15} {'Type':<24} {'Size':13} {'Color':<15} {'Rental Price (per hour)':<30} {'Available':<20}")
-            print("=" * 112) 
-
-             # Loop through the bikes in the inventory and display each bike's details
-            for bike in self.bike_inventory:
-                availability = "Yes" if bike.available else "No"
-                print(f"{bike.bike_id:<15} {bike.bike_type:<24} {bike.size:<13} {bike.color:<20} Php {bike.rental_price:<24.2f} {availability:<20}")
+            # Display the bikes in a structured tabular format, one page at a time
+            pages = (len(bikes) + self.PAGE_SIZE - 1) // self.PAGE_SIZE
+            remaining = iter(bikes)
+            for page in range(1, pages + 1):
+                lines = [
+                    f"{'Bike ID':<15} {'Type':<24} {'Size':13} {'Color':<15} {'Rental Price (per hour)':<30} {'Available':<20}",
+                    "=" * 112,
+                ]
+                for bike in islice(remaining, self.PAGE_SIZE):
+                    availability = "Yes" if bike.available else "No"
+                    lines.append(f"{bike.bike_id:<15} {bike.bike_type:<24} {bike.size:<13} {bike.color:<20} Php {bike.rental_price:<24.2f} {availability:<20}")
+                print("\n".join(lines))
+                if page < pages:
+                    print(f"\nPage {page} of {pages} ({len(bikes)} bikes)")
+                    if input("Press Enter for the next page, or Q to stop: ").strip().lower() == "q":
+                        break
         
         except Exception as e:
             print(f"Error displaying bikes: {e}")
 
+    """
+    Lets the customer search the bikes by type, size, color, price and availability (any filter can be left blank),
+    then shows the matching bikes. The search uses the inventory's indexes (see BikeInventory.find).
+    """
+    def browse_bikes(self):
+        self.clear_screen()
+        print("\n*|---------- Find a Bike ----------|*")
+        print("Leave a filter blank to show bikes of any kind.\n")
+        filters = {}
+        for name, label in (("bike_type", "Type"), ("size", "Size"), ("color", "Color")):
+            choices = ", ".join(str(value) for value in self.bike_inventory.values(name))
+            value = input(f"{label} ({choices}): ").strip()
+            if value:
+                filters[name] = value
+
+        for name, label in (("min_price", "Minimum price per hour"), ("max_price", "Maximum price per hour")):
+            while True:
+                value = input(f"{label}: ").strip()
+                if not value:
+                    break
+                try:
+                    filters[name] = float(value)
+                    break
+                except ValueError:
+                    print("Invalid input. Please enter a number.")
+
+        if input("Show available bikes only? (yes/no): ").strip().lower() == "yes":
+            filters["available"] = True
+
+        # Bikes that are free for a whole time window, e.g. for a reservation
+        start = self.input_time("Free from (YYYY-MM-DD HH:MM, blank for any time): ")
+        end = self.input_time("Free until (YYYY-MM-DD HH:MM): ", allow_blank=False) if start is not None else None
+
+        bikes = self.bike_inventory.find(**filters) if filters else None
+        if start is not None:
+            bikes = self.free_bikes(start, end, bikes)
+        self.view_bikes(bikes)
+
     def rent_bike(self):
         try: 
             self.clear_screen()
@@ -141,13 +458,8 @@ class PedalHub:
 
             bike_id = input("Enter Bike ID to rent: ").strip()
             
-            # Search for the selected bike in the inventory
-            selected_bike = None
-            for bike in self.bike_inventory:
-                if bike.bike_id.lower() == bike_id.lower():
-                    selected_bike = bike
-                    break
-                
+            # Look up the selected bike in the inventory
+            selected_bike = self.bike_inventory.get(bike_id)
             if not selected_bike:
                 print("Bike not found.")
                 return
@@ -219,8 +531,17 @@ class PedalHub:
                     except ValueError:
                         print("Invalid input. Please enter a valid number.")
 
+            # The rental starts now, unless the customer reserves the bike for a later time
+            now = datetime.now().replace(microsecond=0).timestamp()
+            while True:
+                start = self.input_time("\nStart time for a reservation (YYYY-MM-DD HH:MM), or leave blank to start now: ")
+                if start is None or start > now:
+                    break
+                print("The start time must be in the future.")
+            start_time = now if start is None else start
+
             if duration_hours is not None:
-                total_cost = bike.calculate_rental_cost(duration_hours)
+                total_cost = self.PRICING.cost(selected_bike, duration_hours, start_time)  # The price that is charged
 
                 if duration_choice == 2:
                     print(f"\nRental Duration: {duration_hours: .2f} minutes")
@@ -230,27 +551,32 @@ class PedalHub:
                 print(f"Rental cost: Php {total_cost: .2f}")
             else:
                 print("Error renting bike: Duration is not valid.")
-    
                 
             # Create a booking record for the rental
-            booking = {
-                "customer_firstName": customer_firstName,
-                "customer_lastName": customer_lastName,
-                "customer_phone": customer_phone,
-                "bike_id": bike.bike_id,
-                "rental_hours": duration_hours,
-                "total_cost": total_cost,
-                "status": "Active"  # Mark the booking as active initially
-            }
-            
-            bike.available = False  # Mark the bike as rented (not available)
-            
-            # Add the booking to the list of active bookings and rental history
-            self.bookings.append(booking)
-            self.rental_history.append({**booking, "status": "Active"})
-            
-            # Save updated data to the files
-            self.save_data()
+            booking = Booking(
+                customer_firstName=customer_firstName,
+                customer_lastName=customer_lastName,
+                customer_phone=customer_phone,
+                bike_id=selected_bike.bike_id,
+                rental_hours=duration_hours,
+                total_cost=total_cost,
+                status="Active" if start is None else "Reserved",  # Mark the booking as active initially
+                start_time=format_time(start_time),
+                end_time=format_time(start_time + duration_hours * 3600)
+            )
+
+            # The bike must not be booked by someone else during the rental
+            conflict = self.check_operation("rent", booking.to_dict())
+            if conflict is None:
+                # Mark the bike as rented, add the booking to the active bookings, and save the change
+                conflict = self.commit("rent", booking.to_dict())
+            if conflict is not None:
+                print(f"Rental not saved. {conflict}")
+                return
+            if booking.status == "Reserved":
+                print(f"\nReservation confirmed. Bike {bike_id} is reserved for {customer_firstName} from {booking.start_time} "
+                      f"to {booking.end_time}.\nTotal Cost: Php {total_cost:.2f}")
+                return
             print(f"\nRental confirmed. Bike {bike_id} has been rented by {customer_firstName}.\nTotal Cost: Php {total_cost:.2f}")
             return
                     
@@ -265,16 +591,57 @@ class PedalHub:
             password = input("Enter Admin Password: ").strip()
             return username == self.ADMIN_USERNAME and password == self.ADMIN_PASSWORD
         
+    """
+    Returns the open (active and reserved) bookings made with the given customer phone number, from the phone index.
+    Completed rentals are moved to the history archive and are not indexed; with include_history they are read from the
+    archive and come first, oldest first. That streams the whole history, so it is meant for occasional lookups.
+    """
+    def customer_bookings(self, customer_phone, include_history=False):
+        bookings = self.booking_index.for_phone(customer_phone)
+        if include_history:
+            phone = customer_phone.strip()
+            completed = [Booking.from_dict(record) for record in self.iter_history() if record["customer_phone"] == phone]
+            bookings = completed + bookings
+        return bookings
+
+    """
+    Returns the bikes (all bikes, or the given ones) that are not booked at any time between start and end (POSIX
+    timestamps), in inventory order. Bikes rented out by a booking without times are never free, since their return
+    time is unknown.
+    """
+    def free_bikes(self, start, end, bikes=None):
+        candidates = []
+        for bike in self.bike_inventory if bikes is None else bikes:
+            if not bike.available:
+                booking = self.booking_index.active_for_bike(bike.bike_id)
+                if booking is None or booking.window() is None:
+                    continue  # Rented out with no known return time
+            candidates.append(bike)
+        return self.booking_index.free_bikes(candidates, start, end)
+
+    # Asks for a time in TIME_FORMAT until a valid one (or nothing, if allowed) is entered; returns a timestamp or None
+    def input_time(self, prompt, allow_blank=True):
+        while True:
+            text = input(prompt).strip()
+            if not text and allow_blank:
+                return None
+            try:
+                return datetime.strptime(text, TIME_FORMAT).timestamp()
+            except ValueError:
+                print("Invalid input. Please enter the time as YYYY-MM-DD HH:MM, e.g. 2025-01-31 14:00.")
+
     def rentals (self):  # Function that enumarates and displays all the rentals
         for index, booking in enumerate(self.bookings, start=1):
             print(f"\nRental #{index}")
-            print(f"  First Name     : {booking['customer_firstName']}")
-            print(f"  Last Name      : {booking['customer_lastName']}")
-            print(f"  Phone Number   : {booking['customer_phone']}")
-            print(f"  Bike ID        : {booking['bike_id']}")
-            print(f"  Rental Hours   : {booking['rental_hours']}")
-            print(f"  Total Cost     : Php {booking['total_cost']:.2f}")
-            print(f"  Status         : {booking.get('status', 'Active')}")  # Display status
+            print(f"  First Name     : {booking.customer_firstName}")
+            print(f"  Last Name      : {booking.customer_lastName}")
+            print(f"  Phone Number   : {booking.customer_phone}")
+            print(f"  Bike ID        : {booking.bike_id}")
+            print(f"  Rental Hours   : {booking.rental_hours}")
+            print(f"  Total Cost     : Php {booking.total_cost:.2f}")
+            print(f"  Status         : {booking.status}")  # Display status
+            if booking.start_time:
+                print(f"  Booked         : {booking.start_time} to {booking.end_time}")
             print("-" * 40)
         
         
@@ -296,10 +663,13 @@ class PedalHub:
             print("|\t [2] Delete Bike \t\t\t|")
             print("|\t [3] Mark Rentals as Completed  \t|")
             print("|\t [4] View Rentals \t\t\t|")
-            print("|\t [5] Back To Main Menu   \t\t|")
+            print("|\t [5] Start Reserved Rental \t\t|")
+            print("|\t [6] Rental Reports \t\t\t|")
+            print("|\t [7] Performance Metrics \t\t|")
+            print("|\t [8] Back To Main Menu   \t\t|")
             print("=================================================")
 
-            choice = int(input("Enter your choice (1-5): "))
+            choice = int(input("Enter your choice (1-8): "))
 
             if choice == 1:
                 self.add_new_bike()
@@ -311,6 +681,13 @@ class PedalHub:
                 self.view_bookings()
                 input("Press Enter to return to Admin Dashboard...")
             elif choice == 5:
+                self.start_reserved_rental()
+            elif choice == 6:
+                self.view_reports()
+                input("Press Enter to return to Admin Dashboard...")
+            elif choice == 7:
+                self.view_metrics()
+            elif choice == 8:
                 print("Returning to Main Menu...")
                 self.clear_screen()
                 break
@@ -328,16 +705,19 @@ class PedalHub:
         self.view_bikes()
         print("\n\n*|---------- Add Bike -----------|*")
         bike_id = input("\nEnter Bike ID: ").strip()
+        if bike_id in self.bike_inventory:  # Bike IDs must be unique
+            print(f"Bike ID {bike_id} already exists in the inventory.")
+            return
         bike_type = input("Enter the type of Bike: ").strip()
         size = input("Enter the size: ").strip()
         color = input("Enter Color: ").strip()
         rental_price = float(input("Enter rental Price per Hour: "))
 
-        self.bike_inventory.append(
-            BikeDetails(bike_id, bike_type, size, color, rental_price)
-        )
-        
-        self.save_data()  # Save the bike data immediately after adding
+        new_bike = BikeDetails(bike_id, bike_type, size, color, rental_price)
+        conflict = self.commit("add_bike", new_bike.to_dict())  # Save the bike data immediately after adding
+        if conflict is not None:
+            print(conflict)
+            return
         print("Bike has been added to the inventory successfully!!")
     
     
@@ -348,13 +728,15 @@ class PedalHub:
         print("\n\n*|------------- Delete Bike -------------|*\n")
         bike_id = input("Enter Bike ID to delete: ").strip()
         
-        # Search for the bike in the inventory
-        for bike in self.bike_inventory:
-            if bike.bike_id.lower() == bike_id.lower():
-                self.bike_inventory.remove(bike) # Removes the bike from the inventory and change
-                self.save_data()  # Save the updated inventory to the file
-                print(f"Bike {bike_id} has been deleted successfully.")
+        # Look up the bike in the inventory
+        bike = self.bike_inventory.get(bike_id)
+        if bike is not None:
+            conflict = self.commit("delete_bike", {"bike_id": bike.bike_id})  # Removes the bike from the inventory and saves the change
+            if conflict is not None:
+                print(conflict)
                 return
+            print(f"Bike {bike_id} has been deleted successfully.")
+            return
 
         print(f"Bike with ID {bike_id} not found in inventory.")    
 
@@ -373,25 +755,102 @@ class PedalHub:
 
         bike_id = input("Enter the Bike ID to mark as completed: ").strip()
 
-        for booking in self.bookings:
-            if booking['bike_id'].lower() == bike_id.lower() and booking.get('status') == 'Active':
-                booking['status'] = 'Completed'
-
-                # Find the corresponding bike and mark it as available again
-                for bike in self.bike_inventory:
-                    if bike.bike_id.lower() == bike_id.lower():
-                        bike.available = True  # Mark the bike as available again
-                        break
-                
-                self.save_data()  # Save updated bike inventory and booking status
-                booking_found = True
+        booking = self.booking_index.active_for_bike(bike_id)
+        if booking is not None:
+            # Mark the booking as completed, make the bike available again and save the change
+            conflict = self.commit("complete", {"bike_id": booking.bike_id})
+            if conflict is not None:
+                print(f"{conflict}\n")
+            else:
                 print(f"Rental for Bike ID {bike_id} has been marked as completed.\n")
-                input("Press Enter to return to Admin Dashboard...")
-                return  # Ensure we return here so that it doesn't go back to the dashboard immediately
+            input("Press Enter to return to Admin Dashboard...")
+            return  # Ensure we return here so that it doesn't go back to the dashboard immediately
 
         print(f"No active rental found for Bike ID {bike_id}.\n")
         input("Press Enter to return to Admin Dashboard...")  # Wait for input to return to Admin Dashboard
 
+    # Shows the operation metrics (see metrics.py) and offers to dump them, with the save counters, to METRICS_FILE
+    def view_metrics(self):
+        self.clear_screen()
+        print("\n*|---------- Performance Metrics ----------|*")
+        if not METRICS.enabled:
+            print("Metrics are off. Start PedalHub with --metrics (or set COLLECT_METRICS) to record them from startup.")
+            if input("Turn them on now? (y/n): ").strip().lower() == "y":
+                METRICS.enabled = True
+            return
+
+        if not METRICS.operations:
+            print("Nothing has been measured yet.")
+        else:
+            print(f"\n{'Operation':<22} {'Calls':>7} {'Mean ms':>10} {'p95 ms':>10} {'Max ms':>10} {'Read KB':>10} {'Written KB':>11} {'Records':>9}")
+            for name, counters in sorted(METRICS.operations.items()):
+                mean = counters["total_ms"] / counters["count"] if counters["count"] else 0.0
+                p95 = METRICS.percentile(name, 0.95) if counters["count"] else 0.0
+                print(f"{name:<22} {counters['count']:>7} {mean:>10.2f} {p95:>10.2f} {counters['max_ms']:>10.2f} "
+                      f"{counters['bytes_read'] / 1024:>10.1f} {counters['bytes_written'] / 1024:>11.1f} {counters['records']:>9}")
+        print("\nSave counters: " + ", ".join(f"{name} {count}" for name, count in self.save_stats.items()))
+
+        choice = input(f"\n[D] Dump to {self.METRICS_FILE}  [R] Reset  [Enter] Back: ").strip().lower()
+        if choice == "d":
+            try:
+                METRICS.dump(self.METRICS_FILE, save_stats=self.save_stats)
+                print(f"Metrics saved to {self.METRICS_FILE}.")
+            except OSError as e:
+                print(f"Error saving metrics: {e}")
+        elif choice == "r":
+            METRICS.reset()
+            print("Metrics have been reset.")
+
+    # Shows revenue, utilization, top customers and rental durations from the rental history
+    def view_reports(self):
+        self.clear_screen()
+        print("\n*|---------- Rental Reports ----------|*")
+        try:
+            reports = self.rental_reports()
+        except ImportError as e:
+            print(e)
+            return
+        if not reports.rentals and not reports.pending:
+            print("No completed rentals yet.")
+            return
+
+        print("\nRevenue per bike type")
+        for bike_type, revenue, rentals in reports.revenue_per_type(self.bike_inventory):
+            print(f"  {bike_type:<24} Php {revenue:>14,.2f}   {rentals:>8} rentals")
+
+        print("\nTop 10 bikes by revenue")
+        for bike_id, revenue, rentals in reports.revenue_per_bike(10):
+            print(f"  {bike_id:<24} Php {revenue:>14,.2f}   {rentals:>8} rentals")
+
+        period = reports.period_hours()
+        if period:
+            print(f"\nMost used bikes (share of the {period:,.0f} hours covered by the history)")
+            for bike_id, hours, share in reports.utilization(period, 10):
+                print(f"  {bike_id:<24} {hours:>10,.1f} h   {share:>7.1%}")
+
+        print("\nTop 10 customers")
+        for phone, name, revenue, rentals in reports.top_customers(10):
+            print(f"  {name:<24} {phone:<14} Php {revenue:>12,.2f}   {rentals:>6} rentals")
+
+        print("\nRental durations")
+        for low, high, rentals in reports.duration_histogram():
+            label = f"{low:g}+ h" if high == float("inf") else f"{low:g}-{high:g} h"
+            print(f"  {label:<10} {rentals:>10}")
+
+    # Hands out a reserved bike: the customer's reservation becomes an active rental
+    def start_reserved_rental(self):
+        self.clear_screen()
+        print("\n\n*|---------- Start Reserved Rental ----------|*")
+        bike_id = input("Enter the reserved Bike ID: ").strip()
+        conflict = self.check_operation("pick_up", {"bike_id": bike_id})
+        if conflict is None:
+            conflict = self.commit("pick_up", {"bike_id": bike_id})
+        if conflict is not None:
+            print(f"{conflict}\n")
+        else:
+            print(f"Rental for Bike ID {bike_id} has started.\n")
+        input("Press Enter to return to Admin Dashboard...")
+
     def view_bookings(self):
         self.clear_screen()
         print("\n*|---------- Rentals ----------|*")
@@ -410,19 +869,14 @@ class PedalHub:
                 try:
                     booking_number = int(input("Enter the rental number to delete: ").strip())
                     if 1 <= booking_number <= len(self.bookings):
-                        removed_booking = self.bookings.pop(booking_number - 1)
-
-                        # Update bike availability if the deleted booking is active
-                        if removed_booking['status'] == 'Active':
-                            for bike in self.bike_inventory:
-                                if bike.bike_id.lower() == removed_booking['bike_id'].lower():
-                                    bike.available = True
-                                    break
-
-                        # Save updated bookings and bike inventory directly to files
-                        self.save_to_file(self.BOOKINGS_FILE, self.bookings)
-                        self.save_to_file(self.BIKE_FILE, [bike.to_dict() for bike in self.bike_inventory])
-                        print(f"Rental #{booking_number} has been successfully deleted from the file.\n")
+                        # Remove the booking (freeing its bike if it was active) and save the change
+                        # The bike ID lets the change be refused if another kiosk changed the rentals since they were listed
+                        booking = self.bookings[booking_number - 1]
+                        conflict = self.commit("delete_booking", {"index": booking_number - 1, "bike_id": booking.bike_id})
+                        if conflict is not None:
+                            print(conflict)
+                        else:
+                            print(f"Rental #{booking_number} has been successfully deleted from the file.\n")
                     else:
                         print("Invalid booking number. Please try again.")
                 except ValueError:
@@ -435,6 +889,20 @@ class PedalHub:
                 print("Invalid choice. Please enter 'yes' or 'no'.")
             
 
-if __name__ == "__main__":         
+"""
+Usage: python pedalhub.py [--metrics] [--profile]
+    --metrics   record operation metrics from startup (shown in the admin dashboard)
+    --profile   run the whole session under cProfile and save the statistics to PROFILE_FILE
+"""
+def main():
+    if "--metrics" in sys.argv:
+        PedalHub.COLLECT_METRICS = True
+    if "--profile" in sys.argv:
+        profile_session(lambda: PedalHub().run(), PedalHub.PROFILE_FILE)
+        return
     pedal_hub = PedalHub()  # Create instance of PedalHub
     pedal_hub.run()  # Start the system
+
+
+if __name__ == "__main__":         
+    main()
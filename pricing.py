@@ -0,0 +1,82 @@
+from datetime import datetime
+
+"""
+Rental pricing rules. With no rules a rental costs the bike's rental_price per hour, exactly as
+BikeDetails.calculate_rental_cost; the rules that can be added on top are:
+
+    daily_cap_hours   a day (each full 24 hours, and the hours left over) is charged at most this many hours
+    peak_periods      (first hour, last hour, multiplier) tuples: rentals starting from first to last hour of the day
+                      (0-23, inclusive) cost multiplier times as much; the first matching period applies
+    type_discounts    bike type -> discount as a fraction, e.g. {"BMX": 0.1} for 10% off BMX rentals
+
+The rules are compiled once, when the PricingRules is created: the peak periods into one multiplier per hour of the day
+and the discounts into one price factor per bike type. cost() prices one rental in plain Python; price_table() prices
+many bikes for many durations at once with NumPy. Both do the same floating-point operations in the same order
+(rental_price * charged hours, then * peak multiplier, then * discount factor), so they give bit-identical results,
+and with no rules both equal calculate_rental_cost.
+"""
+class PricingRules:
+
+    def __init__(self, daily_cap_hours=None, peak_periods=(), type_discounts=None):
+        if daily_cap_hours is not None and not 0 < daily_cap_hours <= 24:
+            raise ValueError("daily_cap_hours must be between 0 and 24.")
+        self.daily_cap_hours = daily_cap_hours
+        self.peak_periods = tuple(peak_periods)
+        self.type_discounts = dict(type_discounts or {})
+
+        peak_by_hour = [1.0] * 24
+        for first_hour, last_hour, multiplier in reversed(self.peak_periods):  # Earlier periods win, so they go last
+            for hour in range(24):
+                if (first_hour <= hour <= last_hour) if first_hour <= last_hour else (hour >= first_hour or hour <= last_hour):
+                    peak_by_hour[hour] = float(multiplier)
+        self.peak_by_hour = tuple(peak_by_hour)  # Multiplier for rentals starting at each hour of the day
+        self.type_factors = {bike_type: 1.0 - discount for bike_type, discount in self.type_discounts.items()}
+
+    # True if these rules price every rental as calculate_rental_cost does
+    def is_flat(self):
+        return self.daily_cap_hours is None and not self.peak_periods and not self.type_discounts
+
+    # Hours that are charged for a rental of the given length, after the daily cap
+    def charged_hours(self, hours):
+        if self.daily_cap_hours is None:
+            return hours
+        return hours // 24 * self.daily_cap_hours + min(hours % 24, self.daily_cap_hours)
+
+    # Peak multiplier for a rental starting at the given POSIX timestamp (1.0 if the start time is not known)
+    def peak_multiplier(self, start=None):
+        if start is None:
+            return 1.0
+        return self.peak_by_hour[datetime.fromtimestamp(start).hour]
+
+    # Returns the cost of renting the bike for the given hours, starting at the given POSIX timestamp (or now)
+    def cost(self, bike, hours, start=None):
+        cost = bike.calculate_rental_cost(self.charged_hours(hours))
+        peak = self.peak_multiplier(start)
+        if peak != 1.0:
+            cost = cost * peak
+        factor = self.type_factors.get(bike.bike_type, 1.0)
+        if factor != 1.0:
+            cost = cost * factor
+        return cost
+
+    """
+    Returns a (bikes x durations) NumPy array with the cost of renting each of the given bikes for each of the given
+    durations (in hours), all starting at the given POSIX timestamp: row i, column j is cost(bikes[i], durations[j], start).
+    """
+    def price_table(self, bikes, durations, start=None):
+        try:
+            import numpy as np  # Optional, and imported on first use so that starting PedalHub does not load it
+        except ImportError:
+            raise ImportError("Pricing many bikes at once needs NumPy. Install it with: pip install numpy") from None
+        bikes = list(bikes)
+        rates = np.fromiter((bike.rental_price for bike in bikes), dtype=np.float64, count=len(bikes))
+        factors = np.fromiter((self.type_factors.get(bike.bike_type, 1.0) for bike in bikes), dtype=np.float64,
+                              count=len(bikes))
+        hours = np.asarray(durations, dtype=np.float64)
+        if self.daily_cap_hours is not None:
+            hours = np.floor_divide(hours, 24) * self.daily_cap_hours + np.minimum(np.mod(hours, 24), self.daily_cap_hours)
+
+        table = rates[:, None] * hours[None, :]
+        table *= self.peak_multiplier(start)  # Multiplying by 1.0 leaves every value unchanged
+        table *= factors[:, None]
+        return table
@@ -0,0 +1,190 @@
+from array import array
+from inventory import BikeInventory
+from history_columns import HistoryColumns
+
+try:
+    import numpy as np  # Optional: only needed for the rental reports
+except ImportError:
+    np = None
+
+"""
+Revenue and utilization reports over the rental history, computed with NumPy.
+
+The history is read in chunks; each chunk is put into a HistoryColumns (bike ID, customer phone and status codes, hours,
+cost and booked times), whose arrays NumPy reads without copying, and the reports are vectorized group-bys over those
+arrays (np.bincount with weights, np.histogram) instead of Python loops over records. The HistoryColumns is emptied after
+each chunk but keeps its string codes, so a code means the same bike, customer or status in every chunk. The group-by
+results are kept as running totals per bike, per customer and per duration bin, so rentals completed later are added
+with add() and only the new rentals are processed: a report costs O(bikes + customers), not O(history).
+
+    reports = RentalReports(hub.iter_history())
+    reports.add(record)                     # a rental completed since
+    reports.revenue_per_type(hub.bike_inventory)
+"""
+class RentalReports:
+    CHUNK_SIZE = 65536
+    DURATION_BINS = (0, 1, 2, 3, 4, 6, 8, 12, 24, 48, float("inf"))  # Rental duration histogram bin edges, in hours
+
+    def __init__(self, records=()):
+        if np is None:
+            raise ImportError("The rental reports need NumPy. Install it with: pip install numpy")
+        self.columns = HistoryColumns()  # The chunk being added
+        self.bike_codes = {}   # Case-folded bike_id -> code (index into the per-bike totals)
+        self.bike_ids = []     # Code -> bike_id as first seen
+        self.bike_code_of = array("q")  # Code of a bike_id value in the columns -> code of its case-folded bike_id
+        self.customers = []    # Customer phone code -> (customer_phone, name as on their first rental)
+
+        self.rentals = 0
+        self.revenue_by_bike = np.zeros(0)
+        self.timed_hours_by_bike = np.zeros(0)  # Hours of the rentals that have booked times (see utilization())
+        self.rentals_by_bike = np.zeros(0, dtype=np.int64)
+        self.revenue_by_phone = np.zeros(0)
+        self.rentals_by_phone = np.zeros(0, dtype=np.int64)
+        self.rentals_by_status = np.zeros(0, dtype=np.int64)
+        self.duration_counts = np.zeros(len(self.DURATION_BINS) - 1, dtype=np.int64)
+        self.first_start = None  # Earliest start and latest end of the rentals that have times (see HistoryColumns)
+        self.last_end = None
+
+        self.pending = []  # Records passed to add() that are not in the totals yet
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == self.CHUNK_SIZE:
+                self.add_chunk(chunk)
+                chunk = []
+        self.add_chunk(chunk)
+
+    # Adds completed rentals; they are included in the totals the next time a report is made
+    def add(self, record):
+        self.pending.append(record)
+
+    def update(self):
+        if self.pending:
+            pending, self.pending = self.pending, []
+            self.add_chunk(pending)
+
+    # Adds one chunk of records to the columns and its group-by results to the running totals
+    def add_chunk(self, records):
+        if not records:
+            return
+        columns = self.columns
+        columns.extend(records)
+        bike_column, phone_column = columns.strings["bike_id"], columns.strings["customer_phone"]
+        for bike_id in bike_column.values[len(self.bike_code_of):]:  # bike_id values seen for the first time
+            code = self.bike_codes.setdefault(BikeInventory.key(bike_id), len(self.bike_codes))
+            if code == len(self.bike_ids):
+                self.bike_ids.append(bike_id)
+            self.bike_code_of.append(code)
+        bikes = np.frombuffer(self.bike_code_of, dtype=np.int64)[np.frombuffer(bike_column.codes, dtype=np.uint32)]
+        phones = np.frombuffer(phone_column.codes, dtype=np.uint32)
+        statuses = np.frombuffer(columns.strings["status"].codes, dtype=np.uint32)
+        if len(phone_column.values) > len(self.customers):  # Name new customers as on their first rental
+            new_codes, first_rows = np.unique(phones, return_index=True)
+            for code, row in zip(new_codes, first_rows):
+                if code >= len(self.customers):
+                    self.customers.append((phone_column.values[code], f"{columns.strings['customer_firstName'][row]} "
+                                                                      f"{columns.strings['customer_lastName'][row]}"))
+        hours = np.frombuffer(columns.numbers["rental_hours"])
+        cost = np.frombuffer(columns.numbers["total_cost"])
+        starts, ends = np.frombuffer(columns.times["start_time"]), np.frombuffer(columns.times["end_time"])
+
+        customers, status_count = len(self.customers), len(columns.strings["status"].values)
+        timed = ~np.isnan(starts) & ~np.isnan(ends)
+        self.revenue_by_bike = self.grow(self.revenue_by_bike, len(self.bike_codes)) + \
+            np.bincount(bikes, weights=cost, minlength=len(self.bike_codes))
+        self.timed_hours_by_bike = self.grow(self.timed_hours_by_bike, len(self.bike_codes)) + \
+            np.bincount(bikes[timed], weights=hours[timed], minlength=len(self.bike_codes))
+        self.rentals_by_bike = self.grow(self.rentals_by_bike, len(self.bike_codes)) + \
+            np.bincount(bikes, minlength=len(self.bike_codes))
+        self.revenue_by_phone = self.grow(self.revenue_by_phone, customers) + \
+            np.bincount(phones, weights=cost, minlength=customers)
+        self.rentals_by_phone = self.grow(self.rentals_by_phone, customers) + np.bincount(phones, minlength=customers)
+        self.rentals_by_status = self.grow(self.rentals_by_status, status_count) + \
+            np.bincount(statuses, minlength=status_count)
+        self.duration_counts += np.histogram(hours, bins=self.DURATION_BINS)[0]
+
+        if timed.any():
+            first_start, last_end = float(starts[timed].min()), float(ends[timed].max())
+            self.first_start = first_start if self.first_start is None else min(self.first_start, first_start)
+            self.last_end = last_end if self.last_end is None else max(self.last_end, last_end)
+        self.rentals += len(records)
+        columns.clear()
+
+    # Returns the totals array extended with zeros to the given length (for codes seen for the first time)
+    @staticmethod
+    def grow(totals, length):
+        if len(totals) == length:
+            return totals
+        return np.concatenate((totals, np.zeros(length - len(totals), dtype=totals.dtype)))
+
+    # Returns (bike_id, revenue, rentals) for the bikes with the highest revenue (all bikes if limit is None)
+    def revenue_per_bike(self, limit=None):
+        self.update()
+        order = self.top(self.revenue_by_bike, limit)
+        return [(self.bike_ids[i], float(self.revenue_by_bike[i]), int(self.rentals_by_bike[i])) for i in order]
+
+    """
+    Returns (bike type, revenue, rentals) per bike type, highest revenue first. Types come from the given inventory;
+    rentals of bikes that are no longer in it are reported as "Unknown".
+    """
+    def revenue_per_type(self, bike_inventory):
+        self.update()
+        type_codes, types = {}, []
+        bike_types = np.empty(len(self.bike_ids), dtype=np.int64)
+        for i, bike_id in enumerate(self.bike_ids):
+            bike = bike_inventory.get(bike_id)
+            bike_type = bike.bike_type if bike is not None else "Unknown"
+            if bike_type not in type_codes:
+                type_codes[bike_type] = len(types)
+                types.append(bike_type)
+            bike_types[i] = type_codes[bike_type]
+        revenue = np.bincount(bike_types, weights=self.revenue_by_bike, minlength=len(types))
+        rentals = np.bincount(bike_types, weights=self.rentals_by_bike, minlength=len(types))
+        return [(types[i], float(revenue[i]), int(rentals[i])) for i in np.argsort(-revenue, kind="stable")]
+
+    """
+    Returns (bike_id, booked hours, utilization) for the most used bikes (all if limit is None), where utilization is the
+    share of the period that the bike was rented. The period defaults to the span of the booked times in the history.
+    Rentals without booked times cannot be placed in any period, so their hours are left out.
+    """
+    def utilization(self, period_hours=None, limit=None):
+        self.update()
+        if period_hours is None:
+            period_hours = self.period_hours()
+        if not period_hours:
+            return []
+        share = self.timed_hours_by_bike / period_hours
+        order = self.top(self.timed_hours_by_bike, limit)
+        return [(self.bike_ids[i], float(self.timed_hours_by_bike[i]), float(share[i])) for i in order]
+
+    # Hours between the first booked start and the last booked end in the history (None if no rental has times)
+    def period_hours(self):
+        self.update()
+        if self.first_start is None:
+            return None
+        return (self.last_end - self.first_start) / 3600
+
+    # Returns (phone, name, revenue, rentals) for the customers who spent the most
+    def top_customers(self, limit=10):
+        self.update()
+        order = self.top(self.revenue_by_phone, limit)
+        return [(*self.customers[i], float(self.revenue_by_phone[i]), int(self.rentals_by_phone[i])) for i in order]
+
+    # Returns (low, high, rentals) per rental duration bin, in hours
+    def duration_histogram(self):
+        self.update()
+        edges = self.DURATION_BINS
+        return [(edges[i], edges[i + 1], int(count)) for i, count in enumerate(self.duration_counts)]
+
+    # Returns the number of rentals per status
+    def status_counts(self):
+        self.update()
+        return {status: int(count) for status, count in zip(self.columns.strings["status"].values, self.rentals_by_status)}
+
+    # Indexes of the largest values, largest first; argpartition keeps this O(n) for a small limit
+    @staticmethod
+    def top(values, limit):
+        if limit is None or limit >= len(values):
+            return np.argsort(-values, kind="stable")
+        candidates = np.argpartition(-values, limit)[:limit]
+        return candidates[np.argsort(-values[candidates], kind="stable")]
@@ -0,0 +1,73 @@
+from bisect import bisect_left, bisect_right
+
+"""
+The booked time windows of every bike, for reservations. Each bike's windows are kept as two parallel lists sorted by
+start time (start times, and the matching end times). A bike is never booked twice at the same time, so its windows do
+not overlap and the end times are sorted as well. That makes a conflict check one binary search, O(log n) in the
+number of windows of the bike, and "which bikes are free from t1 to t2" one binary search per bike.
+
+Times are POSIX timestamps and windows are half-open: a window that ends at 10:00 does not conflict with one that starts
+at 10:00.
+"""
+class BikeSchedule:
+
+    def __init__(self):
+        self.starts = {}  # Case-folded bike_id -> start times in ascending order
+        self.ends = {}    # Case-folded bike_id -> end times, in the same order as the start times
+
+    def __len__(self):
+        return sum(len(starts) for starts in self.starts.values())
+
+    def add(self, key, start, end):
+        starts = self.starts.setdefault(key, [])
+        ends = self.ends.setdefault(key, [])
+        i = bisect_right(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    # Adds many windows of one bike at once, e.g. when loading; they are sorted once instead of inserted one by one
+    def extend(self, key, windows):
+        windows = sorted(list(zip(self.starts.get(key, []), self.ends.get(key, []))) + list(windows))
+        self.starts[key] = [start for start, _ in windows]
+        self.ends[key] = [end for _, end in windows]
+
+    def remove(self, key, start, end):
+        starts = self.starts.get(key)
+        if not starts:
+            return
+        ends = self.ends[key]
+        i = bisect_left(starts, start)
+        while i < len(starts) and starts[i] == start:
+            if ends[i] == end:
+                del starts[i]
+                del ends[i]
+                break
+            i += 1
+        if not starts:
+            del self.starts[key]
+            del self.ends[key]
+
+    # Returns the (start, end) window of the bike that overlaps [start, end), or None if the bike is free then
+    def conflict(self, key, start, end):
+        starts = self.starts.get(key)
+        if not starts:
+            return None
+        i = bisect_left(starts, end) - 1  # The last window that starts before the requested one ends
+        if i >= 0 and self.ends[key][i] > start:
+            return starts[i], self.ends[key][i]
+        return None
+
+    # Returns the windows of the bike in order, as (start, end) pairs
+    def windows(self, key):
+        return list(zip(self.starts.get(key, []), self.ends.get(key, [])))
+
+    # Yields the keys (of the given bike keys) that are free for the whole of [start, end)
+    def free(self, keys, start, end):
+        for key in keys:
+            starts = self.starts.get(key)
+            if not starts:
+                yield key
+                continue
+            i = bisect_left(starts, end) - 1
+            if i < 0 or self.ends[key][i] <= start:
+                yield key
@@ -0,0 +1,255 @@
+import sys
+import json
+import base64
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pedalhub import PedalHub
+from inventory import BikeInventory
+from operations import HubOperations, OperationResult
+
+"""
+A local HTTP/JSON service over a PedalHub, so that many kiosks or apps can use one PedalHub at the same time.
+
+    GET  /bikes                  list the bike inventory
+    GET  /bookings               list the active rentals
+    POST /rent                   {"bike_id", "customer_firstName", "customer_lastName", "customer_phone", "rental_hours"}
+                                 (optionally "start_time": "YYYY-MM-DD HH:MM" to reserve the bike for later)
+    POST /pick_up                {"bike_id"}                                     start a reserved rental
+    POST /quote                  {"bike_ids", "rental_hours"}                    price bikes without booking them
+                                 ("bike_ids": null for all bikes; "rental_hours" a number or a list of numbers)
+    POST /complete               {"bike_id"}
+    POST /admin/cancel           {"bike_id"}                                     cancel the rental, else the next reservation (admin)
+    POST /admin/add_bike         {"bike_id", "bike_type", "size", "color", "rental_price"}  (admin)
+    POST /admin/delete_bike      {"bike_id"}                                     (admin)
+
+Admin requests use HTTP Basic authentication with PedalHub's admin credentials. Responses are the OperationResult as JSON
+(status 200 on success, 400 if the request or its arguments are invalid, 409 if the operation was refused because of the
+current bikes and bookings).
+
+Every change to a bike runs under that bike's lock, and the lock is held until the change is on disk, so two concurrent
+rentals of the same bike cannot both succeed. Requests never save on their own: a single writer task persists all
+changes made since its last run in one flush (group commit) and then answers every request that was waiting for it.
+The hub itself is only used from one worker thread (see run()), so loading, waiting for the data file lock and flushing
+never block the event loop: other connections are still read and answered meanwhile.
+
+Usage: python service.py [PORT]
+"""
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 409: "Conflict"}
+
+
+# The HTTP status for an operation's result
+def result_status(result):
+    if result.ok:
+        return 200
+    return 400 if result.invalid else 409
+
+
+class PedalHubService:
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.api = HubOperations(hub)
+        self.bike_locks = {}        # Case-folded bike_id -> asyncio.Lock
+        self.waiting = []           # Futures of requests waiting for their change to be saved
+        self.changes = None         # Set when there are changes for the writer to save
+        self.writer = None
+        self.server = None
+        self.executor = None        # The single thread that uses the hub
+        self.flushes = 0            # Number of group commits done by the writer
+
+    def bike_lock(self, bike_id):
+        key = BikeInventory.key(str(bike_id))
+        lock = self.bike_locks.get(key)
+        if lock is None:
+            lock = self.bike_locks[key] = asyncio.Lock()
+        return lock
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.changes = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pedalhub")
+        self.hub.deferred_saves += 1  # Changes are only saved by the writer task
+        self.writer = asyncio.create_task(self.write_changes())
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.writer is not None:
+            self.writer.cancel()
+            try:
+                await self.writer
+            except asyncio.CancelledError:
+                pass
+        await self.run(self.finish)
+        self.executor.shutdown()
+        for future in self.waiting:
+            future.set_result(None)
+        self.waiting = []
+
+    def finish(self):
+        self.hub.deferred_saves -= 1
+        self.hub.storage.flush()
+
+    """
+    Runs function() on the worker thread and returns its result. Every use of the hub goes through here, so the hub is
+    never used by two threads at once, and a blocking file lock, fsync or compaction only holds up the worker.
+    """
+    async def run(self, function):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function)
+
+    # The single writer: saves everything changed since its last run, then wakes up the requests that waited for it
+    async def write_changes(self):
+        while True:
+            await self.changes.wait()
+            self.changes.clear()
+            waiting, self.waiting = self.waiting, []
+            try:
+                await self.run(self.hub.storage.flush)
+            except asyncio.CancelledError:
+                self.waiting = waiting + self.waiting  # Answered after the final flush in stop()
+                raise
+            except Exception as e:
+                print(f"Error saving data: {e}")
+            self.flushes += 1
+            for future in waiting:
+                if not future.done():
+                    future.set_result(None)
+            await asyncio.sleep(0)  # Let more requests queue up for the next group commit
+
+    # Waits until the changes made so far have been saved by the writer
+    async def saved(self):
+        future = asyncio.get_running_loop().create_future()
+        self.waiting.append(future)
+        self.changes.set()
+        await future
+
+    # Runs a change under the bike's lock and answers only once it is saved
+    async def change(self, bike_id, operation):
+        async with self.bike_lock(bike_id):
+            result = await self.run(operation)
+            if result.ok:
+                await self.saved()
+        return result
+
+    def is_admin(self, headers):
+        auth = headers.get("authorization", "")
+        if not auth.startswith("Basic "):
+            return False
+        try:
+            username, _, password = base64.b64decode(auth[6:]).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            return False
+        return username == self.hub.ADMIN_USERNAME and password == self.hub.ADMIN_PASSWORD
+
+    # Returns (status, response body) for one request
+    async def route(self, method, path, headers, body):
+        if method == "GET" and path == "/bikes":
+            return 200, await self.run(lambda: [bike.to_dict() for bike in self.hub.bike_inventory])
+        if method == "GET" and path == "/bookings":
+            return 200, await self.run(lambda: [booking.to_dict() for booking in self.hub.bookings])
+        if method != "POST":
+            return 404, {"ok": False, "message": "Not found."}
+
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object.")
+        except ValueError as e:
+            return 400, {"ok": False, "message": f"Invalid JSON: {e}"}
+
+        if path == "/quote":  # Read-only, so it needs no bike lock and nothing is saved
+            if "bike_ids" not in request or "rental_hours" not in request:
+                return 400, {"ok": False, "message": "bike_ids and rental_hours are required."}
+            result = await self.run(lambda: self.api.execute({**request, "op": "quote"}))
+            return result_status(result), result.to_dict()
+
+        operations = {
+            "/rent": "rent",
+            "/pick_up": "pick_up",
+            "/complete": "complete",
+            "/admin/cancel": "cancel",
+            "/admin/add_bike": "add_bike",
+            "/admin/delete_bike": "delete_bike",
+        }
+        op = operations.get(path)
+        if op is None:
+            return 404, {"ok": False, "message": "Not found."}
+        if path.startswith("/admin/") and not self.is_admin(headers):
+            return 401, {"ok": False, "message": "Admin login required."}
+        if "bike_id" not in request:
+            return 400, {"ok": False, "message": "bike_id is required."}
+
+        result = await self.change(request["bike_id"], lambda: self.api.execute({**request, "op": op}))
+        return result_status(result), result.to_dict()
+
+    # Writes one JSON response
+    @staticmethod
+    async def respond(writer, status, response, keep_alive):
+        data = json.dumps(response).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + data
+        )
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                if len(parts) < 2:
+                    break
+                method, path = parts[0].upper(), parts[1]
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:  # Where the body ends is unknown, so the connection cannot be used any further
+                    await self.respond(writer, 400, {"ok": False, "message": "Invalid Content-Length header."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, response = await self.route(method, path, headers, body)
+                except Exception as e:
+                    status, response = 400, OperationResult(False, f"Error: {e}").to_dict()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(port):
+    hub = PedalHub()
+    service = PedalHubService(hub)
+    await service.start(port=port)
+    print(f"PedalHub service listening on http://127.0.0.1:{port}")
+    try:
+        await asyncio.Event().wait()  # Run until interrupted
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8080))
+    except KeyboardInterrupt:
+        print("\nService stopped.")
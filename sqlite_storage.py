@@ -0,0 +1,270 @@
+import sys
+import sqlite3
+from contextlib import contextmanager
+from bikedetails import BikeDetails
+from booking import Booking, OPEN_STATUSES
+from inventory import BikeInventory
+from booking_index import BookingIndex
+from storage import StorageBackend
+
+"""
+A storage backend that keeps bikes and bookings (active and completed) in a local SQLite database.
+The database runs in WAL mode with indexes on bike ID, booking status and customer phone. Each change is written by a
+fixed set of parameterized statements (compiled once and reused from sqlite3's statement cache) inside one transaction,
+so a rental or completion is either fully stored or not at all. Inside PedalHub.batch_saves() the transaction is only
+committed when the block ends. Several processes can share the database: changes run in an immediate (write-locked)
+transaction, and the hub reloads its data when another process has committed since it last read it.
+
+Select it with PedalHub.STORAGE_BACKEND = "sqlite". Existing JSON data is imported with:
+    python sqlite_storage.py migrate [DATABASE_FILE]
+"""
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bikes (
+    id INTEGER PRIMARY KEY,
+    bike_key TEXT NOT NULL UNIQUE,
+    bike_id TEXT NOT NULL,
+    bike_type TEXT NOT NULL,
+    size TEXT NOT NULL,
+    color TEXT NOT NULL,
+    rental_price REAL NOT NULL,
+    available INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY,
+    customer_firstName TEXT NOT NULL,
+    customer_lastName TEXT NOT NULL,
+    customer_phone TEXT NOT NULL,
+    bike_id TEXT NOT NULL,
+    bike_key TEXT NOT NULL,
+    rental_hours REAL NOT NULL,
+    total_cost REAL NOT NULL,
+    status TEXT NOT NULL,
+    start_time TEXT,
+    end_time TEXT
+);
+CREATE INDEX IF NOT EXISTS bookings_bike_status ON bookings (bike_key, status);
+CREATE INDEX IF NOT EXISTS bookings_status ON bookings (status);
+CREATE INDEX IF NOT EXISTS bookings_phone ON bookings (customer_phone);
+"""
+
+BIKE_COLUMNS = "bike_id, bike_type, size, color, rental_price, available"
+BOOKING_COLUMNS = "customer_firstName, customer_lastName, customer_phone, bike_id, rental_hours, total_cost, status, start_time, end_time"
+OPEN = f"status IN ({', '.join(repr(status) for status in OPEN_STATUSES)})"  # Bookings that still hold their bike
+
+INSERT_BIKE = f"INSERT INTO bikes (bike_key, {BIKE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+DELETE_BIKE = "DELETE FROM bikes WHERE bike_key = ?"
+SET_AVAILABLE = "UPDATE bikes SET available = ? WHERE bike_key = ?"
+INSERT_BOOKING = f"INSERT INTO bookings (bike_key, {BOOKING_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+ACTIVE_BOOKING_FOR_BIKE = "SELECT id FROM bookings WHERE bike_key = ? AND status = 'Active' ORDER BY id LIMIT 1"
+NEXT_RESERVATION = "SELECT id FROM bookings WHERE bike_key = ? AND status = 'Reserved' ORDER BY start_time, id LIMIT 1"
+NTH_OPEN_BOOKING = f"SELECT id, bike_key, status FROM bookings WHERE {OPEN} ORDER BY id LIMIT 1 OFFSET ?"
+START_BOOKING = "UPDATE bookings SET status = 'Active' WHERE id = ?"
+COMPLETE_BOOKING = "UPDATE bookings SET status = 'Completed' WHERE id = ?"
+DELETE_BOOKING = "DELETE FROM bookings WHERE id = ?"
+
+
+class SqliteStorage(StorageBackend):
+
+    def __init__(self, hub, filename):
+        super().__init__(hub)
+        self.filename = filename
+        # The HTTP service uses the hub from a worker thread (see PedalHubService.run), one call at a time
+        self.connection = sqlite3.connect(filename, cached_statements=64, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # FULL syncs the WAL at every commit, so a committed change survives a power failure like a journaled one. (NORMAL
+        # only syncs at WAL checkpoints and can lose the last commits, though never corrupt the database.)
+        self.connection.execute("PRAGMA synchronous=FULL")
+        self.connection.executescript(SCHEMA)
+        # Databases created before bookings had times get the new columns
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(bookings)")}
+        for column in ("start_time", "end_time"):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE bookings ADD COLUMN {column} TEXT")
+        self.connection.commit()
+        self.data_version = None   # PRAGMA data_version when the data was last loaded; changes when another process commits
+        self.lock_depth = 0
+
+    def current_data_version(self):
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    # Holds SQLite's write lock (an immediate transaction) so that no other process commits in the meantime
+    @contextmanager
+    def locked(self):
+        if self.lock_depth == 0 and self.hub.SHARED_DATA and not self.connection.in_transaction:
+            self.connection.execute("BEGIN IMMEDIATE")
+        self.lock_depth += 1
+        try:
+            yield
+        finally:
+            self.lock_depth -= 1
+            if self.lock_depth == 0 and not self.hub.deferred_saves:
+                self.connection.commit()
+
+    # The data is loaded again only if another process has committed a change since it was last read
+    def refresh(self):
+        if not self.hub.SHARED_DATA or self.current_data_version() == self.data_version:
+            return False
+        self.load()
+        self.hub.reports = None  # Rebuilt from the database when next used
+        self.hub.save_stats["reloads"] += 1
+        return True
+
+    def load(self):
+        hub = self.hub
+        hub.bike_inventory = BikeInventory(
+            BikeDetails(*row[:5], available=bool(row[5]))
+            for row in self.connection.execute(f"SELECT {BIKE_COLUMNS} FROM bikes ORDER BY id")
+        )
+        self.load_bookings()
+        hub.dirty.clear()
+        self.data_version = self.current_data_version()
+
+    # The bookings are loaded together with the bikes by load(); this is only used to read them again
+    def load_bookings(self):
+        hub = self.hub
+        hub.bookings = [
+            Booking(*row) for row in self.connection.execute(f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE {OPEN} ORDER BY id")
+        ]
+        hub.booking_index = BookingIndex(hub.bookings)
+
+    def save(self):
+        self.connection.commit()
+        self.hub.dirty.clear()
+
+    # Completed rentals stay in the bookings table, so there is nothing to do beyond the status update in record()
+    def archive(self, record):
+        pass
+
+    def iter_history(self):
+        for row in self.connection.execute(f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE NOT {OPEN} ORDER BY id"):
+            yield dict(zip(Booking.__slots__, row))
+
+    """
+    Writes one change inside a savepoint, so that if it fails only this change is undone: changes made before it in the
+    same transaction (e.g. earlier in a batch) are kept. The hub has already applied the change in memory, so its data is
+    then read back from the database.
+    """
+    def record(self, op, data):
+        connection = self.connection
+        try:
+            if not connection.in_transaction:
+                connection.execute("BEGIN")  # Releasing the savepoint must not commit on its own
+            connection.execute("SAVEPOINT operation")
+            try:
+                self.execute_operation(op, data)
+            except sqlite3.Error:
+                connection.execute("ROLLBACK TO operation")
+                raise
+            finally:
+                connection.execute("RELEASE operation")
+        except sqlite3.Error as e:
+            print(f"Error saving data: {e}")
+            self.load()
+            self.hub.reports = None
+            return
+        if self.hub.deferred_saves:
+            self.hub.save_stats["saves_coalesced"] += 1
+            return
+        try:
+            self.save()
+        except sqlite3.Error as e:
+            print(f"Error saving data: {e}")  # The transaction stays open and is committed with the next change
+
+    # Writes one change to the database (in the current transaction)
+    def execute_operation(self, op, data):
+        execute = self.connection.execute
+        if op == "rent":
+            booking = Booking.from_dict(data)
+            key = BikeInventory.key(booking.bike_id)
+            if booking.status == 'Active':  # A reservation keeps the bike available until it is picked up
+                execute(SET_AVAILABLE, (0, key))
+            execute(INSERT_BOOKING, (key, booking.customer_firstName, booking.customer_lastName, booking.customer_phone,
+                                     booking.bike_id, booking.rental_hours, booking.total_cost, booking.status,
+                                     booking.start_time, booking.end_time))
+
+        elif op == "pick_up":
+            key = BikeInventory.key(data["bike_id"])
+            row = execute(NEXT_RESERVATION, (key,)).fetchone()
+            if row is not None:
+                execute(START_BOOKING, row)
+                execute(SET_AVAILABLE, (0, key))
+
+        elif op == "complete":
+            key = BikeInventory.key(data["bike_id"])
+            row = execute(ACTIVE_BOOKING_FOR_BIKE, (key,)).fetchone()
+            if row is not None:
+                execute(COMPLETE_BOOKING, row)
+            execute(SET_AVAILABLE, (1, key))
+
+        elif op == "add_bike":
+            bike = BikeDetails.from_dict(data)
+            execute(INSERT_BIKE, (BikeInventory.key(bike.bike_id), bike.bike_id, bike.bike_type, bike.size, bike.color,
+                                  bike.rental_price, int(bike.available)))
+
+        elif op == "delete_bike":
+            execute(DELETE_BIKE, (BikeInventory.key(data["bike_id"]),))
+
+        elif op == "delete_booking":
+            # Bookings are numbered in the same order PedalHub keeps its active bookings in
+            row = execute(NTH_OPEN_BOOKING, (data["index"],)).fetchone()
+            if row is not None:
+                execute(DELETE_BOOKING, (row[0],))
+                if row[2] == 'Active':
+                    execute(SET_AVAILABLE, (1, row[1]))
+
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    """
+    Imports bikes, active bookings and the rental history from a PedalHub that uses the JSON files into this database.
+    The database must be empty.
+    """
+    def import_from(self, source_hub):
+        if self.connection.execute("SELECT 1 FROM bikes UNION ALL SELECT 1 FROM bookings LIMIT 1").fetchone():
+            raise ValueError(f"{self.filename} already contains data.")
+        with self.connection:
+            self.connection.executemany(INSERT_BIKE, (
+                (BikeInventory.key(bike.bike_id), bike.bike_id, bike.bike_type, bike.size, bike.color, bike.rental_price,
+                 int(bike.available)) for bike in source_hub.bike_inventory
+            ))
+            # History first, so that ids follow the order in which the rentals were made
+            bookings = [booking.to_dict() for booking in source_hub.bookings]
+            for records in (source_hub.iter_history(), bookings):
+                self.connection.executemany(INSERT_BOOKING, (
+                    (BikeInventory.key(record["bike_id"]), record["customer_firstName"], record["customer_lastName"],
+                     record["customer_phone"], record["bike_id"], record["rental_hours"], record["total_cost"],
+                     record.get("status", "Completed"), record.get("start_time"), record.get("end_time")) for record in records
+                ))
+
+
+# Imports the JSON data files (as configured on PedalHub) into a new SQLite database
+def migrate(database_file):
+    from pedalhub import PedalHub
+
+    class JsonPedalHub(PedalHub):
+        STORAGE_BACKEND = "json"
+
+    source_hub = JsonPedalHub()
+    target = SqliteStorage(source_hub, database_file)
+    try:
+        target.import_from(source_hub)
+        bike_count = target.connection.execute("SELECT COUNT(*) FROM bikes").fetchone()[0]
+        booking_count = target.connection.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        print(f"Imported {bike_count} bikes and {booking_count} bookings into {database_file}.")
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error migrating data: {e}")
+    finally:
+        target.close()
+        source_hub.storage.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Usage: python sqlite_storage.py migrate [DATABASE_FILE]")
+        sys.exit(1)
+    from pedalhub import PedalHub
+    migrate(sys.argv[2] if len(sys.argv) > 2 else PedalHub.DATABASE_FILE)
@@ -0,0 +1,481 @@
+import os
+import json
+import shutil
+import struct
+import marshal
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from bikedetails import BikeDetails
+from booking import Booking, OPEN_STATUSES
+from journal import Journal
+from inventory import BikeInventory
+from booking_index import BookingIndex
+from history_archive import HistoryArchive
+
+try:
+    import fcntl  # File locking is only available on Unix-like systems
+except ImportError:
+    fcntl = None
+
+"""
+The persistence interface behind PedalHub.load_data/save_data. A storage backend loads the bikes and active bookings into
+a PedalHub, persists each change the hub applies, and gives access to the rental history. PedalHub picks the backend
+named by its STORAGE_BACKEND setting (see PedalHub.create_storage).
+"""
+class StorageBackend:
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    # Fills hub.bike_inventory, hub.bookings and hub.booking_index from storage
+    def load(self):
+        raise NotImplementedError
+
+    # Fills hub.bookings and hub.booking_index from storage. A backend whose load() leaves hub.bookings None (not loaded yet)
+    # has this called by PedalHub on first use.
+    def load_bookings(self):
+        raise NotImplementedError
+
+    # Writes everything that has not been persisted yet
+    def save(self):
+        raise NotImplementedError
+
+    # Persists one change that the hub has just applied (see PedalHub.apply_operation)
+    def record(self, op, data):
+        raise NotImplementedError
+
+    # Called when the outermost PedalHub.batch_saves() block ends, to persist the changes made inside it together
+    def flush(self):
+        self.save()
+
+    # Called by PedalHub.apply_operation with each booking that has been completed
+    def archive(self, record):
+        pass
+
+    # Returns a context manager that keeps other processes from changing the stored data while it is held
+    def locked(self):
+        return nullcontext()
+
+    """
+    Brings the hub up to date with changes other processes have stored since this process last read them.
+    Called while locked(); returns True if anything changed.
+    """
+    def refresh(self):
+        return False
+
+    # Lazily yields every completed rental, oldest first
+    def iter_history(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+"""
+Stores bikes and active bookings in JSON (or binary) snapshot files, completed rentals in the history archive, and - with
+USE_JOURNAL - every change in an append-only journal that is folded into the snapshot files every COMPACT_EVERY changes.
+"""
+class JsonStorage(StorageBackend):
+    CACHE_VERSION = 1  # Changed whenever the format of the inventory cache changes
+
+    def __init__(self, hub):
+        super().__init__(hub)
+        self.history = HistoryArchive(hub.HISTORY_DIR, hub.HISTORY_FORMAT)  # Completed rentals, kept on disk
+        self.journal = Journal(hub.JOURNAL_FILE)
+        self.save_marker = hub.JOURNAL_FILE + ".saving"  # Exists while a compaction is replacing the data files
+        self.stamps = {}         # Store -> (inode, mtime, size) of its file when this process last read or wrote it
+        self.lock_file = None
+        self.lock_depth = 0
+        self.lock_held = False   # True while this process holds the lock on LOCK_FILE
+
+    # Identifies a version of a file: it changes whenever the file is replaced or rewritten
+    @staticmethod
+    def file_stamp(filename):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def store_files(self):
+        return (("bikes", self.hub.BIKE_FILE), ("bookings", self.hub.BOOKINGS_FILE))
+
+    """
+    Holds an exclusive fcntl lock on LOCK_FILE, so that only one process at a time reads-then-changes the shared files.
+    The lock can be taken again by the same process while it is held (e.g. a save inside a change).
+    """
+    @contextmanager
+    def locked(self):
+        if fcntl is not None and self.hub.SHARED_DATA and not self.lock_held:
+            if self.lock_file is None:
+                self.lock_file = open(self.hub.LOCK_FILE, "a")
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+            self.lock_held = True
+        self.lock_depth += 1
+        try:
+            yield
+        finally:
+            self.lock_depth -= 1
+            if self.lock_depth == 0:
+                self.release()
+
+    """
+    Releases the lock when the outermost locked() block ends. Without the journal, changes whose save is deferred (see
+    PedalHub.deferred_saves) exist only in memory, so the lock is kept until flush() has saved them, the way the SQLite
+    backend keeps its transaction open. Otherwise another process could replace the files in the meantime, and refresh()
+    would have to throw away either its changes or these.
+    """
+    def release(self):
+        hub = self.hub
+        if not self.lock_held:
+            return
+        if hub.deferred_saves and not hub.USE_JOURNAL and (hub.dirty or self.history.pending):
+            return
+        self.lock_held = False
+        fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+
+    """
+    Catches up with other processes: data files whose version stamp changed are loaded again (only those), and journal
+    records appended since the last read are applied. If another process compacted the journal, the changes this
+    process had not saved yet are already in the files, so they are no longer dirty.
+    """
+    def refresh(self):
+        hub = self.hub
+        if not hub.SHARED_DATA:
+            return False
+        self.recover()  # Another process may have died while saving
+        changed = False
+        if hub.USE_JOURNAL and self.journal.checkpoint_changed():
+            hub.dirty.clear()
+            self.history.pending = []
+            changed = True
+
+        for store, filename in self.store_files():
+            if store == "bookings" and not hub.bookings_loaded():
+                continue  # Read when first used, so they will be up to date then
+            if store in hub.dirty:
+                continue  # Unsaved changes are never thrown away; the lock keeps others from saving the store meanwhile (see release)
+            if self.file_stamp(filename) != self.stamps.get(store):
+                self.load_store(store)
+                changed = True
+        if changed:
+            self.history.refresh()
+            hub.reports = None  # Other processes added to the history; the reports are rebuilt when next used
+
+        if hub.USE_JOURNAL:
+            for op, data in self.journal.read_new():
+                hub.apply_operation(op, data)
+                changed = True
+        if changed:
+            hub.save_stats["reloads"] += 1
+        return changed
+
+    # Loads one store ("bikes" or "bookings") from its file again
+    def load_store(self, store):
+        hub = self.hub
+        if store == "bikes":
+            hub.bike_inventory = self.load_inventory()
+        else:
+            self.stamps[store] = self.file_stamp(hub.BOOKINGS_FILE)
+            hub.bookings = [Booking.from_dict(booking) for booking in hub.stream_from_file(hub.BOOKINGS_FILE)
+                            if booking.get('status', 'Active') in OPEN_STATUSES]
+            hub.booking_index = BookingIndex(hub.bookings)
+
+    def load(self):
+        with self.locked():
+            self.load_files()
+
+    """
+    Loads the bike inventory and replays the journal. The active bookings are not needed to show the main menu, so they
+    are only read when first used (see PedalHub.bookings and load_bookings), unless the old single-file rental history
+    still has to be migrated. Completed rentals stay on disk in the history archive and are streamed when read.
+    """
+    def load_files(self):
+        hub = self.hub
+        self.history = HistoryArchive(hub.HISTORY_DIR, hub.HISTORY_FORMAT)
+        self.recover()
+        try:
+            hub.bike_inventory = self.load_inventory()
+        # Handle errors if files are missing or corrupted (a JSON file that cannot be parsed and a damaged binary file
+        # both raise ValueError; struct.error if a binary row is cut)
+        except (FileNotFoundError, ValueError, struct.error) as e:
+            print(f"Error loading data: {e}. Files will be recreated on save.")
+            hub.bike_inventory = BikeInventory()
+            hub.dirty.add("bikes")
+        if not os.path.exists(hub.BIKE_FILE):  # Missing files are created on the next save
+            hub.dirty.add("bikes")
+
+        hub.bookings = None  # Not loaded yet
+        if os.path.exists(hub.HISTORY_FILE):
+            self.load_bookings()
+
+        if hub.USE_JOURNAL:
+            # Replay the changes made after the last compaction on top of the loaded files (this loads the bookings if a
+            # change needs them)
+            for op, data in self.journal.read():
+                hub.apply_operation(op, data)
+
+    """
+    Loads the bike inventory from BIKE_FILE. With CACHE_INVENTORY, a snapshot of the inventory is kept in
+    BIKE_FILE + ".cache" (in marshal format, which loads several times faster than parsing the file), tagged with the
+    version stamp (inode, modification time and size) of the file it was made from. The snapshot is used instead of
+    parsing the file as long as the file has that stamp, and is rewritten whenever the file is parsed or saved.
+    """
+    def load_inventory(self):
+        hub = self.hub
+        stamp = self.file_stamp(hub.BIKE_FILE)
+        self.stamps["bikes"] = stamp
+        if hub.CACHE_INVENTORY and stamp is not None:
+            try:
+                with open(hub.BIKE_FILE + ".cache", "rb") as file:
+                    version, cached_stamp, keys, rows = marshal.loads(file.read())  # One read; marshal.load reads piecewise
+                if version == self.CACHE_VERSION and tuple(cached_stamp) == stamp:
+                    return BikeInventory.from_snapshot(keys, rows)
+            except (OSError, EOFError, ValueError, TypeError):
+                pass  # No usable snapshot; the file is parsed instead
+        inventory = BikeInventory(hub.stream_from_file(hub.BIKE_FILE, BikeDetails.from_dict))
+        if stamp is not None:
+            self.save_inventory_cache(inventory, stamp)
+        return inventory
+
+    # Writes the snapshot of the inventory read from (or saved to) the version of BIKE_FILE with the given stamp
+    def save_inventory_cache(self, inventory, stamp):
+        if not self.hub.CACHE_INVENTORY:
+            return
+        cache_file = self.hub.BIKE_FILE + ".cache"
+        try:
+            with open(cache_file + ".tmp", "wb") as file:
+                file.write(marshal.dumps((self.CACHE_VERSION, stamp, *inventory.snapshot())))
+            os.replace(cache_file + ".tmp", cache_file)
+        except (OSError, ValueError) as e:
+            print(f"Error saving the inventory cache: {e}")
+
+    """
+    Loads the active bookings from BOOKINGS_FILE, on first use. Completed bookings saved by older versions are moved to the
+    history archive on the next save, and an old single-file rental history is migrated into the archive.
+    """
+    def load_bookings(self):
+        hub = self.hub
+        with self.locked():
+            self.stamps["bookings"] = self.file_stamp(hub.BOOKINGS_FILE)
+            try:
+                stored_bookings = hub.load_from_file(hub.BOOKINGS_FILE)
+            except (FileNotFoundError, ValueError, struct.error) as e:  # Missing or corrupted, as in load_files()
+                print(f"Error loading data: {e}. Files will be recreated on save.")
+                stored_bookings = []
+                hub.dirty.add("bookings")
+            if not os.path.exists(hub.BOOKINGS_FILE):
+                hub.dirty.add("bookings")
+
+            hub.bookings = [Booking.from_dict(booking) for booking in stored_bookings
+                            if booking.get('status', 'Active') in OPEN_STATUSES]
+            hub.booking_index = BookingIndex(hub.bookings)
+            completed_bookings = [booking for booking in stored_bookings if booking.get('status', 'Active') not in OPEN_STATUSES]
+            if completed_bookings:
+                hub.dirty.add("bookings")
+
+            if os.path.exists(hub.HISTORY_FILE):
+                self.migrate_history_file(stored_bookings, completed_bookings)
+            else:
+                for booking in completed_bookings:
+                    self.history.append(booking)
+
+    """
+    Moves the rentals of the old single-file rental history into the history archive. The old file recorded every rental
+    (with status "Active") at the time it was made, so records that belong to a booking that is still active are skipped
+    and the rest are archived as completed. The old file is kept as HISTORY_FILE + ".migrated".
+    """
+    def migrate_history_file(self, stored_bookings, completed_bookings):
+        hub = self.hub
+
+        def signature(record):
+            return (record['bike_id'].casefold(), record['customer_phone'], record['rental_hours'], record['total_cost'])
+
+        try:
+            active = Counter(signature(booking) for booking in stored_bookings if booking.get('status', 'Active') == 'Active')
+            completed = {}
+            for booking in completed_bookings:
+                completed.setdefault(signature(booking), []).append(booking)
+
+            for record in hub.stream_from_file(hub.HISTORY_FILE):
+                key = signature(record)
+                if active[key] > 0:
+                    active[key] -= 1  # Still rented out; archived once it is completed
+                elif completed.get(key):
+                    self.history.append(completed[key].pop(0))
+                else:
+                    self.history.append({**record, "status": "Completed"})
+
+            # Completed bookings that were missing from the old history file
+            for bookings in completed.values():
+                for booking in bookings:
+                    self.history.append(booking)
+
+            self.save()
+            os.replace(hub.HISTORY_FILE, hub.HISTORY_FILE + ".migrated")
+        except (json.JSONDecodeError, KeyError, OSError) as e:
+            print(f"Error migrating rental history: {e}")
+
+    def iter_history(self):
+        return iter(self.history)
+
+    def archive(self, record):
+        self.history.append(record)
+
+    """
+    Save current data to the respective files. Only the stores that changed since the last save are written
+    (bikes, active bookings, newly completed rentals), so saving with no changes does not touch the disk.
+    """
+    def save(self):
+        with self.locked():
+            self.refresh()  # Include what other processes stored, so that their changes are not overwritten
+            self.save_files()
+
+    """
+    With the journal enabled, saving is a compaction: the files are made to hold every journaled change and then the
+    journal is checkpointed. Until the checkpoint is written, replaying the journal on top of the new files would apply
+    changes twice, so the old files are kept (see begin_save) and put back if the save does not reach the checkpoint,
+    whether it fails here or the process dies (see recover).
+    """
+    def save_files(self):
+        hub = self.hub
+        if not hub.dirty and not self.history.pending and not self.journal.pending:
+            hub.save_stats["saves_skipped"] += 1
+            return
+        if not hub.USE_JOURNAL:
+            try:
+                self.write_files()
+            except Exception as e:
+                print(f"Error saving data: {e}")
+            return
+        dirty, stamps, pending = set(hub.dirty), dict(self.stamps), self.history.pending
+        try:
+            self.begin_save()
+            self.write_files()
+            self.journal.checkpoint()  # The files now hold every journaled change
+            self.end_save()
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            if self.recover():  # The old files are back, so everything is still unsaved
+                hub.dirty.update(dirty)
+                self.stamps = stamps
+                self.history.pending = pending
+
+    # Appends the newly completed rentals to the history archive and writes the stores that changed
+    def write_files(self):
+        hub = self.hub
+        hub.save_stats["bytes_written"] += self.history.flush()
+        stores = (
+            ("bikes", hub.BIKE_FILE, lambda: [bike.to_dict() for bike in hub.bike_inventory]),
+            ("bookings", hub.BOOKINGS_FILE, lambda: [booking.to_dict() for booking in hub.bookings]),
+        )
+        for store, filename, records in stores:
+            if store not in hub.dirty:
+                hub.save_stats["stores_skipped"] += 1
+                continue
+            hub.save_stats["bytes_written"] += hub.save_to_file(filename, records())
+            hub.save_stats["stores_written"] += 1
+            hub.dirty.discard(store)
+            self.stamps[store] = self.file_stamp(filename)
+            if store == "bikes":
+                self.save_inventory_cache(hub.bike_inventory, self.stamps[store])  # Keeps the next startup warm
+
+    """
+    Prepares a compaction. The save marker records the journal sequence number being folded, how far the history archive
+    goes, and which files are about to be replaced; each of those files that exists is kept as file + ".prev" (a hard
+    link, so nothing is copied). Files are always replaced, never rewritten in place, so the links keep the old versions.
+    """
+    def begin_save(self):
+        hub = self.hub
+        files = [filename for store, filename in self.store_files() if store in hub.dirty]
+        segments = self.history.segments()
+        size = os.path.getsize(segments[-1]) if segments else None
+        if self.history.pending and segments and segments[-1].endswith(".bin"):
+            files.append(segments[-1])  # Binary segments are rewritten as a whole
+        marker = {"seq": self.journal.seq, "segments": len(segments), "size": size,
+                  "files": {filename: os.path.exists(filename) for filename in files}}
+        with open(self.save_marker + ".tmp", "w") as file:
+            json.dump(marker, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.save_marker + ".tmp", self.save_marker)
+
+        for filename, existed in marker["files"].items():
+            if existed:
+                if os.path.exists(filename + ".prev"):
+                    os.remove(filename + ".prev")
+                try:
+                    os.link(filename, filename + ".prev")
+                except OSError:  # The file system has no hard links
+                    shutil.copy2(filename, filename + ".prev")
+
+    # Drops the old files kept by begin_save once the checkpoint is written
+    def end_save(self):
+        with open(self.save_marker, "r") as file:
+            marker = json.load(file)
+        for filename in marker["files"]:
+            if os.path.exists(filename + ".prev"):
+                os.remove(filename + ".prev")
+        os.remove(self.save_marker)
+
+    """
+    Finishes a compaction that did not end normally, as told by the save marker. If the journal checkpoint was written,
+    the new files are complete and only the old ones are removed. Otherwise the old files are put back, files that did
+    not exist are removed and the history archive is cut back, so the journal replays onto exactly the files it was
+    written against. Returns True if the files were rolled back.
+    """
+    def recover(self):
+        if not os.path.exists(self.save_marker):
+            return False
+        with open(self.save_marker, "r") as file:
+            marker = json.load(file)
+        if self.journal.read_checkpoint() >= marker["seq"]:
+            self.end_save()
+            return False
+        print("Restoring the data files of a save that did not finish.")
+        for filename, existed in marker["files"].items():
+            if os.path.exists(filename + ".prev"):
+                os.replace(filename + ".prev", filename)
+            elif not existed and os.path.exists(filename):
+                os.remove(filename)
+        self.history.truncate(marker["segments"], marker["size"])
+        os.remove(self.save_marker)
+        return True
+
+    # With the journal enabled the batch's journal records are forced to disk together
+    def flush(self):
+        if not self.hub.USE_JOURNAL:
+            self.save()
+            return
+        self.journal.sync()
+        if self.journal.pending >= self.hub.COMPACT_EVERY:
+            self.save()
+
+    """
+    Persists a single change. With the journal enabled the change is appended to the journal (O(1) per operation) and the
+    files are only rewritten every COMPACT_EVERY changes; otherwise the changed files are rewritten.
+    """
+    def record(self, op, data):
+        hub = self.hub
+        if not hub.USE_JOURNAL:
+            if hub.deferred_saves:
+                hub.save_stats["saves_coalesced"] += 1
+            else:
+                self.save()
+            return
+        try:
+            hub.save_stats["bytes_written"] += self.journal.append(op, data, sync=not hub.deferred_saves)
+            if hub.deferred_saves:
+                hub.save_stats["saves_coalesced"] += 1
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return
+        if self.journal.pending >= hub.COMPACT_EVERY and not hub.deferred_saves:
+            self.save()
+
+    def close(self):
+        self.journal.close()
+        if self.lock_file is not None:
+            self.lock_file.close()  # Also releases the lock
+            self.lock_file = None
+            self.lock_held = False
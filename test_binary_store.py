@@ -0,0 +1,100 @@
+import io
+import os
+import math
+import tempfile
+import unittest
+import contextlib
+
+from pedalhub import PedalHub
+from binary_store import BinaryTable, write_table, iter_records, convert
+
+"""
+The binary data file format: records written with write_table are read back unchanged (numbers as floats), and a
+damaged file raises ValueError when it is opened, so PedalHub starts with an error message instead of a traceback.
+
+Run from the project root:  python -m pytest -q test_binary_store.py
+"""
+BIKES = [
+    {"bike_id": "B001", "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.5, "available": True},
+    {"bike_id": "B002", "bike_type": "Électrique", "size": "L", "color": "", "rental_price": 12.0, "available": False},
+]
+BOOKINGS = [
+    {"customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": "09171234567", "bike_id": "B001",
+     "rental_hours": 2, "total_cost": 21.0, "status": "Active", "start_time": "2025-06-02 10:00:00",
+     "end_time": "2025-06-02 12:00:00"},
+    {"customer_firstName": "Ana", "customer_lastName": "Reyes", "customer_phone": "09181234567", "bike_id": "B002",
+     "rental_hours": 1.5, "total_cost": 18.0, "status": "Active", "start_time": None, "end_time": None},
+]
+
+
+class BinaryStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+
+    def test_round_trip(self):
+        for records in (BIKES, BOOKINGS, []):
+            write_table("table.bin", records)
+            self.assertEqual(list(iter_records("table.bin")), records)  # 2 == 2.0, so ints compare equal to their floats
+        table = BinaryTable("table.bin")
+        self.assertEqual(len(table), 0)
+        table.close()
+
+        write_table("table.bin", BOOKINGS)
+        table = BinaryTable("table.bin")
+        self.addCleanup(table.close)
+        self.assertEqual(table[-1], BOOKINGS[-1])
+        self.assertIsInstance(table[0]["rental_hours"], float)
+        with self.assertRaises(IndexError):
+            table[2]
+
+    def test_missing_values(self):
+        write_table("table.bin", [{"name": None, "number": None, "flag": None}, {"name": "x", "number": 1, "flag": True}])
+        first, second = iter_records("table.bin")
+        self.assertIsNone(first["name"])
+        self.assertTrue(math.isnan(first["number"]))  # A missing number is stored as NaN
+        self.assertFalse(first["flag"])
+        self.assertEqual(second, {"name": "x", "number": 1.0, "flag": True})
+
+    def test_convert_to_json_and_back(self):
+        write_table("bikes.bin", BIKES)
+        self.assertEqual(convert("bikes.bin", "bikes.json"), 2)
+        self.assertEqual(convert("bikes.json", "copy.bin"), 2)
+        self.assertEqual(list(iter_records("copy.bin")), BIKES)
+
+    def test_damaged_file_raises_value_error(self):
+        write_table("table.bin", BOOKINGS)
+        with open("table.bin", "rb") as file:
+            data = file.read()
+        damaged = [data[:size] for size in range(len(data))]  # Cut short at every length, including empty
+        damaged += [b"XHUB" + data[4:], data + b"\0"]
+        for content in damaged:
+            with open("damaged.bin", "wb") as file:
+                file.write(content)
+            with self.subTest(size=len(content)), self.assertRaises(ValueError):
+                BinaryTable("damaged.bin").close()
+
+    def test_hub_starts_with_damaged_files(self):
+        hub_class = type("BinaryPedalHub", (PedalHub,), {"BIKE_FILE": "bikes.bin", "BOOKINGS_FILE": "bookings.bin"})
+        write_table(hub_class.BIKE_FILE, BIKES)
+        write_table(hub_class.BOOKINGS_FILE, BOOKINGS)
+        for name in (hub_class.BIKE_FILE, hub_class.BOOKINGS_FILE):
+            with open(name, "r+b") as file:
+                file.truncate(os.path.getsize(name) - 5)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            hub = hub_class()
+            bookings = hub.bookings  # Loaded on first use
+        self.addCleanup(hub.storage.close)
+        self.assertEqual(output.getvalue().count("Error loading data"), 2)
+        self.assertEqual(len(hub.bike_inventory), 0)
+        self.assertEqual(bookings, [])
+        self.assertTrue({"bikes", "bookings"} <= hub.dirty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import os
+import json
+import random
+import tempfile
+import unittest
+import contextlib
+
+from booking import Booking
+from pedalhub import PedalHub
+from booking_index import BookingIndex
+
+"""
+The booking indexes must always agree with a scan of the bookings: the active booking of each bike, the reservations of
+each bike and the open bookings of each customer phone number.
+
+Run from the project root:  python -m pytest -q test_booking_index.py
+"""
+
+
+def booking(bike_id, phone, status="Active", start_time=None, end_time=None):
+    return Booking("Juan", "Cruz", phone, bike_id, 2, 20.0, status, start_time, end_time)
+
+
+class BookingIndexTest(unittest.TestCase):
+
+    def test_lookups(self):
+        rented = booking("B001", "0917")
+        reserved = booking("B001", "0918", "Reserved", "2030-01-01 10:00", "2030-01-01 12:00")
+        other = booking("B002", "0917")
+        index = BookingIndex([rented, reserved, other])
+        self.assertIs(index.active_for_bike("b001 "), rented)
+        self.assertIs(index.next_reservation("B001"), reserved)
+        self.assertIsNone(index.next_reservation("B002"))
+        self.assertEqual(index.for_phone(" 0917"), [rented, other])
+        self.assertEqual(index.for_phone("0000"), [])
+
+    def test_remove(self):
+        rented, other = booking("B001", "0917"), booking("B002", "0917")
+        index = BookingIndex([rented, other])
+        index.remove(rented)
+        self.assertIsNone(index.active_for_bike("B001"))
+        self.assertEqual(index.for_phone("0917"), [other])
+        index.remove(other)
+        self.assertEqual(index.by_phone, {})
+
+    def test_reservations_are_kept_earliest_first(self):
+        later = booking("B001", "0917", "Reserved", "2030-01-02 10:00", "2030-01-02 12:00")
+        earlier = booking("B001", "0918", "Reserved", "2030-01-01 10:00", "2030-01-01 12:00")
+        index = BookingIndex([later])
+        index.add(earlier)
+        self.assertIs(index.next_reservation("B001"), earlier)
+        earlier.status = "Active"
+        index.start(earlier)
+        self.assertIs(index.active_for_bike("B001"), earlier)
+        self.assertIs(index.next_reservation("B001"), later)
+
+
+class HubIndexTest(unittest.TestCase):
+    BIKES = 6
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        bikes = [{"bike_id": f"B{i:03d}", "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.0,
+                  "available": True} for i in range(self.BIKES)]
+        with open(PedalHub.BIKE_FILE, "w") as file:
+            json.dump(bikes, file)
+
+    def load_hub(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub = PedalHub()
+        self.addCleanup(hub.storage.close)
+        return hub
+
+    def assert_index_matches_bookings(self, hub):
+        index = hub.booking_index
+        for number in range(self.BIKES):
+            bike_id = f"B{number:03d}"
+            active = [item for item in hub.bookings if item.bike_id == bike_id and item.status == "Active"]
+            self.assertEqual(index.active_for_bike(bike_id.lower()), active[0] if active else None)
+        for phone in {item.customer_phone for item in hub.bookings} | {"0000"}:
+            self.assertEqual(index.for_phone(phone), [item for item in hub.bookings if item.customer_phone == phone])
+
+    def test_index_follows_changes_and_reloads(self):
+        hub = self.load_hub()
+        rng = random.Random(3)
+        for _ in range(200):
+            bike_id = f"B{rng.randrange(self.BIKES):03d}"
+            choice = rng.random()
+            if choice < 0.5 and hub.bike_inventory.get(bike_id).available:
+                hub.commit("rent", booking(bike_id, f"09{rng.randrange(4)}").to_dict())
+            elif choice < 0.8 and hub.booking_index.active_for_bike(bike_id) is not None:
+                hub.commit("complete", {"bike_id": bike_id})
+            elif hub.bookings:
+                hub.commit("delete_booking", {"index": rng.randrange(len(hub.bookings))})
+            self.assert_index_matches_bookings(hub)
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+        hub.storage.close()
+        self.assert_index_matches_bookings(self.load_hub())
+
+
+if __name__ == "__main__":
+    unittest.main()
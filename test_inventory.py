@@ -0,0 +1,118 @@
+import io
+import random
+import unittest
+import contextlib
+
+from bikedetails import BikeDetails
+from inventory import BikeInventory
+from benchmarks.generators import TYPES, SIZES, COLORS, make_fleet
+
+"""
+The bike inventory index: bikes are found by bike ID ignoring case and surrounding spaces, and kept in insertion order.
+Searches with the attribute bitmaps (find()) must return the same bikes, in the same order, as a scan of the inventory.
+
+Run from the project root:  python -m pytest -q test_inventory.py
+"""
+
+
+def bike(bike_id, bike_type="Road Bike", size="M", color="Red", rental_price=10.0, available=True):
+    return BikeDetails(bike_id, bike_type, size, color, rental_price, available)
+
+
+class BikeInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inventory = BikeInventory([bike("B002"), bike("B001"), bike("MTB-7")])
+
+    def test_lookup_ignores_case_and_spaces(self):
+        self.assertEqual(self.inventory.get("mtb-7").bike_id, "MTB-7")
+        self.assertEqual(self.inventory.get("  b001 ").bike_id, "B001")
+        self.assertIn("b002", self.inventory)
+        self.assertNotIn("B003", self.inventory)
+        self.assertIsNone(self.inventory.get("B003"))
+
+    def test_insertion_order(self):
+        self.inventory.add(bike("A000"))
+        self.assertEqual([item.bike_id for item in self.inventory], ["B002", "B001", "MTB-7", "A000"])
+        self.assertEqual(len(self.inventory), 4)
+
+    def test_duplicates(self):
+        with self.assertRaises(ValueError):
+            self.inventory.add(bike("b001"))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            inventory = BikeInventory([bike("B001", color="Red"), bike("b001", color="Blue")])
+        self.assertIn("Duplicate Bike ID b001", output.getvalue())
+        self.assertEqual([(item.bike_id, item.color) for item in inventory], [("B001", "Red")])
+
+    def test_remove_and_set_available(self):
+        self.assertTrue(self.inventory.set_available("b002", False))
+        self.assertFalse(self.inventory.get("B002").available)
+        self.assertFalse(self.inventory.set_available("B003", False))
+        self.assertEqual(self.inventory.remove("B001 ").bike_id, "B001")
+        self.assertIsNone(self.inventory.remove("B001"))
+        self.assertNotIn("B001", self.inventory)
+        self.inventory.add(bike("b001"))
+        self.assertEqual(self.inventory.get("B001").bike_id, "b001")
+
+    def test_snapshot_round_trip(self):
+        self.inventory.set_available("B001", False)
+        copy = BikeInventory.from_snapshot(*self.inventory.snapshot())
+        self.assertEqual([item.to_dict() for item in copy], [item.to_dict() for item in self.inventory])
+        self.assertEqual(copy.get("mtb-7").bike_id, "MTB-7")
+
+
+class FindTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inventory = BikeInventory(make_fleet(2000, rented=range(0, 2000, 3)))
+        self.rng = random.Random(13)
+
+    # The bikes find() should return, by checking every bike
+    def scan(self, bike_type=None, size=None, color=None, available=None, min_price=None, max_price=None):
+        def matches(item):
+            return ((bike_type is None or item.bike_type.casefold() == bike_type.strip().casefold())
+                    and (size is None or item.size.casefold() == size.strip().casefold())
+                    and (color is None or item.color.casefold() == color.strip().casefold())
+                    and (available is None or item.available == available)
+                    and (min_price is None or item.rental_price >= min_price)
+                    and (max_price is None or item.rental_price <= max_price))
+        return [item for item in self.inventory if matches(item)]
+
+    def random_filters(self):
+        rng = self.rng
+        filters = {"bike_type": rng.choice(TYPES + ("road bike", " BMX", "Unicycle")), "size": rng.choice(SIZES + ("m",)),
+                   "color": rng.choice(COLORS + ("BLUE",)), "available": rng.choice((True, False)),
+                   "min_price": rng.choice((4, 5, 12.5, 20)), "max_price": rng.choice((5, 12, 18.5, 31))}
+        return {name: value for name, value in filters.items() if rng.random() < 0.4}
+
+    def assert_matches_scan(self, queries=300):
+        for _ in range(queries):
+            filters = self.random_filters()
+            with self.subTest(**filters):
+                self.assertEqual(self.inventory.find(**filters), self.scan(**filters))
+
+    def test_find_matches_a_scan(self):
+        self.assert_matches_scan()
+        self.assertEqual(self.inventory.find(), list(self.inventory))
+
+    def test_find_after_changes(self):
+        self.inventory.find()  # Builds the bitmaps, which the changes below must keep up to date
+        for number in range(2000, 2200):
+            self.inventory.add(bike(f"X{number}", self.rng.choice(TYPES), "M", "Blue", self.rng.choice((4.5, 12.0, 40.0))))
+        for number in self.rng.sample(range(2200), 300):
+            self.inventory.remove(f"B{number:07d}" if number < 2000 else f"X{number}")
+        for item in self.rng.sample(list(self.inventory), 300):
+            self.inventory.set_available(item.bike_id, not item.available)
+        self.assert_matches_scan()
+        self.assertEqual(set(self.inventory.values("rental_price")), {item.rental_price for item in self.inventory})
+
+    def test_many_distinct_values(self):
+        # More than 255 colors, so the color bitmaps are built one bike at a time
+        self.inventory = BikeInventory(bike(f"B{number:04d}", color=f"Color {number % 400}") for number in range(1000))
+        self.assertEqual(self.inventory.find(color="color 7"), self.scan(color="Color 7"))
+        self.assertEqual(len(self.inventory.find(color="Color 7")), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import json
+import unittest
+
+from json_stream import iter_json_array
+
+"""
+iter_json_array must decode a JSON array exactly as json.load does, wherever the chunk boundaries fall.
+
+Run from the project root:  python -m pytest -q test_json_stream.py
+"""
+DOCUMENTS = [
+    "[]",
+    " [ ] ",
+    "[1.5e10]",
+    "[1.5e10, -0.25, 3, 1E-5, 2e+3, 12345678901234567890, 0, -0]",
+    "[true, false, null, \"\", \"a\\\"b\\\\c\\u00e9\\ud83d\\udeb2\"]",
+    "[{\"bike_id\": \"B001\", \"rental_price\": 10.5, \"available\": true}, {\"nested\": [1, [2.25, {\"x\": -3e2}]]}]",
+    "\r\n[\r\n  {\"a\": 1},\r\n  [],\r\n  \"text, with ] and [\"\r\n]\r\n",
+]
+INVALID = ["", "{}", "[1.]", "[1,]", "[1 2]", "[1", "[\"open", "[1.5e]", "[-]"]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def test_matches_json_load(self):
+        for document in DOCUMENTS:
+            for chunk_size in (1, 2, 3, 7, 65536):
+                with self.subTest(document=document, chunk_size=chunk_size):
+                    self.assertEqual(list(iter_json_array(io.StringIO(document), chunk_size=chunk_size)),
+                                     json.loads(document))
+
+    def test_number_cut_at_every_position(self):
+        document = "[1.5e10,-7.25E-3,42]"
+        for chunk_size in range(1, len(document) + 1):
+            items = list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+            self.assertEqual(items, [1.5e10, -7.25e-3, 42])
+            self.assertEqual([type(item) for item in items], [float, float, int])
+
+    def test_transform(self):
+        self.assertEqual(list(iter_json_array(io.StringIO("[1, 2, 3]"), transform=lambda item: item * 2, chunk_size=1)),
+                         [2, 4, 6])
+
+    def test_invalid_documents_raise(self):
+        for document in INVALID:
+            for chunk_size in (1, 65536):
+                with self.subTest(document=document, chunk_size=chunk_size), self.assertRaises(json.JSONDecodeError):
+                    list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+
+
+if __name__ == "__main__":
+    unittest.main()
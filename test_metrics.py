@@ -0,0 +1,48 @@
+import os
+import json
+import tempfile
+import unittest
+
+from pedalhub import PedalHub
+from metrics import METRICS
+
+"""
+The operation metrics count each file read once, however many helpers it passes through.
+
+Run from the project root:  python -m pytest -q test_metrics.py
+"""
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "records.json")
+        with open(self.filename, "w") as file:
+            json.dump([{"bike_id": f"B{i:03d}"} for i in range(50)], file)
+        enabled, operations = METRICS.enabled, METRICS.operations
+        self.addCleanup(setattr, METRICS, "operations", operations)
+        self.addCleanup(setattr, METRICS, "enabled", enabled)
+        METRICS.enabled, METRICS.operations = True, {}
+
+    def total(self, counter):
+        return sum(counters[counter] for counters in METRICS.operations.values())
+
+    def test_file_read_is_counted_once(self):
+        self.assertEqual(len(PedalHub.load_from_file(self.filename)), 50)
+        self.assertEqual(self.total("bytes_read"), os.path.getsize(self.filename))
+        self.assertEqual(self.total("records"), 50)
+        self.assertEqual(METRICS.operations["load_from_file"]["count"], 1)
+
+        self.assertEqual(sum(1 for _ in PedalHub.stream_from_file(self.filename)), 50)
+        self.assertEqual(self.total("bytes_read"), 2 * os.path.getsize(self.filename))
+
+    def test_nothing_is_recorded_when_off(self):
+        METRICS.enabled = False
+        PedalHub.load_from_file(self.filename)
+        self.assertEqual(METRICS.operations, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
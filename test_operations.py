@@ -0,0 +1,144 @@
+import io
+import os
+import json
+import time
+import tempfile
+import unittest
+import contextlib
+
+from pedalhub import PedalHub
+from booking import TIME_FORMAT
+from operations import HubOperations
+
+"""
+The headless operations API: each operation returns an OperationResult with the outcome, a message and the record it
+created or changed, refuses invalid input (marked invalid) and changes that the current data does not allow, and its
+changes are saved like those made from the menus.
+
+Run from the project root:  python -m pytest -q test_operations.py
+"""
+
+
+class HubOperationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        bikes = [{"bike_id": "B001", "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.0,
+                  "available": True},
+                 {"bike_id": "B002", "bike_type": "BMX", "size": "S", "color": "Blue", "rental_price": 7.5,
+                  "available": True}]
+        with open(PedalHub.BIKE_FILE, "w") as file:
+            json.dump(bikes, file)
+        self.hub = self.load_hub()
+        self.api = HubOperations(self.hub)
+
+    def load_hub(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub = PedalHub()
+        self.addCleanup(hub.storage.close)
+        return hub
+
+    def assert_refused(self, result, invalid):
+        self.assertFalse(result.ok)
+        self.assertEqual(result.invalid, invalid, result.message)
+        self.assertIsNone(result.data)
+
+    def test_rent_and_complete(self):
+        result = self.api.rent("b001", "Juan", "Cruz", "09171234567", 3)
+        self.assertTrue(result.ok, result.message)
+        self.assertEqual(result.data["bike_id"], "B001")
+        self.assertEqual(result.data["total_cost"], 30.0)
+        self.assertEqual(result.data["status"], "Active")
+        self.assertFalse(self.hub.bike_inventory.get("B001").available)
+        self.assert_refused(self.api.rent("B001", "Ana", "Reyes", "0918", 1), invalid=False)
+
+        result = self.api.complete("B001")
+        self.assertTrue(result.ok, result.message)
+        self.assertEqual(result.data["status"], "Completed")
+        self.assertTrue(self.hub.bike_inventory.get("B001").available)
+        self.assert_refused(self.api.complete("B001"), invalid=False)
+        self.assertEqual([record["bike_id"] for record in self.hub.iter_history()], ["B001"])
+
+    def test_invalid_input(self):
+        for args in (("B001", "Juan", "Cruz", "0917", 0), ("B001", "Juan", "Cruz", "0917", "2"),
+                     ("B001", "Juan", "Cruz", "0917", float("nan")), ("B001", "Juan", "Cruz", "0917", True),
+                     ("B001", "Juan", "Cruz", "0917", HubOperations.MAX_RENTAL_HOURS + 1),
+                     ("B001", "Juan2", "Cruz", "0917", 2), ("B001", "Juan", "Cruz", "09-17", 2),
+                     ("", "Juan", "Cruz", "0917", 2), (None, "Juan", "Cruz", "0917", 2)):
+            with self.subTest(args=args):
+                self.assert_refused(self.api.rent(*args), invalid=True)
+        self.assert_refused(self.api.rent("B001", "Juan", "Cruz", "0917", 2, "2020-01-01 10:00"), invalid=True)
+        self.assert_refused(self.api.rent("B001", "Juan", "Cruz", "0917", 2, "soon"), invalid=True)
+        self.assert_refused(self.api.add_bike("B003", "BMX", "S", "Red", "cheap"), invalid=True)
+        self.assert_refused(self.api.free_bikes("2030-01-01 12:00", "2030-01-01 10:00"), invalid=True)
+        self.assertEqual(self.hub.bookings, [])
+        self.assertTrue(all(bike.available for bike in self.hub.bike_inventory))
+
+    def test_refused_because_of_the_data(self):
+        self.assert_refused(self.api.rent("B009", "Juan", "Cruz", "0917", 2), invalid=False)
+        self.assert_refused(self.api.pick_up("B001"), invalid=False)
+        self.assert_refused(self.api.cancel("B001"), invalid=False)
+        self.assert_refused(self.api.add_bike("b001", "BMX", "S", "Red", 5), invalid=False)
+        self.assert_refused(self.api.delete_bike("B009"), invalid=False)
+
+    def test_cancel(self):
+        tomorrow = time.strftime(TIME_FORMAT, time.localtime(time.time() + 86400))
+        self.assertTrue(self.api.rent("B001", "Juan", "Cruz", "0917", 2, tomorrow).ok)
+        self.assertTrue(self.api.rent("B001", "Ana", "Reyes", "0918", 2).ok)
+        result = self.api.cancel("B001")  # The active rental first
+        self.assertTrue(result.ok)
+        self.assertEqual(result.data["customer_firstName"], "Ana")
+        self.assertTrue(self.hub.bike_inventory.get("B001").available)
+        result = self.api.cancel("B001")  # Then the reservation
+        self.assertTrue(result.ok)
+        self.assertEqual(result.data["status"], "Reserved")
+        self.assertEqual(self.hub.bookings, [])
+
+    def test_add_and_delete_bike(self):
+        result = self.api.add_bike("B003", "City Bike", "L", "Green", 12)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.data, {"bike_id": "B003", "bike_type": "City Bike", "size": "L", "color": "Green",
+                                       "rental_price": 12.0, "available": True})
+        self.assertTrue(self.api.delete_bike("b002").ok)
+        self.assertEqual([bike.bike_id for bike in self.hub.bike_inventory], ["B001", "B003"])
+
+    def test_quote_and_free_bikes(self):
+        result = self.api.quote(None, [1, 2.5])
+        self.assertTrue(result.ok)
+        self.assertEqual([(quote["bike_id"], quote["rental_hours"], quote["total_cost"]) for quote in result.data],
+                         [("B001", 1, 10.0), ("B001", 2.5, 25.0), ("B002", 1, 7.5), ("B002", 2.5, 18.75)])
+        self.assert_refused(self.api.quote(["B009"], 1), invalid=False)
+        self.assert_refused(self.api.quote("B001", []), invalid=True)
+
+        tomorrow = time.time() + 86400
+        start, end = (time.strftime(TIME_FORMAT, time.localtime(tomorrow + hours * 3600)) for hours in (0, 2))
+        self.assertTrue(self.api.rent("B002", "Juan", "Cruz", "0917", 2, start).ok)
+        result = self.api.free_bikes(start, end)
+        self.assertTrue(result.ok)
+        self.assertEqual([bike["bike_id"] for bike in result.data], ["B001"])
+
+    def test_execute(self):
+        result = self.api.execute({"op": "rent", "bike_id": "B002", "customer_firstName": "Juan",
+                                   "customer_lastName": "Cruz", "customer_phone": "0917", "rental_hours": 2})
+        self.assertTrue(result.ok, result.message)
+        self.assert_refused(self.api.execute({"op": "launch"}), invalid=True)
+        self.assert_refused(self.api.execute({"op": "complete"}), invalid=True)
+        self.assert_refused(self.api.execute({"op": "complete", "bike_id": "B002", "extra": 1}), invalid=True)
+        self.assertEqual(self.api.execute({"op": "complete", "bike_id": "B002"}).to_dict()["ok"], True)
+
+    def test_changes_are_saved(self):
+        with self.hub.batch_saves():
+            self.assertTrue(self.api.rent("B001", "Juan", "Cruz", "0917", 2).ok)
+            self.assertTrue(self.api.add_bike("B003", "City Bike", "L", "Green", 12).ok)
+        self.hub.storage.close()
+        hub = self.load_hub()
+        self.assertEqual([booking.bike_id for booking in hub.bookings], ["B001"])
+        self.assertFalse(hub.bike_inventory.get("B001").available)
+        self.assertIn("B003", hub.bike_inventory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import time
+import random
+import unittest
+
+from pricing import PricingRules
+from bikedetails import BikeDetails
+from benchmarks.generators import make_fleet
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+The pricing engine: price_table() prices many bikes at once and must be bit-identical to cost() for every bike and
+duration, and with no rules cost() must equal BikeDetails.calculate_rental_cost.
+
+Run from the project root:  python -m pytest -q test_pricing.py
+"""
+RULES = {
+    "flat": PricingRules(),
+    "daily cap": PricingRules(daily_cap_hours=8),
+    "peak": PricingRules(peak_periods=[(17, 19, 1.25), (22, 5, 0.8), (18, 18, 3.0)]),
+    "discounts": PricingRules(type_discounts={"BMX": 0.1, "City Bike": 0.15, "Road Bike": 1 / 3}),
+    "all": PricingRules(daily_cap_hours=7.5, peak_periods=[(17, 19, 1.25), (22, 5, 0.8)],
+                        type_discounts={"BMX": 0.1, "City Bike": 0.15}),
+}
+
+
+def local_time(hour):
+    return time.mktime((2025, 6, 2, hour, 30, 0, 0, 0, -1))
+
+
+class PricingTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(16)
+        self.bikes = list(make_fleet(300))
+        self.bikes += [BikeDetails(f"F{i}", bike.bike_type, "M", "Red", round(rng.uniform(1, 40), 2))
+                       for i, bike in enumerate(self.bikes[:100])]  # Prices that are not whole numbers
+        self.durations = [0.5, 1, 1.5, 2, 3.25, 7.5, 8, 23.75, 24, 25, 47.5, 100, rng.uniform(0, 200)]
+        self.starts = [None, local_time(3), local_time(12), local_time(17), local_time(18), local_time(23)]
+
+    def test_flat_pricing_is_calculate_rental_cost(self):
+        rules = RULES["flat"]
+        self.assertTrue(rules.is_flat())
+        for bike in self.bikes:
+            for hours in self.durations:
+                self.assertEqual(rules.cost(bike, hours, local_time(18)).hex(), float(bike.calculate_rental_cost(hours)).hex())
+
+    def test_rules(self):
+        bmx = BikeDetails("B1", "BMX", "S", "Red", 10.0)
+        self.assertEqual(RULES["daily cap"].cost(bmx, 30), (8 + 6) * 10.0)
+        self.assertEqual(RULES["peak"].cost(bmx, 2, local_time(18)), 25.0)  # The first matching period applies
+        self.assertEqual(RULES["peak"].cost(bmx, 2, local_time(3)), 16.0)   # A period that wraps past midnight
+        self.assertEqual(RULES["peak"].cost(bmx, 2, local_time(12)), 20.0)
+        self.assertEqual(RULES["discounts"].cost(bmx, 2), 18.0)
+        with self.assertRaises(ValueError):
+            PricingRules(daily_cap_hours=25)
+
+    @unittest.skipIf(numpy is None, "price_table needs NumPy")
+    def test_price_table_is_bit_identical_to_cost(self):
+        for name, rules in RULES.items():
+            for start in self.starts:
+                table = rules.price_table(self.bikes, self.durations, start)
+                self.assertEqual(table.shape, (len(self.bikes), len(self.durations)))
+                expected = [[rules.cost(bike, hours, start).hex() for hours in self.durations] for bike in self.bikes]
+                with self.subTest(rules=name, start=start):
+                    self.assertEqual([[cost.hex() for cost in row] for row in table.tolist()], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from collections import Counter, defaultdict
+
+from inventory import BikeInventory
+from reports import RentalReports, np
+from benchmarks.generators import make_fleet, make_history
+
+"""
+The rental reports must give the same totals as a plain Python loop over the history, whether the rentals were loaded
+in several chunks or added one by one afterwards.
+
+Run from the project root:  python -m pytest -q test_reports.py
+"""
+
+
+class SmallChunkReports(RentalReports):
+    CHUNK_SIZE = 700  # Several chunks, so the totals and string codes are carried from one chunk to the next
+
+
+def rental(bike_id, hours, start_time=None, end_time=None, phone="0917"):
+    return {"customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": phone, "bike_id": bike_id,
+            "rental_hours": hours, "total_cost": hours * 10.0, "status": "Completed", "start_time": start_time,
+            "end_time": end_time}
+
+
+@unittest.skipIf(np is None, "The rental reports need NumPy")
+class RentalReportsTest(unittest.TestCase):
+    BIKES = 40
+
+    def setUp(self):
+        self.records = list(make_history(3000, self.BIKES, customers=300))
+        self.inventory = BikeInventory(make_fleet(self.BIKES))
+
+    def test_totals_match_a_python_loop(self):
+        reports = SmallChunkReports(self.records)
+        revenue, rentals = defaultdict(float), Counter()
+        customer_revenue, customer_rentals = defaultdict(float), Counter()
+        for record in self.records:
+            revenue[record["bike_id"]] += record["total_cost"]
+            rentals[record["bike_id"]] += 1
+            customer_revenue[record["customer_phone"]] += record["total_cost"]
+            customer_rentals[record["customer_phone"]] += 1
+
+        per_bike = reports.revenue_per_bike()
+        self.assertEqual({bike_id: (total, count) for bike_id, total, count in per_bike},
+                         {bike_id: (revenue[bike_id], rentals[bike_id]) for bike_id in revenue})
+        self.assertEqual([total for _, total, _ in per_bike], sorted(revenue.values(), reverse=True))
+        self.assertEqual([bike_id for bike_id, _, _ in reports.revenue_per_bike(5)], [bike_id for bike_id, _, _ in per_bike[:5]])
+
+        type_revenue = defaultdict(float)
+        for bike_id, total in revenue.items():
+            type_revenue[self.inventory.get(bike_id).bike_type] += total
+        self.assertEqual({bike_type: total for bike_type, total, _ in reports.revenue_per_type(self.inventory)},
+                         dict(type_revenue))
+
+        customers = reports.top_customers(limit=None)
+        self.assertEqual({phone: (total, count) for phone, _, total, count in customers},
+                         {phone: (customer_revenue[phone], customer_rentals[phone]) for phone in customer_revenue})
+
+        histogram = reports.duration_histogram()
+        self.assertEqual(sum(count for _, _, count in histogram), len(self.records))
+        for low, high, count in histogram:
+            self.assertEqual(count, sum(1 for record in self.records if low <= record["rental_hours"] < high))
+        self.assertEqual(reports.status_counts(), {"Completed": len(self.records)})
+
+    def test_added_rentals_match_loading_them(self):
+        loaded = SmallChunkReports(self.records)
+        added = SmallChunkReports(self.records[:1000])
+        for record in self.records[1000:]:
+            added.add(record)
+        self.assertEqual(added.revenue_per_bike(), loaded.revenue_per_bike())
+        self.assertEqual(added.top_customers(20), loaded.top_customers(20))
+        self.assertEqual(added.duration_histogram(), loaded.duration_histogram())
+        self.assertEqual(added.utilization(), loaded.utilization())
+
+    def test_bike_ids_are_grouped_case_insensitively(self):
+        reports = RentalReports([rental("B001", 2), rental("b001", 1), rental("B002", 1)])
+        self.assertEqual(reports.revenue_per_bike(), [("B001", 30.0, 2), ("B002", 10.0, 1)])
+
+    def test_utilization_leaves_out_rentals_without_times(self):
+        reports = RentalReports([rental("B001", 3), rental("B001", 3, "2025-06-02 10:00", "2025-06-02 13:00"),
+                                 rental("B002", 1, "2025-06-02 11:00", "2025-06-02 12:00")])
+        self.assertEqual(reports.period_hours(), 3)
+        self.assertEqual(reports.utilization(), [("B001", 3.0, 1.0), ("B002", 1.0, 1 / 3)])
+        self.assertEqual(reports.revenue_per_bike()[0], ("B001", 60.0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
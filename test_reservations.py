@@ -0,0 +1,108 @@
+import io
+import os
+import json
+import time
+import tempfile
+import unittest
+import contextlib
+
+from pedalhub import PedalHub
+from schedule import BikeSchedule
+from booking import TIME_FORMAT, format_time
+from operations import HubOperations
+
+"""
+Reservations and the per-bike schedule: conflicting bookings are refused, and a reserved bike cannot be picked up before
+its window starts, so renting it out in the time before the reservation is safe.
+
+Run from the project root:  python -m pytest -q test_reservations.py
+"""
+
+
+class BikeScheduleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.schedule = BikeSchedule()
+        self.schedule.extend("b001", [(300, 400), (100, 200)])
+
+    def test_conflicts(self):
+        self.assertEqual(self.schedule.conflict("b001", 150, 160), (100, 200))
+        self.assertEqual(self.schedule.conflict("b001", 50, 500), (300, 400))
+        self.assertEqual(self.schedule.conflict("b001", 399, 450), (300, 400))
+        self.assertIsNone(self.schedule.conflict("b002", 150, 160))
+
+    def test_windows_are_half_open(self):
+        self.assertIsNone(self.schedule.conflict("b001", 200, 300))
+        self.assertIsNone(self.schedule.conflict("b001", 400, 500))
+        self.assertIsNone(self.schedule.conflict("b001", 0, 100))
+
+    def test_removed_window_is_free(self):
+        self.schedule.remove("b001", 100, 200)
+        self.assertIsNone(self.schedule.conflict("b001", 150, 160))
+        self.schedule.add("b001", 150, 160)
+        self.assertEqual(self.schedule.conflict("b001", 100, 155), (150, 160))
+        self.assertEqual(len(self.schedule), 2)
+
+    def test_free_bikes(self):
+        self.schedule.add("b002", 250, 260)
+        self.assertEqual(list(self.schedule.free(["b001", "b002", "b003"], 200, 300)), ["b001", "b003"])
+        self.assertEqual(list(self.schedule.free(["b001", "b002", "b003"], 150, 250)), ["b002", "b003"])
+
+
+class ReservationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        bikes = [{"bike_id": bike_id, "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.0,
+                  "available": True} for bike_id in ("B001", "B002")]
+        with open(PedalHub.BIKE_FILE, "w") as file:
+            json.dump(bikes, file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.hub = PedalHub()
+        self.addCleanup(self.hub.storage.close)
+        self.api = HubOperations(self.hub)
+        self.tomorrow = time.strftime(TIME_FORMAT, time.localtime(time.time() + 86400))
+
+    def test_overlapping_reservation_is_refused(self):
+        self.assertTrue(self.api.rent("B001", "Juan", "Cruz", "0917", 3, self.tomorrow).ok)
+        result = self.api.rent("b001", "Ana", "Reyes", "0918", 1, self.tomorrow)
+        self.assertFalse(result.ok)
+        self.assertIn("already booked", result.message)
+        self.assertTrue(self.api.rent("B002", "Ana", "Reyes", "0918", 1, self.tomorrow).ok)
+
+    def test_reservation_cannot_be_picked_up_early(self):
+        self.assertTrue(self.api.rent("B001", "Juan", "Cruz", "0917", 2, self.tomorrow).ok)
+        result = self.api.pick_up("B001")
+        self.assertFalse(result.ok)
+        self.assertIn("cannot be picked up before", result.message)
+        self.assertTrue(self.hub.bike_inventory.get("B001").available)
+        self.assertEqual(self.hub.booking_index.next_reservation("B001").status, "Reserved")
+
+    def test_bike_can_be_rented_before_its_reservation(self):
+        self.assertTrue(self.api.rent("B001", "Juan", "Cruz", "0917", 2, self.tomorrow).ok)
+        self.assertFalse(self.api.pick_up("B001").ok)
+        result = self.api.rent("B001", "Ana", "Reyes", "0918", 3)
+        self.assertTrue(result.ok, result.message)
+        self.assertEqual(result.data["status"], "Active")
+        self.assertFalse(self.hub.bike_inventory.get("B001").available)
+        self.assertEqual(self.hub.booking_index.active_for_bike("B001").customer_firstName, "Ana")
+        self.assertEqual(self.hub.booking_index.next_reservation("B001").customer_firstName, "Juan")
+
+    def test_reservation_is_picked_up_once_it_starts(self):
+        now = time.time()
+        reservation = {"customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": "0917",
+                       "bike_id": "B001", "rental_hours": 2, "total_cost": 20.0, "status": "Reserved",
+                       "start_time": format_time(now - 60), "end_time": format_time(now + 7140)}
+        self.assertIsNone(self.hub.commit("rent", reservation))
+        result = self.api.pick_up("B001")
+        self.assertTrue(result.ok, result.message)
+        self.assertEqual(result.data["status"], "Active")
+        self.assertFalse(self.hub.bike_inventory.get("B001").available)
+        self.assertIsNone(self.hub.booking_index.next_reservation("B001"))
+
+
+if __name__ == "__main__":
+    unittest.main()
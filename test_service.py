@@ -0,0 +1,94 @@
+import io
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+import contextlib
+
+from pedalhub import PedalHub
+from service import PedalHubService
+
+"""
+The HTTP service answers every request: 200 for a change that was made, 400 for a malformed request or invalid
+arguments, and 409 for a change refused because of the current bikes and bookings.
+
+Run from the project root:  python -m pytest -q test_service.py
+"""
+
+
+class ServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        bikes = [{"bike_id": "B001", "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.0,
+                  "available": True}]
+        with open(PedalHub.BIKE_FILE, "w") as file:
+            json.dump(bikes, file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.hub = PedalHub()
+        self.service = PedalHubService(self.hub)
+        server = await self.service.start(port=0)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+        self.hub.storage.close()
+
+    # Sends raw request bytes and returns (status, JSON body) of the response
+    async def send(self, request):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            status = int((await asyncio.wait_for(reader.readline(), 5)).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            return status, json.loads(await reader.readexactly(length))
+        finally:
+            writer.close()
+
+    async def post(self, path, body):
+        data = json.dumps(body).encode("utf-8")
+        return await self.send(f"POST {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+
+    def rent(self, **changes):
+        return self.post("/rent", {"bike_id": "B001", "customer_firstName": "Juan", "customer_lastName": "Cruz",
+                                   "customer_phone": "0917", "rental_hours": 2, **changes})
+
+    async def test_rent_then_conflict(self):
+        status, response = await self.rent()
+        self.assertEqual(status, 200, response)
+        status, response = await self.rent()
+        self.assertEqual(status, 409)
+        self.assertIn("not available", response["message"])
+        self.assertEqual((await self.post("/complete", {"bike_id": "B001"}))[0], 200)
+        self.assertEqual((await self.post("/complete", {"bike_id": "B001"}))[0], 409)
+
+    async def test_invalid_arguments_are_bad_requests(self):
+        for changes in ({"rental_hours": "two"}, {"rental_hours": -1}, {"customer_phone": "none"},
+                        {"start_time": "tomorrow"}, {"bike_id": 7}, {"color": "Red"}):
+            status, response = await self.rent(**changes)
+            self.assertEqual(status, 400, (changes, response))
+        status, _ = await self.post("/quote", {"bike_ids": None, "rental_hours": 0})
+        self.assertEqual(status, 400)
+        self.assertTrue(self.hub.bike_inventory.get("B001").available)
+
+    async def test_invalid_content_length(self):
+        for length in (b"abc", b"-5"):
+            status, response = await self.send(b"POST /rent HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+            self.assertEqual(status, 400)
+            self.assertIn("Content-Length", response["message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
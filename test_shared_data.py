@@ -0,0 +1,32 @@
+import unittest
+
+from benchmarks.bench_locking import run
+
+"""
+Several processes rent and complete bikes of one small fleet at the same time, each through its own PedalHub on the same
+data directory (the stress run of benchmarks/bench_locking.py, smaller). With SHARED_DATA on, no update may be lost.
+
+Run from the project root:  python -m pytest -q test_shared_data.py
+"""
+
+
+class SharedDataTest(unittest.TestCase):
+    PROCESSES = 3
+    OPERATIONS = 80
+    BIKES = 5  # Few bikes, so the processes keep changing the same ones
+
+    def check_no_lost_updates(self, settings):
+        _, rented, completed, problems = run(settings, self.PROCESSES, self.OPERATIONS, self.BIKES)
+        self.assertEqual(problems, [])
+        self.assertGreater(rented, 0)
+        self.assertGreater(completed, 0)
+
+    def test_journal(self):
+        self.check_no_lost_updates({"SHARED_DATA": True, "USE_JOURNAL": True})
+
+    def test_rewriting_files(self):
+        self.check_no_lost_updates({"SHARED_DATA": True, "USE_JOURNAL": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import os
+import json
+import random
+import tempfile
+import unittest
+import contextlib
+
+from booking import Booking
+from pedalhub import PedalHub
+from sqlite_storage import SqliteStorage
+
+"""
+The SQLite storage backend must keep the same data as the JSON files: after the same changes, a hub on each backend has
+the same bikes, active bookings and rental history, also once both are loaded again from disk, and a database migrated
+from the JSON files holds the same data as well.
+
+Run from the project root:  python -m pytest -q test_sqlite_storage.py
+"""
+
+
+class SqlitePedalHub(PedalHub):
+    STORAGE_BACKEND = "sqlite"
+
+
+class SqliteStorageTest(unittest.TestCase):
+    BIKES = 6
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        bikes = [{"bike_id": f"B{i:03d}", "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.0 + i,
+                  "available": True} for i in range(self.BIKES)]
+        with open(PedalHub.BIKE_FILE, "w") as file:
+            json.dump(bikes, file)
+        self.rng = random.Random(9)
+
+    def load_hub(self, hub_class=PedalHub):
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub = hub_class()
+        self.addCleanup(hub.storage.close)
+        return hub
+
+    def save(self, hub):
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+
+    def assert_same_data(self, json_hub, sqlite_hub):
+        self.assertEqual([bike.to_dict() for bike in sqlite_hub.bike_inventory],
+                         [bike.to_dict() for bike in json_hub.bike_inventory])
+        self.assertEqual([booking.to_dict() for booking in sqlite_hub.bookings],
+                         [booking.to_dict() for booking in json_hub.bookings])
+        # The database lists the history in the order the rentals were made, the archive in the order they ended
+        self.assertEqual(sorted(self.history(sqlite_hub), key=repr), sorted(self.history(json_hub), key=repr))
+
+    @staticmethod
+    def history(hub):
+        return [tuple(Booking.from_dict(record).to_dict().items()) for record in hub.iter_history()]
+
+    # A change that the current data allows, as passed to PedalHub.commit()
+    def random_operation(self, hub):
+        rng = self.rng
+        bike_id = rng.choice([bike.bike_id for bike in hub.bike_inventory] + ["X001"])
+        choice = rng.random()
+        if choice < 0.3:
+            day = rng.choice(("2020-01-0", "2040-01-0")) + str(rng.randrange(1, 10))  # Past windows can be picked up
+            status, start_time, end_time = rng.choice([("Active", None, None),
+                                                       ("Reserved", f"{day} 10:00", f"{day} 12:00")])
+            return "rent", Booking("Juan", "Cruz", f"09{rng.randrange(3)}", bike_id.lower(), 2, 20.0, status,
+                                   start_time, end_time).to_dict()
+        if choice < 0.45:
+            return "pick_up", {"bike_id": bike_id}
+        if choice < 0.7:
+            return "complete", {"bike_id": bike_id}
+        if choice < 0.8:
+            return "add_bike", {"bike_id": bike_id, "bike_type": "BMX", "size": "S", "color": "Blue",
+                                "rental_price": 7.5, "available": True}
+        if choice < 0.85 and hub.booking_index.active_for_bike(bike_id) is None:
+            return "delete_bike", {"bike_id": bike_id}
+        if hub.bookings:
+            return "delete_booking", {"index": rng.randrange(len(hub.bookings))}
+        return None
+
+    def test_same_changes_same_data(self):
+        json_hub, sqlite_hub = self.load_hub(), self.load_hub(SqlitePedalHub)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sqlite_hub.commit("add_bike", json_hub.bike_inventory.get("B000").to_dict())
+        self.assertEqual(len(sqlite_hub.bike_inventory), 1)  # A new database starts empty
+        sqlite_hub.commit("delete_bike", {"bike_id": "B000"})
+        for bike in json_hub.bike_inventory:
+            sqlite_hub.commit("add_bike", bike.to_dict())
+
+        applied = 0
+        for _ in range(300):
+            operation = self.random_operation(json_hub)
+            if operation is None or json_hub.check_operation(*operation) is not None:
+                continue
+            self.assertIsNone(sqlite_hub.check_operation(*operation), operation)
+            json_hub.commit(*operation)
+            sqlite_hub.commit(*operation)
+            applied += 1
+            self.assert_same_data(json_hub, sqlite_hub)
+            with contextlib.redirect_stdout(io.StringIO()):
+                stored = SqlitePedalHub()  # What the database holds, not just the hub's copy in memory
+            self.assert_same_data(json_hub, stored)
+            stored.storage.close()
+        self.assertGreater(applied, 100)
+        self.assertTrue(json_hub.bookings and any(True for _ in json_hub.iter_history()))
+
+        self.save(json_hub)
+        self.save(sqlite_hub)
+        self.assert_same_data(self.load_hub(), self.load_hub(SqlitePedalHub))
+
+    def test_migrated_data(self):
+        json_hub = self.load_hub()
+        for operation in (("rent", Booking("Juan", "Cruz", "0917", "B001", 2, 22.0).to_dict()),
+                          ("rent", Booking("Ana", "Reyes", "0918", "B002", 3, 36.0).to_dict()),
+                          ("complete", {"bike_id": "B001"}),
+                          ("rent", Booking("Ana", "Reyes", "0918", "B003", 2, 26.0, "Reserved", "2040-01-01 10:00",
+                                           "2040-01-01 12:00").to_dict())):
+            json_hub.commit(*operation)
+        self.save(json_hub)
+        json_hub = self.load_hub()
+
+        storage = SqliteStorage(json_hub, PedalHub.DATABASE_FILE)
+        storage.import_from(json_hub)
+        with self.assertRaises(ValueError):
+            storage.import_from(json_hub)  # Only into an empty database
+        storage.close()
+        self.assert_same_data(json_hub, self.load_hub(SqlitePedalHub))
+
+
+if __name__ == "__main__":
+    unittest.main()
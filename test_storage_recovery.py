@@ -0,0 +1,108 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+import contextlib
+
+from pedalhub import PedalHub
+
+"""
+Simulates a process that dies while compacting the journal: the data files have been replaced but the journal checkpoint
+was never written. The next start must see every journaled change exactly once.
+
+Run from the project root:  python -m unittest test_storage_recovery
+"""
+
+
+class SimulatedCrash(BaseException):
+    pass  # Not an Exception, so that save_files does not handle it, just as if the process had died
+
+
+def crash(*args):
+    raise SimulatedCrash()
+
+
+class CrashDuringSaveTest(unittest.TestCase):
+    RENT = {"customer_firstName": "Juan", "customer_lastName": "Cruz", "customer_phone": "09171234567", "bike_id": "B002",
+            "rental_hours": 2, "total_cost": 20.0, "status": "Active"}
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        bikes = [{"bike_id": bike_id, "bike_type": "Road Bike", "size": "M", "color": "Red", "rental_price": 10.0,
+                  "available": True} for bike_id in ("B001", "B002")]
+        with open(PedalHub.BIKE_FILE, "w") as file:
+            json.dump(bikes, file)
+        with open(PedalHub.BOOKINGS_FILE, "w") as file:
+            json.dump([], file)
+
+    def load_hub(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            hub = PedalHub()
+        self.addCleanup(hub.storage.close)
+        self.assertNotIn("Error", output.getvalue())
+        return hub
+
+    # Journals the change, then dies in the compaction after the files are written, and starts again
+    def crash_after_writing_files(self, op, data):
+        hub = self.load_hub()
+        self.assertIsNone(hub.commit(op, data))
+        hub.storage.journal.checkpoint = crash
+        with self.assertRaises(SimulatedCrash), contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+        hub.storage.close()
+        return self.load_hub()
+
+    def test_rent_is_replayed_once(self):
+        hub = self.crash_after_writing_files("rent", self.RENT)
+        self.assertEqual([booking.bike_id for booking in hub.bookings], ["B002"])
+        self.assertFalse(hub.bike_inventory.get("B002").available)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+        hub.storage.close()
+        self.assertEqual(len(self.load_hub().bookings), 1)
+
+    def test_add_bike_is_replayed_once(self):
+        data = {"bike_id": "B003", "bike_type": "BMX", "size": "S", "color": "Blue", "rental_price": 8.0}
+        hub = self.crash_after_writing_files("add_bike", data)
+        self.assertEqual([bike.bike_id for bike in hub.bike_inventory], ["B001", "B002", "B003"])
+
+    def test_complete_is_archived_once(self):
+        hub = self.load_hub()
+        hub.commit("rent", self.RENT)
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+        hub.storage.close()
+
+        hub = self.crash_after_writing_files("complete", {"bike_id": "B002"})
+        self.assertEqual(hub.bookings, [])
+        self.assertEqual(len(list(hub.iter_history())), 1)
+        self.assertTrue(hub.bike_inventory.get("B002").available)
+
+    def test_failed_save_is_retried(self):
+        hub = self.load_hub()
+        hub.commit("rent", self.RENT)
+        checkpoint = hub.storage.journal.checkpoint
+
+        def fail():
+            raise OSError("No space left on device")
+        hub.storage.journal.checkpoint = fail
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+        self.assertIn("bookings", hub.dirty)
+
+        hub.storage.journal.checkpoint = checkpoint
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub.save_data()
+        hub.storage.close()
+        self.assertEqual(len(self.load_hub().bookings), 1)
+        self.assertEqual(os.path.getsize(PedalHub.JOURNAL_FILE), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()